@@ -0,0 +1,108 @@
+import math
+import time
+from contextlib import nullcontext
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+# Наборы замеров команды bench: имя -> функция(options) -> [Result].
+SUITES = {}
+
+
+def register(name):
+    def decorator(func):
+        SUITES[name] = func
+        return func
+
+    return decorator
+
+
+def percentile(values, fraction):
+    """Процентиль методом ближайшего ранга."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Result:
+    """Задержки, число запросов к БД и ошибки одного сценария."""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.queries = []
+        self.errors = 0
+        # Время всего прогона для параллельных замеров; иначе сумма задержек.
+        self.elapsed = None
+        # Дополнительные показатели набора, сохраняются вместе с базовыми.
+        self.extra = {}
+
+    def add(self, latency, queries=0, ok=True):
+        self.latencies.append(latency)
+        self.queries.append(queries)
+        self.errors += not ok
+
+    def as_dict(self):
+        total = self.elapsed or sum(self.latencies)
+        requests = len(self.latencies)
+        return {
+            "requests": requests,
+            "p50_ms": percentile(self.latencies, 0.50) * 1000,
+            "p95_ms": percentile(self.latencies, 0.95) * 1000,
+            "p99_ms": percentile(self.latencies, 0.99) * 1000,
+            "queries": sum(self.queries) / requests if requests else 0,
+            "rps": requests / total if total else 0,
+            "errors": self.errors,
+            **self.extra,
+        }
+
+
+def measure(name, func, requests, warmup=0, isolate=False, setup=None):
+    """Вызывает `func` заданное число раз и замеряет каждый вызов.
+
+    `func` возвращает признак успеха. С `isolate` каждый вызов выполняется
+    в откатываемой транзакции, чтобы пишущие сценарии не меняли данные.
+    """
+    result = Result(name)
+    for iteration in range(warmup + requests):
+        if setup is not None:
+            setup()
+        with transaction.atomic() if isolate else nullcontext():
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                ok = func()
+                elapsed = time.perf_counter() - started
+            if isolate:
+                transaction.set_rollback(True)
+        if iteration >= warmup:
+            result.add(elapsed, len(queries), ok)
+    return result
+
+
+def compare(results, baseline, threshold):
+    """Возвращает описания регрессий относительно сохранённой базы."""
+    regressions = []
+    for suite, scenarios in results.items():
+        for name, current in scenarios.items():
+            previous = baseline.get(suite, {}).get(name)
+            if previous is None:
+                continue
+            label = f"{suite}.{name}"
+            if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{label}: p95 {previous['p95_ms']:.2f}ms -> "
+                    f"{current['p95_ms']:.2f}ms"
+                )
+            if current["queries"] > previous["queries"]:
+                regressions.append(
+                    f"{label}: queries {previous['queries']:g} -> "
+                    f"{current['queries']:g}"
+                )
+            if current["errors"] > previous["errors"]:
+                regressions.append(
+                    f"{label}: errors {previous['errors']} -> "
+                    f"{current['errors']}"
+                )
+    return regressions
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.asgi import get_asgi_application
+from django.core.management import CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import RequestFactory
+from django.urls import reverse
+
+from api.benchmarks import Result, register
+from reviews.models import Title
+
+HOST = "testserver"
+
+
+async def asgi_request(application, url):
+    """Выполняет GET-запрос к ASGI-приложению и возвращает код ответа."""
+    parts = urlsplit(url)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "root_path": "",
+        "headers": [(b"host", HOST.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": (HOST, 80),
+    }
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    response = {}
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # Клиент не отключается, пока приложение не ответит.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+
+    await application(scope, receive, send)
+    return response.get("status")
+
+
+def wsgi_request(application, url):
+    """Выполняет GET-запрос к WSGI-приложению и возвращает код ответа."""
+    environ = RequestFactory().get(url).environ
+    status = []
+
+    def start_response(line, headers, exc_info=None):
+        status.append(int(line.split()[0]))
+
+    body = application(environ, start_response)
+    try:
+        for _ in body:
+            pass
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    return status[0] if status else None
+
+
+def run_asgi(name, url, requests, concurrency):
+    application = get_asgi_application()
+    result = Result(name)
+
+    async def timed(semaphore):
+        async with semaphore:
+            started = time.perf_counter()
+            status = await asgi_request(application, url)
+            result.add(time.perf_counter() - started, ok=status == 200)
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(timed(semaphore) for _ in range(requests)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def run_wsgi(name, url, requests, concurrency):
+    application = get_wsgi_application()
+    result = Result(name)
+
+    def timed():
+        started = time.perf_counter()
+        status = wsgi_request(application, url)
+        result.add(time.perf_counter() - started, ok=status == 200)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        for future in [executor.submit(timed) for _ in range(requests)]:
+            future.result()
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+@register("asgi")
+def run(options):
+    """Сравнивает WSGI и ASGI на списке отзывов самого популярного
+    произведения при разном числе одновременных запросов.
+
+    wsgi — синхронное представление в пуле потоков WSGI-сервера,
+    asgi_sync — то же представление под ASGI (Django выполняет его
+    в единственном потоке), asgi_async — асинхронное представление
+    из api/v1/async. Запросы к базе выполняются в других потоках,
+    поэтому число запросов не учитывается.
+    """
+    title = Title.objects.order_by("-rating_count", "pk").first()
+    if title is None:
+        raise CommandError(
+            "The database is empty, fill it with generate_data first."
+        )
+    kwargs = {"title_id": title.pk}
+    modes = (
+        ("wsgi", run_wsgi, reverse("api:reviews-list", kwargs=kwargs)),
+        ("asgi_sync", run_asgi, reverse("api:reviews-list", kwargs=kwargs)),
+        (
+            "asgi_async",
+            run_asgi,
+            reverse("api:async-reviews-list", kwargs=kwargs),
+        ),
+    )
+    results = []
+    for concurrency in options["concurrency"] or [1, 8, 32]:
+        for mode, runner, url in modes:
+            name = f"{mode}_c{concurrency}"
+            if options["filter"] not in name:
+                continue
+            if options["warmup"]:
+                runner(name, url, options["warmup"], concurrency)
+            results.append(
+                runner(name, url, options["requests"], concurrency)
+            )
+    return results
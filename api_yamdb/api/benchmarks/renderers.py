@@ -0,0 +1,57 @@
+from itertools import cycle, islice
+
+from django.core.management import CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmarks import measure, register
+from api.renderers import FastJSONRenderer, MessagePackRenderer, msgpack
+from api.v1.serializers import TitleReadSerializer
+from reviews.models import Title
+
+
+@register("renderers")
+def run(options):
+    """Время сериализации и рендеринга больших страниц произведений.
+
+    Для каждого размера страницы замеряется TitleReadSerializer и
+    кодирование его вывода JSONRenderer DRF, FastJSONRenderer и, если
+    установлен msgpack, MessagePackRenderer. Произведения повторяются,
+    если их в базе меньше размера страницы.
+    """
+    titles = list(
+        Title.objects.select_related("category")
+        .prefetch_related("genre")
+        .order_by("pk")[: max(options["page_size"] or [1000])]
+    )
+    if not titles:
+        raise CommandError(
+            "The database is empty, fill it with generate_data first."
+        )
+    renderers = {"drf_json": JSONRenderer(), "fast_json": FastJSONRenderer()}
+    if msgpack is not None:
+        renderers["msgpack"] = MessagePackRenderer()
+    results = []
+    for size in sorted(options["page_size"] or [100, 1000]):
+        page = list(islice(cycle(titles), size))
+        data = TitleReadSerializer(page, many=True).data
+        name = f"serialize_{size}"
+        if options["filter"] in name:
+            results.append(measure(
+                name,
+                lambda: bool(TitleReadSerializer(page, many=True).data),
+                options["requests"],
+                options["warmup"],
+            ))
+        for label, renderer in renderers.items():
+            name = f"{label}_{size}"
+            if options["filter"] not in name:
+                continue
+            result = measure(
+                name,
+                lambda: bool(renderer.render(data)),
+                options["requests"],
+                options["warmup"],
+            )
+            result.extra["bytes"] = len(renderer.render(data))
+            results.append(result)
+    return results
@@ -0,0 +1,296 @@
+import json
+import logging
+
+from django.conf import settings
+from django.core.management import CommandError
+from django.db.models import Count
+from django.test.utils import override_settings
+from django.urls import get_resolver, reverse
+from rest_framework.test import APIClient
+
+from api.benchmarks import measure, register
+from api.cache import response_cache
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+from users.tokens import RoleAccessToken, RoleRefreshToken
+
+NAMESPACES = ("api", "users")
+
+
+class Scenario:
+    """Запрос к маршруту API от имени одной из ролей."""
+
+    def __init__(self, name, route, role=None, method="get", kwargs=None,
+                 query=None, data=None, content_type=None, status=200):
+        self.name = name
+        self.route = route
+        self.role = role
+        self.method = method
+        self.url = reverse(route, kwargs=kwargs)
+        self.query = query
+        self.data = data
+        self.content_type = content_type
+        self.status = status
+
+    @property
+    def writes(self):
+        return self.method != "get"
+
+    def request(self, client):
+        if self.writes:
+            options = {"format": "json"}
+            if self.content_type:
+                options = {"content_type": self.content_type}
+            # Одноразовые данные, например токены, создаются на каждый запрос.
+            data = self.data() if callable(self.data) else self.data
+            response = getattr(client, self.method)(
+                self.url, data, **options
+            )
+        else:
+            response = client.get(self.url, self.query)
+        return response.status_code == self.status
+
+
+def route_names():
+    resolver = get_resolver()
+    return {
+        f"{namespace}:{name}"
+        for namespace in NAMESPACES
+        for name in resolver.namespace_dict[namespace][1].reverse_dict
+        if isinstance(name, str)
+    }
+
+
+def middle_page(count):
+    return max(count // settings.REST_FRAMEWORK["PAGE_SIZE"] // 2, 1)
+
+
+def get_clients():
+    clients = {None: APIClient()}
+    for role in (User.USER, User.ADMIN):
+        user, _ = User.objects.get_or_create(
+            username=f"bench_{role}",
+            defaults={"email": f"bench_{role}@yamdb.fake", "role": role},
+        )
+        clients[role] = APIClient()
+        clients[role].credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RoleAccessToken.for_user(user)}"
+        )
+    return clients
+
+
+def get_scenarios():
+    """Сценарии на самых популярных объектах сгенерированного набора."""
+    title = Title.objects.order_by("-rating_count", "pk").first()
+    review = (
+        Review.objects.filter(title=title)
+        .annotate(comment_count=Count("comments"))
+        .order_by("-comment_count", "pk")
+        .first()
+    )
+    comment = Comment.objects.filter(review=review).order_by("pk").first()
+    category = Category.objects.order_by("pk").first()
+    genre = Genre.objects.order_by("pk").first()
+    if None in (title, review, comment, category, genre):
+        raise CommandError(
+            "The database is empty, fill it with generate_data first."
+        )
+    user = User.objects.get(username=f"bench_{User.USER}")
+    other_titles = Title.objects.exclude(pk=title.pk).order_by("pk")[:100]
+    title_kwargs = {"title_id": title.pk}
+    review_kwargs = {"title_id": title.pk, "review_id": review.pk}
+    bulk = "\n".join(
+        json.dumps({
+            "title": other.pk,
+            "author": f"bench_{User.USER}",
+            "text": "Отзыв из нагрузочного теста",
+            "score": 7,
+        })
+        for other in other_titles
+    )
+    return [
+        Scenario("root", "api:api-root"),
+        Scenario("users_root", "users:api-root"),
+        Scenario("categories", "api:categories-list"),
+        Scenario(
+            "categories_search", "api:categories-list",
+            query={"search": category.name[:3]},
+        ),
+        Scenario(
+            "category_create", "api:categories-list", User.ADMIN, "post",
+            data={"name": "Бенчмарк", "slug": "bench"}, status=201,
+        ),
+        Scenario(
+            "category_delete", "api:categories-detail", User.ADMIN,
+            "delete", kwargs={"slug": category.slug}, status=204,
+        ),
+        Scenario("genres", "api:genres-list"),
+        Scenario(
+            "genre_delete", "api:genres-detail", User.ADMIN, "delete",
+            kwargs={"slug": genre.slug}, status=204,
+        ),
+        Scenario("titles", "api:titles-list"),
+        Scenario(
+            "titles_deep_page", "api:titles-list",
+            query={"page": middle_page(Title.objects.count())},
+        ),
+        Scenario(
+            "titles_filtered", "api:titles-list",
+            query={"category": category.slug, "genre": genre.slug},
+        ),
+        Scenario("title", "api:titles-detail", kwargs={"pk": title.pk}),
+        Scenario(
+            "title_update", "api:titles-detail", User.ADMIN, "patch",
+            kwargs={"pk": title.pk}, data={"name": "Бенчмарк"},
+        ),
+        Scenario("reviews", "api:reviews-list", kwargs=title_kwargs),
+        Scenario(
+            "reviews_deep_page", "api:reviews-list", kwargs=title_kwargs,
+            query={"page": middle_page(title.rating_count)},
+        ),
+        Scenario(
+            "reviews_cursor", "api:reviews-list", kwargs=title_kwargs,
+            query={"pagination": "cursor"},
+        ),
+        Scenario(
+            "review_create", "api:reviews-list", User.USER, "post",
+            kwargs=title_kwargs, data={"text": "Бенчмарк", "score": 5},
+            status=201,
+        ),
+        Scenario(
+            "review", "api:reviews-detail",
+            kwargs={**title_kwargs, "pk": review.pk},
+        ),
+        Scenario(
+            "review_update", "api:reviews-detail", User.ADMIN, "patch",
+            kwargs={**title_kwargs, "pk": review.pk}, data={"score": 9},
+        ),
+        Scenario("comments", "api:comments-list", kwargs=review_kwargs),
+        Scenario(
+            "comment_create", "api:comments-list", User.USER, "post",
+            kwargs=review_kwargs, data={"text": "Бенчмарк"}, status=201,
+        ),
+        Scenario(
+            "comment", "api:comments-detail",
+            kwargs={**review_kwargs, "pk": comment.pk},
+        ),
+        Scenario("async_titles", "api:async-titles-list"),
+        Scenario(
+            "async_title", "api:async-titles-detail", kwargs={"pk": title.pk}
+        ),
+        Scenario("async_genres", "api:async-genres-list"),
+        Scenario("async_categories", "api:async-categories-list"),
+        Scenario(
+            "async_reviews", "api:async-reviews-list", kwargs=title_kwargs
+        ),
+        Scenario(
+            "async_review", "api:async-reviews-detail",
+            kwargs={**title_kwargs, "pk": review.pk},
+        ),
+        Scenario(
+            "async_comments", "api:async-comments-list", kwargs=review_kwargs
+        ),
+        Scenario(
+            "async_comment", "api:async-comments-detail",
+            kwargs={**review_kwargs, "pk": comment.pk},
+        ),
+        Scenario("search", "api:search", query={"q": title.name}),
+        Scenario("cache_stats", "api:cache_stats", User.ADMIN),
+        Scenario("request_metrics", "api:request_metrics", User.ADMIN),
+        Scenario(
+            "changes", "api:change_events", User.ADMIN,
+            query={"limit": 100},
+        ),
+        Scenario(
+            "changes_ack", "api:acknowledge_changes", User.ADMIN, "post",
+            data={"consumer": "bench", "cursor": 0},
+        ),
+        Scenario(
+            "reviews_bulk", "api:bulk_reviews", User.ADMIN, "post",
+            data=bulk, content_type="application/x-ndjson",
+        ),
+        Scenario("users", "users:users-list", User.ADMIN),
+        Scenario(
+            "users_search", "users:users-list", User.ADMIN,
+            query={"search": "user1"},
+        ),
+        Scenario(
+            "user", "users:users-detail", User.ADMIN,
+            kwargs={"username": f"bench_{User.USER}"},
+        ),
+        Scenario("me", "users:users-get-patch-me", User.USER),
+        Scenario(
+            "me_update", "users:users-get-patch-me", User.USER, "patch",
+            data={"bio": "Бенчмарк"},
+        ),
+        Scenario(
+            "signup", "users:token_get", method="post",
+            data={"username": "bench_signup", "email": "signup@yamdb.fake"},
+        ),
+        Scenario(
+            "signup_again", "users:token_get", method="post",
+            data={"username": user.username, "email": user.email},
+        ),
+        Scenario(
+            "token_invalid_code", "users:token_send", method="post",
+            data={
+                "username": f"bench_{User.USER}",
+                "confirmation_code": "invalid",
+            },
+            status=400,
+        ),
+        Scenario(
+            "token_refresh", "users:token_refresh", method="post",
+            data=lambda: {"refresh": str(RoleRefreshToken.for_user(user))},
+        ),
+        Scenario(
+            "token_revoke", "users:token_revoke", method="post",
+            data=lambda: {"token": str(RoleRefreshToken.for_user(user))},
+            status=204,
+        ),
+    ]
+
+
+@register("routes")
+def run(options):
+    """Прогоняет все маршруты api/v1 и users/v1 через тестовый клиент.
+
+    Пишущие сценарии выполняются в откатываемых транзакциях, письма
+    уходят в locmem, поэтому данные и почтовый сервер не затрагиваются.
+    """
+    clients = get_clients()
+    scenarios = get_scenarios()
+    missing = route_names() - {scenario.route for scenario in scenarios}
+    if missing:
+        raise CommandError(
+            f"Routes without benchmark scenarios: {', '.join(sorted(missing))}"
+        )
+    results = []
+    # Ожидаемые ответы 4xx не должны засорять вывод предупреждениями.
+    request_logger = logging.getLogger("django.request")
+    request_logger.disabled = True
+    try:
+        # Асинхронные представления должны видеть данные, созданные
+        # в транзакции замера, поэтому работают в том же потоке. Лимиты
+        # частоты отключены: повторные регистрации иначе получат 429.
+        with override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+            ASYNC_VIEWS={"THREAD_SENSITIVE": True},
+            RATE_LIMIT={**settings.RATE_LIMIT, "ENABLED": False},
+        ):
+            for scenario in scenarios:
+                if options["filter"] not in scenario.name:
+                    continue
+                client = clients[scenario.role]
+                results.append(measure(
+                    scenario.name,
+                    lambda: scenario.request(client),
+                    options["requests"],
+                    options["warmup"],
+                    isolate=scenario.writes,
+                    setup=response_cache.cache.clear
+                    if options["cold"] else None,
+                ))
+    finally:
+        request_logger.disabled = False
+    return results
@@ -0,0 +1,113 @@
+import asyncio
+import socket
+from contextlib import contextmanager
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management import CommandError
+
+from api.benchmarks import measure, register
+from users.backends import pool
+
+BACKENDS = {
+    "smtp": "django.core.mail.backends.smtp.EmailBackend",
+    "pooled": "users.backends.PooledSMTPBackend",
+}
+BATCH_SIZE = 10
+
+
+class CountingHandler:
+    """Обработчик aiosmtpd, считающий сессии и принятые письма.
+
+    `handshake` имитирует задержку TLS и авторизации удалённого сервера
+    при открытии сессии.
+    """
+
+    def __init__(self, handshake=0.0):
+        self.handshake = handshake
+        self.sessions = 0
+        self.messages = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname,
+                          responses):
+        self.sessions += 1
+        session.host_name = hostname
+        await asyncio.sleep(self.handshake)
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 Message accepted for delivery"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_smtp_server(handshake=0.0, port=None):
+    """Запускает локальный SMTP-сервер aiosmtpd в отдельном потоке."""
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        raise CommandError("The smtp suite requires the aiosmtpd package.")
+    handler = CountingHandler(handshake)
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=port or free_port()
+    )
+    controller.start()
+    try:
+        yield controller, handler
+    finally:
+        controller.stop()
+
+
+def message(number):
+    return EmailMessage(
+        "Код подверждения",
+        f"Письмо {number}",
+        "bench@yamdb.fake",
+        [f"user{number}@yamdb.fake"],
+    )
+
+
+@register("smtp")
+def run(options):
+    """Сравнивает отправку писем с новым соединением и через пул."""
+    results = []
+    with local_smtp_server(options["smtp_handshake_ms"] / 1000) as (
+        controller, handler
+    ):
+        params = {
+            "host": controller.hostname,
+            "port": controller.port,
+            "username": "",
+            "password": "",
+            "use_tls": False,
+            "fail_silently": False,
+        }
+        scenarios = (
+            ("send_mail_smtp", "smtp", 1),
+            ("send_mail_pooled", "pooled", 1),
+            (f"send_messages_pooled_x{BATCH_SIZE}", "pooled", BATCH_SIZE),
+        )
+        for name, backend, batch in scenarios:
+            if options["filter"] not in name:
+                continue
+            pool.clear()
+            sessions = handler.sessions
+
+            def send():
+                connection = get_connection(BACKENDS[backend], **params)
+                return connection.send_messages(
+                    [message(number) for number in range(batch)]
+                ) == batch
+
+            result = measure(
+                name, send, options["requests"], options["warmup"]
+            )
+            result.extra["smtp_sessions"] = handler.sessions - sessions
+            results.append(result)
+        pool.clear()
+    return results
@@ -0,0 +1,80 @@
+import uuid
+from datetime import timedelta
+
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from api.benchmarks import measure, register
+from users.authentication import ClaimsJWTAuthentication
+from users.models import RevokedToken, User
+from users.revocation import revoked_tokens
+from users.tokens import RoleAccessToken
+
+BATCH_SIZE = 5000
+
+
+def revoke_random(count):
+    expires_at = timezone.now() + timedelta(days=1)
+    for start in range(0, count, BATCH_SIZE):
+        RevokedToken.objects.bulk_create(
+            RevokedToken(jti=uuid.uuid4().hex, expires_at=expires_at)
+            for _ in range(min(BATCH_SIZE, count - start))
+        )
+
+
+@register("tokens")
+def run(options):
+    """Стоимость проверки токена при растущем списке отозванных.
+
+    Для каждого размера списка замеряется аутентификация действующим
+    и отозванным токеном; отзывы добавляются в откатываемой транзакции.
+    """
+    user, _ = User.objects.get_or_create(
+        username=f"bench_{User.USER}",
+        defaults={"email": f"bench_{User.USER}@yamdb.fake"},
+    )
+    factory = RequestFactory()
+    authentication = ClaimsJWTAuthentication()
+    valid = factory.get(
+        "/", HTTP_AUTHORIZATION=f"Bearer {RoleAccessToken.for_user(user)}"
+    )
+    revoked_token = RoleAccessToken.for_user(user)
+    revoked = factory.get(
+        "/", HTTP_AUTHORIZATION=f"Bearer {revoked_token}"
+    )
+
+    def accepts():
+        return authentication.authenticate(valid)[0].pk == user.pk
+
+    def rejects():
+        try:
+            authentication.authenticate(revoked)
+        except InvalidToken:
+            return True
+        return False
+
+    results = []
+    total = 0
+    try:
+        for size in sorted(options["revoked"] or [0, 10000, 100000]):
+            revoke_random(size - total)
+            total = size
+            revoked_tokens.reset()
+            revoked_tokens.revoke(
+                revoked_token["jti"], revoked_token["exp"]
+            )
+            revoked_tokens.sync(force=True)
+            for name, check in (("valid", accepts), ("revoked", rejects)):
+                name = f"auth_{name}_{size}"
+                if options["filter"] not in name:
+                    continue
+                result = measure(
+                    name, check, options["requests"], options["warmup"]
+                )
+                result.extra["revoked"] = size + 1
+                results.append(result)
+    finally:
+        # Отзывы из откатываемой транзакции не должны оставаться в памяти.
+        revoked_tokens.reset()
+    return results
@@ -0,0 +1,265 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Max
+from django.utils.cache import (get_conditional_response,
+                                patch_vary_headers)
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from api.prometheus import CACHE_REQUESTS
+from reviews.models import Tombstone
+
+KEY_PREFIX = "api"
+
+
+class ResponseCache:
+    """Кэш ответов API с версионированием по пространствам имён.
+
+    Каждое пространство имён (например, `titles`) имеет счётчик версии,
+    входящий в ключи закэшированных ответов. Изменение данных увеличивает
+    версию, после чего старые ключи больше не читаются и вытесняются
+    по таймауту. Карточки объектов зависят от версии объекта
+    (`titles:<pk>`) и общей версии всех карточек (`titles:detail`).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    @property
+    def cache(self):
+        return caches[settings.API_CACHE["ALIAS"]]
+
+    def version_key(self, namespace):
+        return f"{KEY_PREFIX}:version:{namespace}"
+
+    def get_versions(self, namespaces):
+        keys = [self.version_key(namespace) for namespace in namespaces]
+        versions = self.cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                # Новая версия не должна совпасть с вытесненной ранее.
+                self.cache.add(key, time.time_ns(), None)
+                versions[key] = self.cache.get(key)
+        return [versions[key] for key in keys]
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            try:
+                self.cache.incr(self.version_key(namespace))
+            except ValueError:
+                self.cache.set(
+                    self.version_key(namespace), time.time_ns(), None
+                )
+
+    def make_key(self, namespaces, request, variant):
+        query = sorted(request.query_params.lists())
+        digest = hashlib.md5(
+            f"{request.path}?{query}".encode(), usedforsecurity=False
+        ).hexdigest()
+        versions = ".".join(map(str, self.get_versions(namespaces)))
+        return (
+            f"{KEY_PREFIX}:response:{namespaces[0]}:{versions}:{variant}:"
+            f"{digest}"
+        )
+
+    def changes_key(self, namespaces):
+        """Ключ дат изменения данных для валидаторов условных запросов."""
+        versions = ".".join(map(str, self.get_versions(namespaces)))
+        return f"{KEY_PREFIX}:changes:{namespaces[0]}:{versions}"
+
+    def get(self, key, namespace):
+        data = self.cache.get(key)
+        self.count(namespace, "hits" if data is not None else "misses")
+        return data
+
+    def set(self, key, data):
+        self.cache.set(key, data, settings.API_CACHE["TIMEOUT"])
+
+    def count(self, namespace, event):
+        with self._lock:
+            self._stats[(namespace, event)] += 1
+        CACHE_REQUESTS.inc(namespace=namespace, result=event)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        result = {}
+        for (namespace, event), value in sorted(stats.items()):
+            result.setdefault(namespace, {"hits": 0, "misses": 0})[
+                event
+            ] = value
+        return result
+
+
+response_cache = ResponseCache()
+
+
+def get_variant(request):
+    """Вариант ответа: ответы могут различаться для разных ролей."""
+    user = request.user
+    if not user.is_authenticated:
+        return "anonymous"
+    return "admin" if user.is_admin else user.role
+
+
+def detail_namespace(namespace):
+    """Общая версия всех карточек пространства имён."""
+    return f"{namespace}:detail"
+
+
+def object_namespace(namespace, pk):
+    """Версия карточки одного объекта."""
+    return f"{namespace}:{pk}"
+
+
+class CachedResponseMixin:
+    """Кэширует успешные ответы `list` вьюсета."""
+
+    cache_namespace = None
+
+    def get_cache_variant(self, request):
+        return get_variant(request)
+
+    def get_cache_namespaces(self):
+        """Пространства имён, от версий которых зависит ответ."""
+        return (self.cache_namespace,)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = response_cache.make_key(
+            self.get_cache_namespaces(),
+            request,
+            self.get_cache_variant(request),
+        )
+        data = response_cache.get(key, self.cache_namespace)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.set(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    """Кэширует успешные ответы `list` и `retrieve` вьюсета."""
+
+    def get_cache_namespaces(self):
+        if self.action != "retrieve":
+            return super().get_cache_namespaces()
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        return (
+            detail_namespace(self.cache_namespace),
+            object_namespace(self.cache_namespace, self.kwargs[lookup]),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """Условные GET-запросы для `list` вьюсета.
+
+    ETag и Last-Modified вычисляются по состоянию данных в базе:
+    наибольшему `updated_at` строк `get_conditional_queryset()` и, для
+    списка, дате последней отметки об удалении из Tombstone. Оба запроса
+    идут по индексам, поэтому ответ 304 обходится без выборки
+    и сериализации. Удаление всегда оставляет отметку, так что число строк
+    не нужно. У кэшируемых вьюсетов состояние хранится в кэше ответов
+    под версиями их пространств имён и при попадании в кэш не требует
+    запросов к базе. Миксин должен стоять перед CachedResponseMixin.
+    """
+
+    tombstone_model = None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def get_tombstone_parent(self):
+        return None
+
+    def get_conditional_queryset(self):
+        """Строки списка без фильтров запроса и без связанных объектов."""
+        return self.queryset.all()
+
+    def get_changes(self):
+        """Даты последнего изменения и последнего удаления."""
+        queryset = self.get_conditional_queryset()
+        if self.action == "retrieve":
+            lookup = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup]}
+            )
+        changes = [
+            queryset.order_by().aggregate(updated=Max("updated_at"))[
+                "updated"
+            ]
+        ]
+        if self.action == "list" and self.tombstone_model is not None:
+            changes.append(
+                Tombstone.objects.filter(
+                    model=self.tombstone_model,
+                    parent_id=self.get_tombstone_parent(),
+                ).aggregate(deleted=Max("deleted_at"))["deleted"]
+            )
+        return [change for change in changes if change is not None]
+
+    def get_cached_changes(self, request):
+        if getattr(self, "cache_namespace", None) is None:
+            return self.get_changes()
+        key = response_cache.changes_key(self.get_cache_namespaces())
+        changes = response_cache.cache.get(key)
+        if changes is None:
+            changes = self.get_changes()
+            response_cache.set(key, changes)
+        return changes
+
+    def get_validators(self, request):
+        changes = self.get_cached_changes(request)
+        last_modified = (
+            int(max(changes).timestamp()) if changes else None
+        )
+        query = sorted(request.query_params.lists())
+        digest = hashlib.md5(
+            f"{[str(change) for change in changes]}:{get_variant(request)}:"
+            f"{request.accepted_renderer.media_type}:"
+            f"{request.path}?{query}".encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        return f'"{digest}"', last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response["ETag"] = etag
+        patch_vary_headers(response, ("Accept",))
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """Условные GET-запросы для `list` и `retrieve` вьюсета."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,133 @@
+import json
+from importlib import import_module
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from api.benchmarks import SUITES, compare
+
+SUITE_MODULES = (
+    "api.benchmarks.asgi",
+    "api.benchmarks.renderers",
+    "api.benchmarks.routes",
+    "api.benchmarks.smtp",
+    "api.benchmarks.tokens",
+)
+
+for module in SUITE_MODULES:
+    import_module(module)
+
+
+class Command(BaseCommand):
+    help = "Benchmark API routes and compare results with a saved baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--suite",
+            action="append",
+            choices=sorted(SUITES),
+            help="Suite to run, may be repeated (default: routes).",
+        )
+        parser.add_argument(
+            "--requests",
+            default=50,
+            type=int,
+            help="Measured requests per scenario.",
+        )
+        parser.add_argument(
+            "--warmup",
+            default=5,
+            type=int,
+            help="Unmeasured requests per scenario.",
+        )
+        parser.add_argument(
+            "--filter", default="", help="Run only matching scenarios."
+        )
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="Clear the response cache before every request.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            action="append",
+            type=int,
+            help="Concurrent requests of the asgi suite, may be repeated "
+            "(default: 1, 8 and 32).",
+        )
+        parser.add_argument(
+            "--revoked",
+            action="append",
+            type=int,
+            help="Revoked tokens in the tokens suite, may be repeated "
+            "(default: 0, 10000 and 100000).",
+        )
+        parser.add_argument(
+            "--page-size",
+            action="append",
+            type=int,
+            help="Page sizes of the renderers suite, may be repeated "
+            "(default: 100 and 1000).",
+        )
+        parser.add_argument(
+            "--smtp-handshake-ms",
+            default=20.0,
+            type=float,
+            help="Emulated TLS and login latency of the local SMTP server.",
+        )
+        parser.add_argument(
+            "--save", type=Path, help="Write results as a JSON baseline."
+        )
+        parser.add_argument(
+            "--compare", type=Path, help="Baseline to compare results with."
+        )
+        parser.add_argument(
+            "--threshold",
+            default=0.25,
+            type=float,
+            help="Allowed relative p95 growth before a regression.",
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                baseline = json.loads(options["compare"].read_text())
+            except (OSError, ValueError) as error:
+                raise CommandError(f"{options['compare']}: {error}")
+        results = {}
+        for suite in options["suite"] or ["routes"]:
+            # Данные, созданные замером, не должны оставаться в базе.
+            with transaction.atomic():
+                results[suite] = {
+                    result.name: result.as_dict()
+                    for result in SUITES[suite](options)
+                }
+                transaction.set_rollback(True)
+            self.report(suite, results[suite])
+        if options["save"]:
+            options["save"].write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Baseline saved to {options['save']}.")
+        if baseline is not None:
+            regressions = compare(results, baseline, options["threshold"])
+            if regressions:
+                raise CommandError(
+                    "Regressions found:\n" + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions found."))
+
+    def report(self, suite, results):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Suite {suite}:"))
+        self.stdout.write(
+            f"{'scenario':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'req/s':>9}{'errors':>8}"
+        )
+        for name, stats in results.items():
+            line = (
+                f"{name:<24}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}"
+                f"{stats['p99_ms']:>9.2f}{stats['queries']:>9.1f}"
+                f"{stats['rps']:>9.0f}{stats['errors']:>8}"
+            )
+            style = self.style.ERROR if stats["errors"] else str
+            self.stdout.write(style(line))
@@ -0,0 +1,86 @@
+import threading
+from bisect import bisect_left
+
+# Границы корзин гистограмм (верхние, включительно).
+TIME_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+BUCKETS = {
+    "total_ms": TIME_BUCKETS,
+    "sql_ms": TIME_BUCKETS,
+    "app_ms": TIME_BUCKETS,
+    "render_ms": TIME_BUCKETS,
+    "queries": QUERY_BUCKETS,
+    "size": SIZE_BUCKETS,
+}
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами, суммой и числом значений."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Последняя корзина - значения больше всех границ.
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction):
+        """Оценка квантиля сверху: граница корзины, где он находится."""
+        if not self.count:
+            return None
+        rank, seen = fraction * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return "+Inf"
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip(
+                [*map(str, self.buckets), "+Inf"], self.counts
+            )),
+        }
+
+
+class RouteMetrics:
+    """Гистограммы показателей запросов по маршрутам текущего процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, route, values):
+        with self._lock:
+            for name, value in values.items():
+                key = (route, name)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(BUCKETS[name])
+                self._histograms[key].observe(value)
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for (route, name), histogram in sorted(self._histograms.items()):
+                result.setdefault(route, {})[name] = histogram.snapshot()
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+route_metrics = RouteMetrics()
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import markcoroutinefunction
+from django.db import connections
+
+from api.metrics import route_metrics
+from api.prometheus import (
+    REQUEST_DURATION,
+    REQUEST_QUERIES,
+    REQUEST_SQL_DURATION,
+    REQUESTS,
+    registry,
+)
+
+logger = logging.getLogger("api.requests")
+
+# Маршрут запросов, не сопоставленных ни одному URL, чтобы число
+# гистограмм не росло вместе с числом случайных путей.
+UNMATCHED = "<unmatched>"
+
+
+class RequestTimings:
+    """Замеры одного запроса: SQL, код представления и рендеринг."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.view_started = self.view_finished = self.rendered = None
+        self.sql_before_view = self.sql_in_view = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - started
+            self.queries += 1
+
+    @contextmanager
+    def track(self):
+        """Подключает замер ко всем соединениям с базой текущего потока."""
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield
+
+    def start_view(self):
+        self.view_started = time.perf_counter()
+        self.sql_before_view = self.sql
+
+    def finish_view(self):
+        if self.view_finished is None:
+            self.view_finished = time.perf_counter()
+            self.sql_in_view = self.sql - self.sql_before_view
+
+    def finish_render(self, response):
+        self.rendered = time.perf_counter()
+
+    def values(self, response):
+        """Показатели запроса в миллисекундах, число запросов и размер."""
+        finished = time.perf_counter()
+        self.finish_view()
+        values = {
+            "total_ms": (finished - self.started) * 1000,
+            "sql_ms": self.sql * 1000,
+            "queries": self.queries,
+        }
+        if self.view_started is not None:
+            view = self.view_finished - self.view_started
+            values["app_ms"] = (view - self.sql_in_view) * 1000
+        if self.rendered is not None:
+            values["render_ms"] = (self.rendered - self.view_finished) * 1000
+        if not response.streaming:
+            values["size"] = len(response.content)
+        return values
+
+
+def server_timing(values):
+    parts = [
+        f'db;dur={values["sql_ms"]:.2f};desc="{values["queries"]} queries"'
+    ]
+    for name in ("app", "render", "total"):
+        if f"{name}_ms" in values:
+            parts.append(f"{name};dur={values[f'{name}_ms']:.2f}")
+    return ", ".join(parts)
+
+
+class RequestMetricsMiddleware:
+    """Замеряет запросы к базе, время кода и рендеринга ответа.
+
+    Результаты добавляются в заголовок `Server-Timing`, пишутся в лог
+    `api.requests`, накапливаются в гистограммах по маршрутам и
+    в метриках Prometheus по обработчикам (`ViewSet.action`).
+    Время `app` - работа представления и сериализаторов без учёта SQL,
+    `render` - преобразование ответа DRF в JSON.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timings = request.timings = RequestTimings()
+        with timings.track():
+            response = self.get_response(request)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        # Асинхронные представления выполняют запросы к базе в потоках
+        # пула и сами подключают к ним request.timings.
+        request.timings = RequestTimings()
+        response = await self.get_response(request)
+        return self.finish(request, response)
+
+    def finish(self, request, response):
+        values = request.timings.values(response)
+        route = self.get_route(request)
+        route_metrics.observe(route, values)
+        self.export(request, response, values)
+        response["Server-Timing"] = server_timing(values)
+        logger.info(
+            "%s %s %s", route, response.status_code,
+            " ".join(f"{name}={value:g}" for name, value in values.items()),
+            extra={"route": route, "status": response.status_code, **values},
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timings.start_view()
+
+    def process_template_response(self, request, response):
+        request.timings.finish_view()
+        response.add_post_render_callback(request.timings.finish_render)
+        return response
+
+    def export(self, request, response, values):
+        handler = self.get_handler(request)
+        REQUESTS.inc(
+            handler=handler,
+            method=request.method,
+            status=response.status_code,
+        )
+        REQUEST_DURATION.observe(values["total_ms"] / 1000, handler=handler)
+        REQUEST_SQL_DURATION.observe(values["sql_ms"] / 1000, handler=handler)
+        REQUEST_QUERIES.observe(values["queries"], handler=handler)
+        registry.maybe_flush()
+
+    @staticmethod
+    def get_handler(request):
+        """Имя обработчика: `ViewSet.action` для вьюсетов DRF."""
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return UNMATCHED
+        view_class = getattr(match.func, "cls", None)
+        if view_class is None:
+            return match.view_name
+        actions = getattr(match.func, "actions", None)
+        if actions is None:
+            return view_class.__name__
+        method = request.method.lower()
+        return f"{view_class.__name__}.{actions.get(method, method)}"
+
+    @staticmethod
+    def get_route(request):
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return UNMATCHED
+        return f"{request.method} {match.view_name}"
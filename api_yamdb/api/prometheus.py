@@ -0,0 +1,320 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+FILE_PREFIX = "metrics-"
+DURATION_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{escape(value)}"' for name, value in labels)
+    return f"{{{pairs}}}"
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Registry:
+    """Счётчики процесса в формате Prometheus.
+
+    Значения хранятся в словаре в памяти. Если задан `METRICS["DIR"]`,
+    процесс периодически сбрасывает их в собственный файл каталога,
+    а экспорт суммирует файлы всех процессов, поэтому любой воркер
+    gunicorn отдаёт общие для сервиса значения.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = defaultdict(float)
+        self._metrics = []
+        self._flushed = 0.0
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add(self, samples):
+        with self._lock:
+            for key, amount in samples:
+                self._values[key] += amount
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    @property
+    def directory(self):
+        directory = settings.METRICS.get("DIR")
+        return Path(directory) if directory else None
+
+    def maybe_flush(self):
+        if (
+            self.directory is not None
+            and time.monotonic() - self._flushed
+            >= settings.METRICS["FLUSH_INTERVAL"]
+        ):
+            self.flush()
+
+    def flush(self):
+        """Атомарно перезаписывает файл значений текущего процесса."""
+        directory = self.directory
+        if directory is None:
+            return
+        with self._lock:
+            rows = [[*key, value] for key, value in self._values.items()]
+            self._flushed = time.monotonic()
+        directory.mkdir(parents=True, exist_ok=True)
+        descriptor, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w") as file:
+                json.dump(rows, file)
+            os.replace(temp, directory / f"{FILE_PREFIX}{os.getpid()}.json")
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    def collect(self):
+        if self.directory is None:
+            with self._lock:
+                return dict(self._values)
+        self.flush()
+        values = defaultdict(float)
+        for path in self.directory.glob(f"{FILE_PREFIX}*.json"):
+            try:
+                rows = json.loads(path.read_text())
+            except (OSError, ValueError):
+                # Файл процесса, завершившегося во время чтения.
+                continue
+            for name, suffix, labels, value in rows:
+                values[
+                    (name, suffix, tuple(map(tuple, labels)))
+                ] += value
+        return values
+
+    def render(self):
+        values = self.collect()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render(values))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    def labels(self, labels):
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def series(self, values, suffix):
+        return sorted(
+            (labels, value)
+            for (name, sample, labels), value in values.items()
+            if name == self.name and sample == suffix
+        )
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        registry.add([((self.name, "", self.labels(labels)), amount)])
+
+    def render(self, values):
+        series = self.series(values, "")
+        if not series and not self.labelnames:
+            series = [((), 0)]
+        for labels, value in series:
+            yield f"{self.name}{format_labels(labels)} {format_value(value)}"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        labels = self.labels(labels)
+        # Корзины хранятся накопительно: значение попадает во все корзины
+        # с границей не меньше него.
+        samples = [
+            ((self.name, "_bucket", labels + (("le", str(bound)),)), 1)
+            for bound in self.buckets[bisect_left(self.buckets, value):]
+        ]
+        samples += [
+            ((self.name, "_sum", labels), value),
+            ((self.name, "_count", labels), 1),
+        ]
+        registry.add(samples)
+
+    def time(self, **labels):
+        return Timer(self, labels)
+
+    def render(self, values):
+        sums = dict(self.series(values, "_sum"))
+        for labels, count in self.series(values, "_count"):
+            for bound in self.buckets:
+                bucket = labels + (("le", str(bound)),)
+                value = values.get((self.name, "_bucket", bucket), 0)
+                yield (
+                    f"{self.name}_bucket{format_labels(bucket)} "
+                    f"{format_value(value)}"
+                )
+            bucket = labels + (("le", "+Inf"),)
+            for suffix, sample_labels, value in (
+                ("_bucket", bucket, count),
+                ("_sum", labels, sums.get(labels, 0)),
+                ("_count", labels, count),
+            ):
+                yield (
+                    f"{self.name}{suffix}{format_labels(sample_labels)} "
+                    f"{format_value(value)}"
+                )
+
+
+class Gauge(Metric):
+    """Значение, вычисляемое при экспорте, например по данным из БД.
+
+    Не хранится в процессе, поэтому не суммируется между воркерами.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, function):
+        super().__init__(name, documentation)
+        self.function = function
+
+    def render(self, values):
+        yield f"{self.name} {format_value(self.function())}"
+
+
+class Timer:
+    """Контекстный менеджер, замеряющий длительность блока в секундах."""
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(
+            time.perf_counter() - self.started, **self.labels
+        )
+
+
+REQUESTS = Counter(
+    "yamdb_http_requests_total",
+    "HTTP requests by handler, method and status.",
+    ("handler", "method", "status"),
+)
+REQUEST_DURATION = Histogram(
+    "yamdb_http_request_duration_seconds",
+    "HTTP request latency by handler.",
+    ("handler",),
+)
+REQUEST_QUERIES = Histogram(
+    "yamdb_http_request_db_queries",
+    "Database queries per HTTP request by handler.",
+    ("handler",),
+    buckets=QUERY_BUCKETS,
+)
+REQUEST_SQL_DURATION = Histogram(
+    "yamdb_http_request_db_duration_seconds",
+    "Time spent in SQL per HTTP request by handler.",
+    ("handler",),
+)
+CACHE_REQUESTS = Counter(
+    "yamdb_response_cache_requests_total",
+    "Response cache lookups by namespace and result (hits or misses).",
+    ("namespace", "result"),
+)
+SIGNUPS = Counter(
+    "yamdb_signups_total", "Successful signup requests."
+)
+TOKENS = Counter(
+    "yamdb_tokens_total",
+    "Token requests by result (issued, refreshed, revoked or rejected).",
+    ("result",),
+)
+RATE_LIMITED = Counter(
+    "yamdb_rate_limited_total",
+    "Requests rejected by rate limits by scope and key.",
+    ("scope", "key"),
+)
+MAIL_SEND_DURATION = Histogram(
+    "yamdb_mail_send_duration_seconds", "Time spent sending mail."
+)
+MAIL_DELIVERIES = Counter(
+    "yamdb_mail_deliveries_total",
+    "Queued mail delivery attempts by result (sent, retry or failed).",
+    ("result",),
+)
+MAIL_QUEUE_LATENCY = Histogram(
+    "yamdb_mail_queue_latency_seconds",
+    "Time from enqueueing a message to sending it.",
+    buckets=(1, 5, 15, 30, 60, 300, 900, 3600, 21600, 86400),
+)
+
+
+def mail_backlog():
+    from users.models import OutboundEmail
+
+    return OutboundEmail.objects.filter(status=OutboundEmail.PENDING).count()
+
+
+MAIL_BACKLOG = Gauge(
+    "yamdb_mail_queue_backlog", "Messages waiting to be sent.", mail_backlog
+)
+
+
+def metrics_view(request):
+    """Экспорт метрик в текстовом формате Prometheus."""
+    token = settings.METRICS.get("TOKEN")
+    if token and not constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
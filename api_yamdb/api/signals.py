@@ -0,0 +1,79 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from api.cache import detail_namespace, object_namespace, response_cache
+from reviews.models import (
+    Category,
+    Genre,
+    GenreTitle,
+    Title,
+    genre_links_changed,
+    ratings_changed,
+)
+
+# Пространства имён кэша ответов, которые зависят от данных модели.
+# Жанры и категории входят во все карточки произведений; изменение
+# произведения сбрасывает только его карточку.
+INVALIDATED_NAMESPACES = {
+    Category: ("categories", "titles", detail_namespace("titles")),
+    Genre: ("genres", "titles", detail_namespace("titles")),
+    Title: ("titles",),
+}
+# При изменении рейтинга большего числа произведений сбрасываются
+# все карточки разом.
+MAX_OBJECT_INVALIDATIONS = 100
+
+
+def invalidate_on_commit(*namespaces):
+    """Сбрасывает версии после фиксации транзакции.
+
+    Иначе параллельный GET между сбросом и фиксацией закэширует старые
+    данные под новой версией.
+    """
+    transaction.on_commit(lambda: response_cache.invalidate(*namespaces))
+
+
+def title_namespaces(pks):
+    if len(pks) > MAX_OBJECT_INVALIDATIONS:
+        return ("titles", detail_namespace("titles"))
+    return ("titles", *(object_namespace("titles", pk) for pk in pks))
+
+
+def invalidate_response_cache(sender, instance, **kwargs):
+    namespaces = INVALIDATED_NAMESPACES[sender]
+    if sender is Title:
+        namespaces += (object_namespace("titles", instance.pk),)
+    invalidate_on_commit(*namespaces)
+
+
+def invalidate_genre_link(sender, instance, raw=False, **kwargs):
+    # Сюда же приходят изменения через менеджеры `Title.genre`
+    # и `Genre.titles`: они удаляют связи через QuerySet.delete().
+    if not raw:
+        invalidate_on_commit(*title_namespaces([instance.title_id]))
+
+
+def invalidate_genre_links(sender, title_ids, **kwargs):
+    invalidate_on_commit(*title_namespaces(title_ids))
+
+
+def invalidate_ratings(sender, queryset, **kwargs):
+    # Отзывы попадают в ответы о произведениях только через рейтинг.
+    def invalidate():
+        pks = list(
+            queryset.values_list("pk", flat=True)[
+                : MAX_OBJECT_INVALIDATIONS + 1
+            ]
+        )
+        response_cache.invalidate(*title_namespaces(pks))
+
+    transaction.on_commit(invalidate)
+
+
+for model in INVALIDATED_NAMESPACES:
+    post_save.connect(invalidate_response_cache, sender=model)
+    post_delete.connect(invalidate_response_cache, sender=model)
+post_save.connect(invalidate_genre_link, sender=GenreTitle)
+post_delete.connect(invalidate_genre_link, sender=GenreTitle)
+genre_links_changed.connect(invalidate_genre_links, sender=GenreTitle)
+ratings_changed.connect(invalidate_ratings, sender=Title)
@@ -0,0 +1,117 @@
+from itertools import islice
+
+from django.db import transaction
+
+from reviews.models import ChangeEvent, Review, Title
+from users.models import User
+
+from .serializers import BulkReviewSerializer
+
+
+class ReviewIngest:
+    """Массовая загрузка отзывов пачками.
+
+    Существование произведений и авторов, а также уникальность пары
+    автор-произведение проверяются одним запросом на пачку. Рейтинги
+    произведений обновляются один раз в конце загрузки.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.seen = set()
+        self.deltas = {}
+        self.results = []
+        self.created = 0
+
+    def run(self, rows):
+        rows = iter(rows)
+        with transaction.atomic():
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self.ingest(batch)
+            Title.objects.shift_ratings(self.deltas)
+        self.results.sort(key=lambda result: result["line"])
+        return {
+            "created": self.created,
+            "errors": len(self.results) - self.created,
+            "results": self.results,
+        }
+
+    def error(self, line, errors):
+        self.results.append({"line": line, "status": 400, "errors": errors})
+
+    def validate(self, batch):
+        valid = []
+        for line, data in batch:
+            if isinstance(data, Exception):
+                self.error(line, {"non_field_errors": [str(data)]})
+                continue
+            serializer = BulkReviewSerializer(data=data)
+            if serializer.is_valid():
+                valid.append((line, serializer.validated_data))
+            else:
+                self.error(line, serializer.errors)
+        return valid
+
+    def ingest(self, batch):
+        valid = self.validate(batch)
+        titles = set(
+            Title.objects.filter(
+                pk__in={data["title"] for _, data in valid}
+            ).values_list("pk", flat=True)
+        )
+        authors = dict(
+            User.objects.filter(
+                username__in={data["author"] for _, data in valid}
+            ).values_list("username", "pk")
+        )
+        existing = set(
+            Review.objects.filter(
+                title_id__in=titles, author_id__in=authors.values()
+            ).values_list("author_id", "title_id")
+        )
+        reviews = []
+        for line, data in valid:
+            key = (authors.get(data["author"]), data["title"])
+            if data["title"] not in titles:
+                self.error(line, {"title": ["Произведение не найдено."]})
+            elif key[0] is None:
+                self.error(line, {"author": ["Пользователь не найден."]})
+            elif key in existing or key in self.seen:
+                self.error(
+                    line, {"non_field_errors": ["Отзыв уже существует."]}
+                )
+            else:
+                self.seen.add(key)
+                reviews.append((line, Review(
+                    author_id=key[0],
+                    title_id=data["title"],
+                    text=data["text"],
+                    score=data["score"],
+                )))
+        self.save(reviews)
+
+    def save(self, reviews):
+        objs = [review for _, review in reviews]
+        Review.objects.bulk_create(objs, update_ratings=False)
+        Review.objects.rating_deltas(objs, self.deltas)
+        ids = dict(
+            ((author, title), pk)
+            for author, title, pk in Review.objects.filter(
+                title_id__in={obj.title_id for obj in objs},
+                author_id__in={obj.author_id for obj in objs},
+            ).values_list("author_id", "title_id", "pk")
+        )
+        for line, review in reviews:
+            review.pk = ids.get((review.author_id, review.title_id))
+            self.results.append({
+                "line": line,
+                "status": 201,
+                "id": review.pk,
+            })
+        # bulk_create не вызывает post_save: события пишутся пачкой
+        # в той же транзакции.
+        ChangeEvent.objects.record_many(objs, ChangeEvent.CREATE)
+        self.created += len(objs)
@@ -0,0 +1,54 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class FeedCursorPagination(CursorPagination):
+    """Курсорная пагинация лент по дате публикации."""
+
+    ordering = ("-pub_date", "-id")
+
+
+class SyncCursorPagination(CursorPagination):
+    """Курсорная пагинация изменений по возрастанию даты изменения."""
+
+    ordering = ("updated_at", "id")
+
+
+class TombstoneCursorPagination(CursorPagination):
+    """Курсорная пагинация отметок об удалении по дате удаления."""
+
+    ordering = ("deleted_at", "id")
+
+
+class FeedPagination(PageNumberPagination):
+    """Постраничная пагинация лент отзывов и комментариев.
+
+    Запрос с параметром `pagination=cursor` (или с курсором из ссылок
+    `next`/`previous`) переключает ленту на курсорную пагинацию, которая
+    не выполняет `COUNT(*)` и не сканирует пропущенные строки.
+    """
+
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or FeedCursorPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = FeedCursorPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,28 @@
+import json
+
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """Построчно разбирает поток NDJSON, не читая тело запроса целиком.
+
+    Возвращает генератор пар (номер строки, объект); строка, которую
+    не удалось разобрать, передаётся как исключение `ValueError`.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        return self.lines(stream, encoding)
+
+    def lines(self, stream, encoding):
+        if stream is None:
+            return
+        for number, raw in enumerate(stream, 1):
+            if not raw.strip():
+                continue
+            try:
+                yield number, json.loads(raw.decode(encoding))
+            except ValueError as error:
+                yield number, ValueError(f"Invalid JSON: {error}")
@@ -1,8 +1,15 @@
-# from django.db.models import Avg
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (
+    Category,
+    ChangeEvent,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    Tombstone,
+)
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -25,7 +32,6 @@ class TitleReadSerializer(serializers.ModelSerializer):
     """Сериализатор для объектов модели Title на чтение."""
 
     rating = serializers.IntegerField(read_only=True)
-    # rating = serializers.SerializerMethodField()
     genre = GenreSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
 
@@ -39,14 +45,9 @@ class TitleReadSerializer(serializers.ModelSerializer):
             "description",
             "genre",
             "category",
+            "updated_at",
         )
 
-    # def get_rating(self, obj):
-    #     rating = obj.reviews.aggregate(rating=Avg("score")).get("rating")
-    #     if not rating:
-    #         return rating
-    #     return round(rating)
-
 
 class TitleCreateSerializer(serializers.ModelSerializer):
     """Сериализатор для объектов модели Title на добавление."""
@@ -80,7 +81,7 @@ class CommentSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = ("id", "text", "author", "pub_date")
+        fields = ("id", "text", "author", "pub_date", "updated_at")
         model = Comment
 
 
@@ -94,7 +95,7 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = ("id", "text", "author", "score", "pub_date")
+        fields = ("id", "text", "author", "score", "pub_date", "updated_at")
         model = Review
 
     def validate(self, data):
@@ -107,3 +108,63 @@ class ReviewSerializer(serializers.ModelSerializer):
                 "Вы уже написали отзыв к этому произведению."
             )
         return data
+
+
+class BulkReviewSerializer(serializers.Serializer):
+    """Сериализатор строки массовой загрузки отзывов."""
+
+    title = serializers.IntegerField(min_value=1)
+    author = serializers.CharField(max_length=150)
+    text = serializers.CharField()
+    score = serializers.IntegerField(min_value=1, max_value=10)
+
+
+class TombstoneSerializer(serializers.ModelSerializer):
+    """Сериализатор отметки об удалении объекта."""
+
+    id = serializers.IntegerField(source="object_id")
+
+    class Meta:
+        fields = ("id", "deleted_at")
+        model = Tombstone
+
+
+class ChangeEventSerializer(serializers.ModelSerializer):
+    """Сериализатор события журнала изменений."""
+
+    class Meta:
+        fields = (
+            "id",
+            "model",
+            "object_id",
+            "action",
+            "payload",
+            "created_at",
+        )
+        model = ChangeEvent
+
+
+class ChangeQuerySerializer(serializers.Serializer):
+    """Параметры чтения журнала изменений."""
+
+    after = serializers.IntegerField(min_value=0, required=False)
+    consumer = serializers.CharField(max_length=64, required=False)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+
+class ChangeAckSerializer(serializers.Serializer):
+    """Подтверждение обработки событий журнала изменений."""
+
+    consumer = serializers.CharField(max_length=64)
+    cursor = serializers.IntegerField(min_value=0)
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """Сериализатор результата полнотекстового поиска."""
+
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    title_id = serializers.IntegerField(allow_null=True)
+    review_id = serializers.IntegerField(allow_null=True)
+    snippet = serializers.CharField()
+    rank = serializers.FloatField()
@@ -1,12 +1,19 @@
 from django.urls import include, path
 from rest_framework import routers
 
+from api.v1 import async_views
 from api.v1.views import (
     CategoryViewSet,
     CommentViewSet,
     GenreViewSet,
     ReviewViewSet,
+    SearchView,
     TitleViewSet,
+    acknowledge_changes,
+    bulk_reviews,
+    cache_stats,
+    change_events,
+    request_metrics,
 )
 
 app_name = "api"
@@ -24,6 +31,51 @@ router_v1.register(
     r"titles/(?P<title_id>\d+)/reviews", ReviewViewSet, basename="reviews"
 )
 
+# Асинхронные версии чтения каталога для запуска под ASGI.
+async_urls = [
+    path("titles/", async_views.title_list, name="async-titles-list"),
+    path(
+        "titles/<int:pk>/",
+        async_views.title_detail,
+        name="async-titles-detail",
+    ),
+    path("genres/", async_views.genre_list, name="async-genres-list"),
+    path(
+        "categories/",
+        async_views.category_list,
+        name="async-categories-list",
+    ),
+    path(
+        "titles/<int:title_id>/reviews/",
+        async_views.review_list,
+        name="async-reviews-list",
+    ),
+    path(
+        "titles/<int:title_id>/reviews/<int:pk>/",
+        async_views.review_detail,
+        name="async-reviews-detail",
+    ),
+    path(
+        "titles/<int:title_id>/reviews/<int:review_id>/comments/",
+        async_views.comment_list,
+        name="async-comments-list",
+    ),
+    path(
+        "titles/<int:title_id>/reviews/<int:review_id>/comments/<int:pk>/",
+        async_views.comment_detail,
+        name="async-comments-detail",
+    ),
+]
+
 urlpatterns = [
+    path("v1/async/", include(async_urls)),
+    path("v1/cache/stats/", cache_stats, name="cache_stats"),
+    path("v1/changes/", change_events, name="change_events"),
+    path(
+        "v1/changes/ack/", acknowledge_changes, name="acknowledge_changes"
+    ),
+    path("v1/metrics/", request_metrics, name="request_metrics"),
+    path("v1/reviews/bulk/", bulk_reviews, name="bulk_reviews"),
+    path("v1/search/", SearchView.as_view(), name="search"),
     path("v1/", include(router_v1.urls)),
 ]
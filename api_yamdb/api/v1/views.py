@@ -1,22 +1,127 @@
-from django.db.models import Avg
+from django.conf import settings
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, viewsets
+from rest_framework import filters, generics, mixins, viewsets
+from rest_framework.decorators import (
+    api_view,
+    parser_classes,
+    permission_classes,
+)
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from reviews.models import Category, Genre, Review, Title
+from rest_framework.response import Response
+from reviews.changes import acknowledge, get_position
+from reviews.models import (
+    Category,
+    ChangeEvent,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    Tombstone,
+)
+from reviews.search import COMMENT, KINDS, REVIEW, TITLE, SearchResults
+
+from api.cache import (
+    CachedResponseMixin,
+    CachedRetrieveMixin,
+    ConditionalGetMixin,
+    ConditionalRetrieveMixin,
+    response_cache,
+)
+from api.metrics import route_metrics
 
 from .filters import TitleFilter
-from .permissions import IsAdminModeratorAuthorPermission, IsAdminPermission
+from .ingest import ReviewIngest
+from .pagination import (
+    FeedPagination,
+    SyncCursorPagination,
+    TombstoneCursorPagination,
+)
+from .parsers import NDJSONParser
+from .permissions import (
+    IsAdminModeratorAuthorPermission,
+    IsAdminPermission,
+    IsOwnerOrAdmin,
+)
 from .serializers import (
     CategorySerializer,
+    ChangeAckSerializer,
+    ChangeEventSerializer,
+    ChangeQuerySerializer,
     CommentSerializer,
     GenreSerializer,
     ReviewSerializer,
+    SearchResultSerializer,
     TitleCreateSerializer,
     TitleReadSerializer,
+    TombstoneSerializer,
 )
 
 
+class UpdatedSinceMixin:
+    """Инкрементальная синхронизация для `list` вьюсета.
+
+    С параметром `updated_since` (дата и время ISO 8601) список содержит
+    только объекты, изменённые позже этой даты, по возрастанию
+    `updated_at` с курсорной пагинацией. С `deleted=true` вместо объектов
+    возвращаются отметки об их удалении, по возрастанию `deleted_at`.
+    """
+
+    since_query_param = "updated_since"
+    deleted_query_param = "deleted"
+    tombstone_model = None
+
+    def get_updated_since(self):
+        value = self.request.query_params.get(self.since_query_param)
+        if value is None:
+            return None
+        try:
+            since = parse_datetime(value)
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValidationError(
+                {
+                    self.since_query_param: (
+                        "Ожидается дата и время в формате ISO 8601."
+                    )
+                }
+            )
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    def get_tombstone_parent(self):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        since = self.get_updated_since()
+        if since is None:
+            return super().list(request, *args, **kwargs)
+        if request.query_params.get(self.deleted_query_param) == "true":
+            self.pagination_class = TombstoneCursorPagination
+            page = self.paginate_queryset(
+                Tombstone.objects.filter(
+                    model=self.tombstone_model,
+                    parent_id=self.get_tombstone_parent(),
+                    deleted_at__gt=since,
+                )
+            )
+            serializer = TombstoneSerializer(page, many=True)
+        else:
+            self.pagination_class = SyncCursorPagination
+            page = self.paginate_queryset(
+                self.filter_queryset(self.get_queryset()).filter(
+                    updated_at__gt=since
+                )
+            )
+            serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
 class ListCreateDeleteViewSet(
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
@@ -29,9 +134,13 @@ class ListCreateDeleteViewSet(
     pass
 
 
-class GenreViewSet(ListCreateDeleteViewSet):
+class GenreViewSet(
+    ConditionalGetMixin, CachedResponseMixin, ListCreateDeleteViewSet
+):
     """Вьюсет для объектов модели Genre."""
 
+    cache_namespace = "genres"
+    tombstone_model = Tombstone.GENRE
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     lookup_field = "slug"
@@ -40,9 +149,13 @@ class GenreViewSet(ListCreateDeleteViewSet):
     permission_classes = (IsAdminPermission,)
 
 
-class CategoryViewSet(ListCreateDeleteViewSet):
+class CategoryViewSet(
+    ConditionalGetMixin, CachedResponseMixin, ListCreateDeleteViewSet
+):
     """Вьюсет для объектов модели Category."""
 
+    cache_namespace = "categories"
+    tombstone_model = Tombstone.CATEGORY
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = "slug"
@@ -51,10 +164,19 @@ class CategoryViewSet(ListCreateDeleteViewSet):
     permission_classes = (IsAdminPermission,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalRetrieveMixin,
+    CachedRetrieveMixin,
+    UpdatedSinceMixin,
+    viewsets.ModelViewSet,
+):
     """Вьюсет для объектов модели Title."""
 
-    queryset = Title.objects.annotate(rating=Avg("reviews__score")).all()
+    cache_namespace = "titles"
+    tombstone_model = Tombstone.TITLE
+    queryset = Title.objects.select_related("category").prefetch_related(
+        "genre"
+    )
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     permission_classes = (IsAdminPermission, IsAuthenticatedOrReadOnly)
@@ -65,11 +187,15 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitleReadSerializer
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalRetrieveMixin, UpdatedSinceMixin, viewsets.ModelViewSet
+):
     """Вьюсет для объектов модели Comment."""
 
+    tombstone_model = Tombstone.COMMENT
     serializer_class = CommentSerializer
     permission_classes = (IsAdminModeratorAuthorPermission,)
+    pagination_class = FeedPagination
 
     def get_review(self):
         return get_object_or_404(
@@ -78,8 +204,18 @@ class CommentViewSet(viewsets.ModelViewSet):
             title_id=self.kwargs.get("title_id"),
         )
 
+    def get_tombstone_parent(self):
+        return self.kwargs.get("review_id")
+
+    def get_conditional_queryset(self):
+        return Comment.objects.filter(review_id=self.kwargs.get("review_id"))
+
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return (
+            self.get_review()
+            .comments.select_related("author")
+            .order_by("-pub_date", "-id")
+        )
 
     def perform_create(self, serializer):
         serializer.save(
@@ -88,20 +224,153 @@ class CommentViewSet(viewsets.ModelViewSet):
         )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ConditionalRetrieveMixin, UpdatedSinceMixin, viewsets.ModelViewSet
+):
     """Вьюсет для объектов модели Review."""
 
+    tombstone_model = Tombstone.REVIEW
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminModeratorAuthorPermission,)
+    pagination_class = FeedPagination
 
     def get_title(self):
         return get_object_or_404(Title, id=self.kwargs.get("title_id"))
 
+    def get_tombstone_parent(self):
+        return self.kwargs.get("title_id")
+
+    def get_conditional_queryset(self):
+        return Review.objects.filter(title_id=self.kwargs.get("title_id"))
+
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return (
+            self.get_title()
+            .reviews.select_related("author")
+            .order_by("-pub_date", "-id")
+        )
 
     def perform_create(self, serializer):
         serializer.save(
             author=self.request.user,
             title=self.get_title(),
         )
+
+
+@api_view(["GET"])
+@permission_classes((IsOwnerOrAdmin,))
+def cache_stats(request):
+    """Счётчики попаданий и промахов кэша ответов текущего процесса."""
+    return Response(response_cache.stats())
+
+
+@api_view(["GET"])
+@permission_classes((IsOwnerOrAdmin,))
+def request_metrics(request):
+    """Гистограммы показателей запросов по маршрутам текущего процесса."""
+    return Response(route_metrics.snapshot())
+
+
+@api_view(["POST"])
+@parser_classes((NDJSONParser,))
+@permission_classes((IsOwnerOrAdmin,))
+def bulk_reviews(request):
+    """Массовая загрузка отзывов из потока NDJSON.
+
+    Каждая строка содержит `title` (id), `author` (username), `text`
+    и `score`; в ответе возвращается результат по каждой строке.
+    """
+    return Response(ReviewIngest().run(request.data))
+
+
+@api_view(["GET"])
+@permission_classes((IsOwnerOrAdmin,))
+def change_events(request):
+    """Чтение журнала изменений после курсора.
+
+    Параметры: `after` - курсор (id последнего прочитанного события),
+    без него чтение продолжается с подтверждённой позиции потребителя
+    `consumer`; `limit` - размер пачки. В ответе `cursor` - курсор для
+    следующего запроса, `more` - есть ли ещё события.
+    """
+    query = ChangeQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    after = query.validated_data.get("after")
+    if after is None:
+        consumer = query.validated_data.get("consumer")
+        after = get_position(consumer) if consumer else 0
+    limit = min(
+        query.validated_data.get(
+            "limit", settings.CHANGE_EVENTS["BATCH_SIZE"]
+        ),
+        settings.CHANGE_EVENTS["MAX_BATCH_SIZE"],
+    )
+    events = list(
+        ChangeEvent.objects.filter(pk__gt=after).order_by("pk")[: limit + 1]
+    )
+    return Response({
+        "cursor": events[:limit][-1].pk if events else after,
+        "more": len(events) > limit,
+        "results": ChangeEventSerializer(events[:limit], many=True).data,
+    })
+
+
+@api_view(["POST"])
+@permission_classes((IsOwnerOrAdmin,))
+def acknowledge_changes(request):
+    """Подтверждение обработки событий до курсора `cursor` включительно."""
+    serializer = ChangeAckSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    consumer = serializer.validated_data["consumer"]
+    try:
+        position = acknowledge(
+            consumer, serializer.validated_data["cursor"]
+        )
+    except ValueError as error:
+        raise ValidationError({"cursor": [str(error)]})
+    return Response({"consumer": consumer, "position": position})
+
+
+class SearchView(generics.ListAPIView):
+    """Полнотекстовый поиск по произведениям, отзывам и комментариям.
+
+    Параметры: `q` - строка поиска, `type` - title, review или comment.
+    """
+
+    serializer_class = SearchResultSerializer
+
+    def get_queryset(self):
+        kind = self.request.query_params.get("type")
+        if kind is not None and kind not in KINDS:
+            raise ValidationError(
+                {"type": f"Допустимые значения: {', '.join(KINDS)}."}
+            )
+        return SearchResults(self.request.query_params.get("q", ""), kind)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        comments = {
+            result["parent_id"]
+            for result in page
+            if result["type"] == COMMENT
+        }
+        titles = {}
+        if comments:
+            titles = dict(
+                Review.objects.filter(pk__in=comments).values_list(
+                    "pk", "title_id"
+                )
+            )
+        for result in page:
+            if result["type"] == TITLE:
+                result.update(title_id=result["id"], review_id=None)
+            elif result["type"] == REVIEW:
+                result.update(
+                    title_id=result["parent_id"], review_id=result["id"]
+                )
+            else:
+                result.update(
+                    title_id=titles.get(result["parent_id"]),
+                    review_id=result["parent_id"],
+                )
+        return page
@@ -1,3 +1,4 @@
+import importlib.util
 import os
 from datetime import timedelta
 from pathlib import Path
@@ -33,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,8 +73,114 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb',
+    }
+}
+
+# Кэш ответов каталога; при нескольких процессах следует указать
+# общий бэкенд (Redis, Memcached), иначе сброс виден только локально.
+API_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+# Бэкенд полнотекстового поиска; None - FTS5 для SQLite, иначе
+# поиск подстрокой (reviews.search.SimpleSearchBackend).
+SEARCH_BACKEND = None
+
+# Метрики Prometheus (/metrics). При нескольких воркерах gunicorn
+# METRICS_DIR должен указывать на общий каталог, очищаемый при деплое:
+# каждый процесс сбрасывает туда свои значения не чаще FLUSH_INTERVAL
+# секунд, а экспорт их суммирует. METRICS_TOKEN закрывает экспорт
+# заголовком `Authorization: Bearer <токен>`.
+METRICS = {
+    'DIR': os.getenv('METRICS_DIR'),
+    'FLUSH_INTERVAL': 1.0,
+    'TOKEN': os.getenv('METRICS_TOKEN'),
+}
+
+# Кэш версий токенов доступа (users.authentication). TIMEOUT - сколько
+# секунд версия читается без запроса к базе. При нескольких процессах
+# нужен общий бэкенд, иначе отзыв токенов виден другим процессам только
+# по истечении TIMEOUT.
+TOKEN_VERSIONS = {
+    'ALIAS': 'default',
+    'TIMEOUT': 30,
+}
+
+# Отозванные токены (users.revocation): фильтр Блума размером
+# BLOOM_BITS бит (1 МБ держит около миллиона отзывов при доле ложных
+# срабатываний ~1%), LRU-кэш уточнённых ответов и интервал в секундах,
+# с которым сверяется счётчик отзывов в кэше ALIAS. Без общего бэкенда
+# кэша отзывы других процессов видны не позже чем через REFRESH_INTERVAL.
+REVOKED_TOKENS = {
+    'ALIAS': 'default',
+    'BLOOM_BITS': 2 ** 23,
+    'BLOOM_HASHES': 7,
+    'LRU_SIZE': 10000,
+    'SYNC_INTERVAL': 5.0,
+    'REFRESH_INTERVAL': 60.0,
+}
+
+# Коды подтверждения: TTL - срок действия в секундах, истёкшие коды
+# стирает команда purge_confirmation_codes пачками по PURGE_BATCH_SIZE.
+CONFIRMATION_CODE = {
+    'TTL': 3600,
+    'PURGE_BATCH_SIZE': 1000,
+}
+
+# Журнал изменений (reviews.ChangeEvent): BATCH_SIZE - размер пачки
+# чтения по умолчанию, MAX_BATCH_SIZE - наибольшая пачка, которую можно
+# запросить через API. Курсор по id не теряет событий, пока id выдаются
+# в порядке фиксации транзакций, то есть в SQLite с одним писателем
+# (см. reviews.changes.read_changes).
+CHANGE_EVENTS = {
+    'BATCH_SIZE': 500,
+    'MAX_BATCH_SIZE': 5000,
+}
+
+# Ограничение частоты запросов (users.throttling). Лимиты маршрутов
+# задаются в users/v1/urls.py. STORE - хранилище корзин:
+# users.throttling.LocalMemoryStore (свои лимиты у каждого процесса)
+# или users.throttling.CacheStore (общие, в кэше CACHE_ALIAS).
+RATE_LIMIT = {
+    'ENABLED': True,
+    'STORE': os.getenv(
+        'RATE_LIMIT_STORE', 'users.throttling.LocalMemoryStore'
+    ),
+    'CACHE_ALIAS': 'default',
+    'MAX_KEYS': 100000,
+}
+
+# Асинхронные представления api/v1/async/ выполняют работу с базой
+# в пуле потоков. С THREAD_SENSITIVE они работают в потоке вызывающего
+# синхронного кода и видят его незавершённую транзакцию.
+ASYNC_VIEWS = {
+    'THREAD_SENSITIVE': False,
+}
+
 AUTH_USER_MODEL = 'users.User'
 
+# Строка лога на каждый запрос с числом запросов к БД и временем этапов,
+# поля также передаются в extra записи для структурных форматтеров.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.requests': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -106,19 +214,55 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 #  SMTP
 secret_token = os.getenv('TOKEN')
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Для локальной проверки писем: EMAIL_BACKEND=
+# django.core.mail.backends.filebased.EmailBackend (или console).
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'users.backends.PooledSMTPBackend')
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
 EMAIL_USE_TLS = True
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_HOST_USER = EMAIL
 EMAIL_HOST_PASSWORD = EMAIL_PASS
 EMAIL_PORT = 587
+# Пул SMTP-соединений users.backends.PooledSMTPBackend: сколько
+# соединений хранить и через сколько секунд простоя их закрывать.
+EMAIL_POOL_SIZE = 4
+EMAIL_POOL_IDLE_TIMEOUT = 60
+
+# Очередь исходящих писем (users.OutboundEmail), которую отправляет
+# команда send_queued_mail. С EAGER (MAIL_QUEUE_EAGER=true) письма
+# отправляются сразу при постановке в очередь, и запрос ждёт почтовый
+# сервер, поэтому по умолчанию режим выключен. Для локального запуска
+# без SMTP достаточно EMAIL_BACKEND с console- или file-бэкендом.
+MAIL_QUEUE = {
+    'EAGER': os.getenv('MAIL_QUEUE_EAGER', 'false').lower()
+    in ('1', 'true', 'yes'),
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    # Пауза перед повтором в секундах, удваивается с каждой попыткой.
+    'RETRY_DELAY': 60,
+    'MAX_RETRY_DELAY': 3600,
+    # На сколько секунд взятые в работу письма скрыты от других
+    # обработчиков очереди.
+    'LEASE': 300,
+}
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    # JSON через orjson (если установлен), MessagePack при наличии msgpack;
+    # HTML-интерфейс DRF только в режиме отладки.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        *(
+            ['api.renderers.MessagePackRenderer']
+            if importlib.util.find_spec('msgpack') is not None
+            else []
+        ),
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    ],
 }
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
@@ -2,10 +2,13 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api.prometheus import metrics_view
+
 urlpatterns = [
     path("api/", include("api.v1.urls", namespace="api")),
     path("api/", include("users.v1.urls", namespace="users")),
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
     path(
         "redoc/",
         TemplateView.as_view(template_name="redoc.html"),
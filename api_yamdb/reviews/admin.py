@@ -25,6 +25,7 @@ class TitleAdmin(admin.ModelAdmin):
         "year",
         "description",
         "category",
+        "rating",
     )
     search_fields = ("name",)
     list_filter = ("year",)
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.db.models import Max
+
+from reviews.models import (
+    Category,
+    ChangeConsumer,
+    ChangeEvent,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    User,
+)
+
+# Модели, изменения которых записываются в журнал ChangeEvent.
+CAPTURED_MODELS = (Category, Genre, Title, Review, Comment, User)
+
+
+def record_save(sender, instance, created, raw, **kwargs):
+    """Записывает в журнал создание или изменение объекта."""
+    if raw:
+        return
+    ChangeEvent.objects.record(
+        instance, ChangeEvent.CREATE if created else ChangeEvent.UPDATE
+    )
+
+
+def record_delete(sender, instance, **kwargs):
+    """Записывает в журнал удаление объекта."""
+    ChangeEvent.objects.record(instance, ChangeEvent.DELETE)
+
+
+def record_updates(titles):
+    """Записывает в журнал изменение произведений, обновлённых через
+    update(): для них не отправляется post_save."""
+    ChangeEvent.objects.record_many(titles.order_by("pk"), ChangeEvent.UPDATE)
+
+
+def record_ratings(sender, queryset, **kwargs):
+    """Записывает в журнал произведения с изменившимся рейтингом."""
+    record_updates(queryset)
+
+
+def record_bulk_create(model, objs):
+    """Записывает в журнал объекты, созданные через bulk_create."""
+    if model in CAPTURED_MODELS:
+        ChangeEvent.objects.record_many(objs, ChangeEvent.CREATE)
+
+
+def read_changes(after=0, batch_size=None):
+    """Читает журнал изменений после позиции `after` пачками.
+
+    В памяти держится одна пачка событий; пачки выбираются по первичному
+    ключу, поэтому каждая стоит одного индексного запроса.
+
+    Курсор `id > after` не пропускает событий, только если `id` выдаются
+    в порядке фиксации транзакций. Это так в SQLite, где пишет один
+    писатель. В базах с параллельными транзакциями событие с меньшим
+    `id` может зафиксироваться позже прочитанных, и курсор его пропустит.
+    """
+    batch_size = batch_size or settings.CHANGE_EVENTS["BATCH_SIZE"]
+    while True:
+        batch = list(
+            ChangeEvent.objects.filter(pk__gt=after).order_by("pk")[
+                :batch_size
+            ]
+        )
+        if batch:
+            yield batch
+            after = batch[-1].pk
+        if len(batch) < batch_size:
+            return
+
+
+def get_position(consumer):
+    """Подтверждённая позиция потребителя, 0 для нового."""
+    position = (
+        ChangeConsumer.objects.filter(name=consumer)
+        .values_list("position", flat=True)
+        .first()
+    )
+    return position or 0
+
+
+def acknowledge(consumer, position):
+    """Подтверждает обработку событий до позиции `position` включительно.
+
+    Позиция потребителя только растёт; подтвердить событие, которого ещё
+    нет в журнале, нельзя.
+    """
+    latest = ChangeEvent.objects.aggregate(latest=Max("pk"))["latest"] or 0
+    if position > latest:
+        raise ValueError(
+            f"Позиция {position} больше последнего события {latest}."
+        )
+    ChangeConsumer.objects.get_or_create(name=consumer)
+    ChangeConsumer.objects.filter(
+        name=consumer, position__lt=position
+    ).update(position=position)
+    return get_position(consumer)
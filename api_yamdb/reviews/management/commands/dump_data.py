@@ -0,0 +1,99 @@
+import csv
+import gzip
+import json
+import time
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.management.commands.load_data import DICT
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+# Колонки файлов в формате static/data; load_data читает их по заголовку.
+COLUMNS = {
+    User: ("id", "username", "email", "role", "bio", "first_name",
+           "last_name"),
+    Category: ("id", "name", "slug"),
+    Genre: ("id", "name", "slug"),
+    Title: ("id", "name", "year", "category", "description"),
+    Review: ("id", "title_id", "text", "author", "score", "pub_date"),
+    Title.genre.through: ("id", "title_id", "genre_id"),
+    Comment: ("id", "review_id", "text", "author", "pub_date"),
+}
+
+
+def to_csv(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+class Command(BaseCommand):
+    help = "Dump catalog tables into csv or ndjson files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", type=Path, help="Directory for the dump files."
+        )
+        parser.add_argument(
+            "--format", choices=("csv", "ndjson"), default="csv"
+        )
+        parser.add_argument(
+            "--gzip", action="store_true", help="Compress files with gzip."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            default=2000,
+            type=int,
+            help="Number of rows fetched from the database at once.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+        except OSError as error:
+            raise CommandError(str(error))
+        for model, base in DICT.items():
+            name = Path(base).with_suffix(f".{options['format']}").name
+            if options["gzip"]:
+                name += ".gz"
+            started = time.monotonic()
+            rows = self.dump_model(model, path / name, options)
+            elapsed = max(time.monotonic() - started, 1e-9)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Table {model.__name__} dumped into {name}: {rows} rows"
+                    f" in {elapsed:.2f}s ({rows / elapsed:.0f} rows/s)."
+                )
+            )
+
+    def rows(self, model, chunk_size):
+        columns = COLUMNS[model]
+        attnames = [model._meta.get_field(name).attname for name in columns]
+        queryset = model.objects.order_by("pk").values_list(*attnames)
+        for values in queryset.iterator(chunk_size=chunk_size):
+            yield dict(zip(columns, values))
+
+    def dump_model(self, model, path, options):
+        opener = gzip.open if options["gzip"] else open
+        rows = 0
+        with opener(path, "wt", encoding="utf-8", newline="") as file:
+            if options["format"] == "csv":
+                writer = csv.DictWriter(file, COLUMNS[model])
+                writer.writeheader()
+            for row in self.rows(model, options["chunk_size"]):
+                if options["format"] == "csv":
+                    writer.writerow(
+                        {key: to_csv(value) for key, value in row.items()}
+                    )
+                else:
+                    file.write(json.dumps(
+                        row, cls=DjangoJSONEncoder, ensure_ascii=False
+                    ))
+                    file.write("\n")
+                rows += 1
+        return rows
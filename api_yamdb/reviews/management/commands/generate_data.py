@@ -0,0 +1,195 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from reviews.management.commands.load_data import (
+    preserve_dates,
+    reset_sequences,
+)
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    User,
+)
+
+# Точка отсчёта дат, чтобы набор не зависел от момента генерации.
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+WORDS = (
+    "время", "город", "дорога", "жизнь", "звезда", "игра", "история", "лето",
+    "любовь", "мир", "море", "ночь", "огонь", "песня", "река", "сад",
+    "свет", "сердце", "сон", "тень", "ветер", "война", "дом", "земля",
+)
+
+
+class Command(BaseCommand):
+    help = "Generate a deterministic synthetic dataset for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--genres", type=int, default=30)
+        parser.add_argument("--titles", type=int, default=5000)
+        parser.add_argument("--reviews", type=int, default=50000)
+        parser.add_argument("--comments", type=int, default=100000)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of title and review popularity.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["reviews"] > options["users"] * options["titles"]:
+            raise CommandError("Not enough users and titles for the reviews.")
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        steps = (
+            (User, self.users),
+            (Category, self.categories),
+            (Genre, self.genres),
+            (Title, self.titles),
+            (GenreTitle, self.genre_titles),
+            (Review, self.reviews),
+            (Comment, self.comments),
+        )
+        self.ids = {}
+        for model, generate in steps:
+            started = time.monotonic()
+            with preserve_dates(model, ("pub_date",)), transaction.atomic():
+                rows = self.insert(model, generate(options))
+                reset_sequences(model)
+            elapsed = max(time.monotonic() - started, 1e-9)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model.__name__}: {rows} rows in {elapsed:.2f}s"
+                    f" ({rows / elapsed:.0f} rows/s)."
+                )
+            )
+
+    def next_ids(self, model, count):
+        start = (model.objects.aggregate(pk=Max("pk"))["pk"] or 0) + 1
+        self.ids[model] = range(start, start + count)
+        return self.ids[model]
+
+    def insert(self, model, objs):
+        rows, batch = 0, []
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                rows += self.write(model, batch)
+                batch = []
+        return rows + self.write(model, batch)
+
+    def write(self, model, batch):
+        model.objects.bulk_create(batch)
+        return len(batch)
+
+    def text(self, words):
+        return " ".join(self.rng.choice(WORDS) for _ in range(words))
+
+    def date(self):
+        return EPOCH - timedelta(seconds=self.rng.randrange(10 ** 8))
+
+    def zipf_weights(self, count, skew):
+        weights = [1 / rank ** skew for rank in range(1, count + 1)]
+        self.rng.shuffle(weights)
+        return list(accumulate(weights))
+
+    def users(self, options):
+        for pk in self.next_ids(User, options["users"]):
+            yield User(
+                pk=pk,
+                username=f"user{pk}",
+                email=f"user{pk}@yamdb.fake",
+                password="!",
+                role=self.rng.choices(
+                    (User.USER, User.MODERATOR, User.ADMIN), (97, 2, 1)
+                )[0],
+            )
+
+    def categories(self, options):
+        for pk in self.next_ids(Category, options["categories"]):
+            yield Category(pk=pk, name=f"Категория {pk}", slug=f"cat-{pk}")
+
+    def genres(self, options):
+        for pk in self.next_ids(Genre, options["genres"]):
+            yield Genre(pk=pk, name=f"Жанр {pk}", slug=f"genre-{pk}")
+
+    def titles(self, options):
+        categories = self.ids[Category]
+        for pk in self.next_ids(Title, options["titles"]):
+            yield Title(
+                pk=pk,
+                name=self.text(self.rng.randint(1, 4)).capitalize(),
+                year=self.rng.randint(1900, EPOCH.year),
+                description=self.text(self.rng.randint(5, 30)),
+                category_id=self.rng.choice(categories),
+            )
+
+    def genre_titles(self, options):
+        genres = self.ids[Genre]
+        pairs = [
+            (title_id, genre_id)
+            for title_id in self.ids[Title]
+            for genre_id in self.rng.sample(
+                genres, min(len(genres), self.rng.randint(1, 3))
+            )
+        ]
+        for pk, (title_id, genre_id) in zip(
+            self.next_ids(GenreTitle, len(pairs)), pairs
+        ):
+            yield GenreTitle(pk=pk, title_id=title_id, genre_id=genre_id)
+
+    def reviews(self, options):
+        """Распределяет отзывы по произведениям по закону Ципфа.
+
+        Отзывы одного произведения идут подряд, поэтому пачка bulk_create
+        обновляет рейтинги лишь нескольких произведений.
+        """
+        titles, users = self.ids[Title], self.ids[User]
+        weights = self.zipf_weights(len(titles), options["skew"])
+        counts = dict.fromkeys(titles, 0)
+        placed = 0
+        while placed < options["reviews"]:
+            title_id = self.rng.choices(titles, cum_weights=weights)[0]
+            if counts[title_id] < len(users):
+                counts[title_id] += 1
+                placed += 1
+        ids = iter(self.next_ids(Review, placed))
+        for title_id, count in counts.items():
+            quality = self.rng.gauss(6.5, 1.5)
+            for author_id in self.rng.sample(users, count):
+                yield Review(
+                    pk=next(ids),
+                    title_id=title_id,
+                    author_id=author_id,
+                    text=self.text(self.rng.randint(5, 60)),
+                    score=min(10, max(1, round(self.rng.gauss(quality, 2)))),
+                    pub_date=self.date(),
+                )
+
+    def comments(self, options):
+        reviews, users = self.ids[Review], self.ids[User]
+        if not reviews:
+            return
+        weights = self.zipf_weights(len(reviews), options["skew"])
+        ids = self.next_ids(Comment, options["comments"])
+        for pk in ids:
+            yield Comment(
+                pk=pk,
+                review_id=self.rng.choices(reviews, cum_weights=weights)[0],
+                author_id=self.rng.choice(users),
+                text=self.text(self.rng.randint(3, 30)),
+                pub_date=self.date(),
+            )
@@ -1,9 +1,28 @@
 import csv
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
 
 from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DatabaseError, connection, connections, transaction
+from rest_framework.exceptions import ValidationError as APIValidationError
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.changes import record_bulk_create, record_updates
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    User,
+)
 
 DICT = {
     User: "users.csv",
@@ -11,37 +30,326 @@ DICT = {
     Genre: "genre.csv",
     Title: "titles.csv",
     Review: "review.csv",
-    Title.genre.through: "genre_title.csv",
+    GenreTitle: "genre_title.csv",
     Comment: "comments.csv",
 }
 
 
+class KnownIds:
+    """Множества первичных ключей, доступных для внешних ключей."""
+
+    def __init__(self):
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def get(self, model):
+        with self._lock:
+            if model not in self._ids:
+                self._ids[model] = set(
+                    model.objects.values_list("pk", flat=True).iterator()
+                )
+            return self._ids[model]
+
+    def add(self, model, ids):
+        self.get(model).update(ids)
+
+
+def get_dependencies(models):
+    """Строит граф зависимостей файлов по внешним ключам моделей."""
+    return {
+        model: {
+            field.related_model
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+
+
+@contextmanager
+def preserve_dates(model, columns):
+    """Отключает auto_now/auto_now_add для дат, переданных в файле."""
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if field.name in columns
+        and (getattr(field, "auto_now", False)
+             or getattr(field, "auto_now_add", False))
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class FileImporter:
+    """Потоково читает CSV-файл и загружает его пачками через bulk_create.
+
+    Файл записывается одной транзакцией, поэтому при общей блокировке
+    записи (SQLite) она держится до конца файла. Чтобы не ждать разбора
+    под блокировкой, запись начинается, только когда разборщик заполнил
+    очередь или дочитал файл. Файл не больше `queue_size` пачек пишется
+    без ожидания разбора; в файле побольше запись может догнать разборщик
+    и ждать его, удерживая блокировку.
+    """
+
+    # Сколько готовых пачек разборщик может опережать запись в базу.
+    queue_size = 4
+
+    def __init__(self, model, path, known_ids, batch_size, write_lock=None):
+        self.model = model
+        self.path = Path(path)
+        self.known_ids = known_ids
+        self.batch_size = batch_size
+        self.write_lock = write_lock or nullcontext()
+        self.rows = 0
+        self.elapsed = 0
+
+    def error(self, line, message):
+        return CommandError(f"{self.path.name}:{line}: {message}")
+
+    def get_fields(self, columns):
+        fields = {}
+        for column in columns:
+            try:
+                fields[column] = self.model._meta.get_field(column)
+            except FieldDoesNotExist:
+                raise self.error(1, f"unknown column `{column}`")
+        return fields
+
+    def convert(self, field, value):
+        if value == "" and (field.null or field.blank):
+            return None if field.null else ""
+        if field.is_relation:
+            value = field.target_field.to_python(value)
+            if value not in self.known_ids.get(field.related_model):
+                raise ValidationError(
+                    f"{field.related_model.__name__} with id {value} "
+                    "does not exist"
+                )
+            return value
+        value = field.to_python(value)
+        field.run_validators(value)
+        return value
+
+    def parse(self, reader, fields):
+        """Возвращает проверенные объекты модели по одному на строку."""
+        for line, row in enumerate(reader, 2):
+            values = {}
+            for column, field in fields.items():
+                try:
+                    values[field.attname] = self.convert(field, row[column])
+                except (ValidationError, APIValidationError) as error:
+                    raise self.error(line, f"{column}: {error}")
+            yield self.model(**values)
+
+    def batches(self, reader, fields):
+        batch = []
+        for obj in self.parse(reader, fields):
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def produce(self, reader, fields, batches, stop, ready):
+        """Разбирает файл в отдельном потоке, не занимая соединение с БД.
+
+        `ready` устанавливается, когда очередь заполнена или файл разобран.
+        """
+        try:
+            for batch in self.batches(reader, fields):
+                if not self.put(batches, batch, stop):
+                    return
+                if batches.full():
+                    ready.set()
+            self.put(batches, None, stop)
+        except BaseException as error:
+            self.put(batches, error, stop)
+        finally:
+            ready.set()
+
+    @staticmethod
+    def put(batches, item, stop):
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def consume(self, batches):
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if isinstance(batch, BaseException):
+                raise batch
+            self.write(batch)
+
+    def write(self, batch):
+        self.model.objects.bulk_create(batch)
+        # bulk_create не отправляет post_save, поэтому события журнала
+        # изменений записываются здесь, в той же транзакции.
+        record_bulk_create(self.model, batch)
+        if self.model is GenreTitle:
+            record_updates(
+                Title.objects.filter(pk__in={obj.title_id for obj in batch})
+            )
+        self.known_ids.add(self.model, (obj.pk for obj in batch))
+        self.rows += len(batch)
+
+    def run(self):
+        started = time.monotonic()
+        with open(self.path, encoding="utf-8", newline="") as csv_file:
+            reader = csv.DictReader(csv_file)
+            fields = self.get_fields(reader.fieldnames or ())
+            for field in fields.values():
+                if field.is_relation:
+                    self.known_ids.get(field.related_model)
+            batches = queue.Queue(self.queue_size)
+            stop, ready = threading.Event(), threading.Event()
+            parser = threading.Thread(
+                target=self.produce,
+                args=(reader, fields, batches, stop, ready),
+                daemon=True,
+            )
+            parser.start()
+            try:
+                ready.wait()
+                with self.write_lock, preserve_dates(self.model, fields), \
+                        transaction.atomic():
+                    self.consume(batches)
+                    reset_sequences(self.model)
+            finally:
+                stop.set()
+                parser.join()
+        self.elapsed = max(time.monotonic() - started, 1e-9)
+        return self.rows
+
+
+def reset_sequences(model):
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
 class Command(BaseCommand):
     help = "Load data from csv files"
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default=Path(settings.BASE_DIR) / "static" / "data",
+            type=Path,
+            help="Directory with csv files.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            default=1000,
+            type=int,
+            help="Number of rows inserted per query.",
+        )
+        parser.add_argument(
+            "--workers",
+            default=4,
+            type=int,
+            help="Number of files imported concurrently.",
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.known_ids = KnownIds()
+        # SQLite допускает одного писателя: файлы разбираются параллельно,
+        # а транзакции записи выполняются по очереди.
+        self.write_lock = (
+            threading.Lock() if connection.vendor == "sqlite" else None
+        )
+        dependencies = get_dependencies(DICT)
+        started = time.monotonic()
+        if options["workers"] > 1:
+            self.run_parallel(dependencies, options["workers"])
+        else:
+            for model in self.ordered(dependencies):
+                self.report(self.import_file(model))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"All files imported in {time.monotonic() - started:.2f}s."
+            )
+        )
+
+    def ordered(self, dependencies):
+        done, order = set(), []
+        while len(order) < len(dependencies):
+            ready = [
+                model
+                for model, parents in dependencies.items()
+                if model not in done and parents <= done
+            ]
+            if not ready:
+                raise CommandError("Circular dependency between csv files.")
+            order.extend(ready)
+            done.update(ready)
+        return order
+
+    def run_parallel(self, dependencies, workers):
+        self.ordered(dependencies)
+        done, running = set(), {}
+        with ThreadPoolExecutor(workers) as executor:
+            while len(done) < len(dependencies):
+                for model, parents in dependencies.items():
+                    if (
+                        model not in done
+                        and model not in running.values()
+                        and parents <= done
+                    ):
+                        future = executor.submit(self.import_in_thread, model)
+                        running[future] = model
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done.add(running.pop(future))
+                    self.report(future.result())
+
+    def import_in_thread(self, model):
         try:
-            for model, base in DICT.items():
-                self.stdout.write(
-                    self.style.NOTICE(f"Importing data from file: {base}")
-                )
-                with open(
-                    f"{settings.BASE_DIR}/static/data/{base}",
-                    "r",
-                    encoding="utf-8",
-                ) as csv_file:
-                    reader = csv.DictReader(csv_file)
-                    for row in reader:
-                        for field in ("category", "author"):
-                            if field in row:
-                                row[f"{field}_id"] = row.pop(field)
-                        model.objects.create(**row)
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f"Data from file {base} successfully imported into"
-                            f" table {model.__name__}."
-                        )
-                    )
-
-        except Exception as error:
-            CommandError(str(error))
+            return self.import_file(model)
+        finally:
+            connections.close_all()
+
+    def import_file(self, model):
+        base = DICT[model]
+        self.stdout.write(
+            self.style.NOTICE(f"Importing data from file: {base}")
+        )
+        importer = FileImporter(
+            model,
+            self.options["path"] / base,
+            self.known_ids,
+            self.options["batch_size"],
+            self.write_lock,
+        )
+        try:
+            importer.run()
+        except (OSError, DatabaseError) as error:
+            raise CommandError(f"{base}: {error}")
+        return base, importer
+
+    def report(self, result):
+        base, importer = result
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Data from file {base} successfully imported into"
+                f" table {importer.model.__name__}: {importer.rows} rows in"
+                f" {importer.elapsed:.2f}s"
+                f" ({importer.rows / importer.elapsed:.0f} rows/s)."
+            )
+        )
@@ -0,0 +1,52 @@
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = "Rebuild or verify denormalized title ratings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report titles with stale ratings, do not fix them.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of titles updated per query.",
+        )
+
+    def handle(self, *args, **options):
+        stale = list(
+            Title.objects.annotate(
+                actual_sum=Coalesce(Sum("reviews__score"), 0),
+                actual_count=Count("reviews"),
+            )
+            .exclude(
+                rating_sum=F("actual_sum"), rating_count=F("actual_count")
+            )
+            .values_list("pk", flat=True)
+        )
+        if options["check"]:
+            if stale:
+                raise CommandError(
+                    f"{len(stale)} title(s) have stale ratings: "
+                    f"{', '.join(map(str, stale[:20]))}"
+                )
+            self.stdout.write(
+                self.style.SUCCESS("All ratings are up to date.")
+            )
+            return
+        batch_size = options["batch_size"]
+        for start in range(0, len(stale), batch_size):
+            Title.objects.filter(
+                pk__in=stale[start:start + batch_size]
+            ).recalculate_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt ratings of {len(stale)} title(s).")
+        )
@@ -0,0 +1,76 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.changes import acknowledge, get_position, read_changes
+
+
+class Command(BaseCommand):
+    help = "Stream change events as ndjson and acknowledge them by batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--consumer",
+            help="Consumer name: resume from and acknowledge its position.",
+        )
+        parser.add_argument(
+            "--after",
+            type=int,
+            help="Start after this event id instead of the saved position.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            default=settings.CHANGE_EVENTS["BATCH_SIZE"],
+            type=int,
+            help="Number of events read from the database at once.",
+        )
+        parser.add_argument(
+            "--follow",
+            action="store_true",
+            help="Keep polling for new events instead of exiting.",
+        )
+        parser.add_argument(
+            "--interval",
+            default=1.0,
+            type=float,
+            help="Seconds to wait for new events in follow mode.",
+        )
+
+    def handle(self, *args, **options):
+        consumer = options["consumer"]
+        after = options["after"]
+        if after is None:
+            after = get_position(consumer) if consumer else 0
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        try:
+            while True:
+                for batch in read_changes(after, options["batch_size"]):
+                    self.write_batch(batch)
+                    after = batch[-1].pk
+                    if consumer:
+                        acknowledge(consumer, after)
+                if not options["follow"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+    def write_batch(self, batch):
+        for event in batch:
+            self.stdout.write(json.dumps(
+                {
+                    "id": event.pk,
+                    "model": event.model,
+                    "object_id": event.object_id,
+                    "action": event.action,
+                    "payload": event.payload,
+                    "created_at": event.created_at,
+                },
+                cls=DjangoJSONEncoder,
+                ensure_ascii=False,
+            ))
+        self.stdout.flush()
@@ -0,0 +1,79 @@
+from django.db import migrations
+
+# SQL индекса поиска на момент миграции: reviews.search меняется вместе
+# с актуальными моделями, поэтому миграция не должна от него зависеть.
+INSERT = (
+    'INSERT INTO reviews_search'
+    '(rowid, kind, object_id, parent_id, name, body)'
+)
+SEARCH_SCHEMA = [
+    'CREATE VIRTUAL TABLE reviews_search USING fts5('
+    'kind UNINDEXED, object_id UNINDEXED, parent_id UNINDEXED, '
+    "name, body, tokenize = 'unicode61 remove_diacritics 2')",
+
+    'CREATE TRIGGER reviews_title_search_ai AFTER INSERT ON reviews_title '
+    f'BEGIN {INSERT} VALUES (new.id * 4 + 1, \'title\', new.id, NULL, '
+    'new.name, new.description); END',
+    'CREATE TRIGGER reviews_title_search_au AFTER UPDATE ON reviews_title '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 1; '
+    f'{INSERT} VALUES (new.id * 4 + 1, \'title\', new.id, NULL, '
+    'new.name, new.description); END',
+    'CREATE TRIGGER reviews_title_search_ad AFTER DELETE ON reviews_title '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 1; END',
+    f'{INSERT} SELECT id * 4 + 1, \'title\', id, NULL, name, description '
+    'FROM reviews_title',
+
+    'CREATE TRIGGER reviews_review_search_ai AFTER INSERT ON reviews_review '
+    f'BEGIN {INSERT} VALUES (new.id * 4 + 2, \'review\', new.id, '
+    "new.title_id, '', new.text); END",
+    'CREATE TRIGGER reviews_review_search_au AFTER UPDATE ON reviews_review '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 2; '
+    f'{INSERT} VALUES (new.id * 4 + 2, \'review\', new.id, '
+    "new.title_id, '', new.text); END",
+    'CREATE TRIGGER reviews_review_search_ad AFTER DELETE ON reviews_review '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 2; END',
+    f'{INSERT} SELECT id * 4 + 2, \'review\', id, title_id, \'\', text '
+    'FROM reviews_review',
+
+    'CREATE TRIGGER reviews_comment_search_ai AFTER INSERT ON reviews_comment '
+    f'BEGIN {INSERT} VALUES (new.id * 4 + 3, \'comment\', new.id, '
+    "new.review_id, '', new.text); END",
+    'CREATE TRIGGER reviews_comment_search_au AFTER UPDATE ON reviews_comment '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 3; '
+    f'{INSERT} VALUES (new.id * 4 + 3, \'comment\', new.id, '
+    "new.review_id, '', new.text); END",
+    'CREATE TRIGGER reviews_comment_search_ad AFTER DELETE ON reviews_comment '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 3; END',
+    f'{INSERT} SELECT id * 4 + 3, \'comment\', id, review_id, \'\', text '
+    'FROM reviews_comment',
+]
+DROP_SEARCH_SCHEMA = ['DROP TABLE IF EXISTS reviews_search'] + [
+    f'DROP TRIGGER IF EXISTS reviews_{table}_search_{suffix}'
+    for table in ('title', 'review', 'comment')
+    for suffix in ('ai', 'au', 'ad')
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in SEARCH_SCHEMA:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SEARCH_SCHEMA:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 3.2 on 2026-10-18 20:37
+
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+# SQL индекса поиска на момент миграции: reviews.search меняется вместе
+# с актуальными моделями, поэтому миграция не должна от него зависеть.
+INSERT = (
+    'INSERT INTO reviews_search'
+    '(rowid, kind, object_id, parent_id, name, body)'
+)
+SEARCH_SCHEMA = [
+    'CREATE VIRTUAL TABLE reviews_search USING fts5('
+    'kind UNINDEXED, object_id UNINDEXED, parent_id UNINDEXED, '
+    "name, body, tokenize = 'unicode61 remove_diacritics 2')",
+
+    'CREATE TRIGGER reviews_title_search_ai AFTER INSERT ON reviews_title '
+    f'BEGIN {INSERT} VALUES (new.id * 4 + 1, \'title\', new.id, NULL, '
+    'new.name, new.description); END',
+    'CREATE TRIGGER reviews_title_search_au AFTER UPDATE ON reviews_title '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 1; '
+    f'{INSERT} VALUES (new.id * 4 + 1, \'title\', new.id, NULL, '
+    'new.name, new.description); END',
+    'CREATE TRIGGER reviews_title_search_ad AFTER DELETE ON reviews_title '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 1; END',
+    f'{INSERT} SELECT id * 4 + 1, \'title\', id, NULL, name, description '
+    'FROM reviews_title',
+
+    'CREATE TRIGGER reviews_review_search_ai AFTER INSERT ON reviews_review '
+    f'BEGIN {INSERT} VALUES (new.id * 4 + 2, \'review\', new.id, '
+    "new.title_id, '', new.text); END",
+    'CREATE TRIGGER reviews_review_search_au AFTER UPDATE ON reviews_review '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 2; '
+    f'{INSERT} VALUES (new.id * 4 + 2, \'review\', new.id, '
+    "new.title_id, '', new.text); END",
+    'CREATE TRIGGER reviews_review_search_ad AFTER DELETE ON reviews_review '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 2; END',
+    f'{INSERT} SELECT id * 4 + 2, \'review\', id, title_id, \'\', text '
+    'FROM reviews_review',
+
+    'CREATE TRIGGER reviews_comment_search_ai AFTER INSERT ON reviews_comment '
+    f'BEGIN {INSERT} VALUES (new.id * 4 + 3, \'comment\', new.id, '
+    "new.review_id, '', new.text); END",
+    'CREATE TRIGGER reviews_comment_search_au AFTER UPDATE ON reviews_comment '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 3; '
+    f'{INSERT} VALUES (new.id * 4 + 3, \'comment\', new.id, '
+    "new.review_id, '', new.text); END",
+    'CREATE TRIGGER reviews_comment_search_ad AFTER DELETE ON reviews_comment '
+    'BEGIN DELETE FROM reviews_search WHERE rowid = old.id * 4 + 3; END',
+    f'{INSERT} SELECT id * 4 + 3, \'comment\', id, review_id, \'\', text '
+    'FROM reviews_comment',
+]
+DROP_SEARCH_SCHEMA = ['DROP TABLE IF EXISTS reviews_search'] + [
+    f'DROP TRIGGER IF EXISTS reviews_{table}_search_{suffix}'
+    for table in ('title', 'review', 'comment')
+    for suffix in ('ai', 'au', 'ad')
+]
+
+
+def copy_pub_date(apps, schema_editor):
+    for name in ('Review', 'Comment'):
+        apps.get_model('reviews', name).objects.update(
+            updated_at=F('pub_date')
+        )
+
+
+def rebuild_search_index(apps, schema_editor):
+    """SQLite пересоздаёт таблицы при добавлении столбцов и теряет
+    триггеры индекса поиска."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SEARCH_SCHEMA + SEARCH_SCHEMA:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('title', 'Произведение'), ('review', 'Отзыв'), ('comment', 'Комментарий')], max_length=16, verbose_name='Модель')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Идентификатор')),
+                ('parent_id', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Родительский объект')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Удалённый объект',
+                'verbose_name_plural': 'Удалённые объекты',
+            },
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', 'updated_at'], name='comment_review_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', 'updated_at'], name='review_title_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['model', 'parent_id', 'deleted_at'], name='tombstone_parent_deleted_idx'),
+        ),
+        migrations.RunPython(copy_pub_date, migrations.RunPython.noop),
+        migrations.RunPython(rebuild_search_index, rebuild_search_index),
+    ]
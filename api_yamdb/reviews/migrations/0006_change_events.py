@@ -0,0 +1,43 @@
+# Generated by Django 3.2 on 2026-10-18 20:42
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_updated_at_and_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeConsumer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='Имя')),
+                ('position', models.PositiveBigIntegerField(default=0, verbose_name='Позиция')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата подтверждения')),
+            ],
+            options={
+                'verbose_name': 'Потребитель журнала изменений',
+                'verbose_name_plural': 'Потребители журнала изменений',
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=64, verbose_name='Модель')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Идентификатор')),
+                ('action', models.CharField(choices=[('create', 'Создание'), ('update', 'Изменение'), ('delete', 'Удаление')], max_length=16, verbose_name='Действие')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Данные')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата события')),
+            ],
+            options={
+                'verbose_name': 'Событие журнала изменений',
+                'verbose_name_plural': 'Журнал изменений',
+            },
+        ),
+    ]
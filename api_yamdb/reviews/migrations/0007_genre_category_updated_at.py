@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-18 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_change_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AlterField(
+            model_name='tombstone',
+            name='model',
+            field=models.CharField(choices=[('genre', 'Жанр'), ('category', 'Категория'), ('title', 'Произведение'), ('review', 'Отзыв'), ('comment', 'Комментарий')], max_length=16, verbose_name='Модель'),
+        ),
+    ]
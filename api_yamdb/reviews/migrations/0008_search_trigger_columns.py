@@ -0,0 +1,47 @@
+from django.db import migrations
+
+INSERT = (
+    'INSERT INTO reviews_search'
+    '(rowid, kind, object_id, parent_id, name, body)'
+)
+# (таблица, столбцы, код, тип, родитель, заголовок, текст)
+SOURCES = (
+    ('reviews_title', 'name, description', 1, 'title',
+     'NULL', 'new.name', 'new.description'),
+    ('reviews_review', 'text, title_id', 2, 'review',
+     'new.title_id', "''", 'new.text'),
+    ('reviews_comment', 'text, review_id', 3, 'comment',
+     'new.review_id', "''", 'new.text'),
+)
+
+
+def update_triggers(columns):
+    """Пересоздаёт триггеры обновления индекса поиска. С `columns`
+    триггер срабатывает только при изменении индексируемых столбцов."""
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for table, watched, code, kind, *values in SOURCES:
+            event = f'UPDATE OF {watched}' if columns else 'UPDATE'
+            schema_editor.execute(
+                f'DROP TRIGGER IF EXISTS {table}_search_au'
+            )
+            schema_editor.execute(
+                f'CREATE TRIGGER {table}_search_au AFTER {event} ON {table} '
+                'BEGIN DELETE FROM reviews_search '
+                f'WHERE rowid = old.id * 4 + {code}; '
+                f"{INSERT} VALUES (new.id * 4 + {code}, '{kind}', new.id, "
+                f'{", ".join(values)}); END'
+            )
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_genre_category_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(update_triggers(True), update_triggers(False)),
+    ]
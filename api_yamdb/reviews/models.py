@@ -1,12 +1,42 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, NullIf
+from django.dispatch import Signal
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
 from users.models import User
 
+# Отправляется после изменения рейтинга произведений (sender - Title).
+ratings_changed = Signal()
+# Отправляется после массового изменения связей произведений с жанрами,
+# для которого не отправляются post_save и post_delete
+# (sender - GenreTitle, title_ids - id затронутых произведений).
+genre_links_changed = Signal()
 
-class Category(models.Model):
+
+class ChangeCapturedModel(models.Model):
+    """Модель, изменения которой записываются в журнал ChangeEvent.
+
+    Сохранение выполняется в транзакции вместе с обработчиками post_save,
+    поэтому событие фиксируется только вместе с самим изменением.
+    Удаление и так выполняется в транзакции вместе с post_delete.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class Category(ChangeCapturedModel):
     """Модель для категории."""
 
     name = models.CharField(
@@ -17,6 +47,9 @@ class Category(models.Model):
         unique=True,
         verbose_name="Адрес_страницы",
     )
+    updated_at = models.DateTimeField(
+        "Дата изменения", auto_now=True, db_index=True
+    )
 
     class Meta:
         verbose_name = "Категория"
@@ -26,7 +59,7 @@ class Category(models.Model):
         return self.name
 
 
-class Genre(models.Model):
+class Genre(ChangeCapturedModel):
     """Модель для жанра."""
 
     name = models.CharField(
@@ -37,6 +70,9 @@ class Genre(models.Model):
         unique=True,
         verbose_name="Адрес страницы",
     )
+    updated_at = models.DateTimeField(
+        "Дата изменения", auto_now=True, db_index=True
+    )
 
     class Meta:
         verbose_name = "Жанр"
@@ -46,7 +82,72 @@ class Genre(models.Model):
         return self.name
 
 
-class Title(models.Model):
+class TitleQuerySet(models.QuerySet):
+    """Набор запросов к произведениям."""
+
+    def _shift_rating(self, score, count):
+        return self.update(
+            updated_at=timezone.now(),
+            rating_sum=F("rating_sum") + score,
+            rating_count=F("rating_count") + count,
+            rating=(F("rating_sum") + score)
+            / NullIf(F("rating_count") + count, 0),
+        )
+
+    # Обработчики ratings_changed выполняются в одной транзакции
+    # с изменением рейтинга: так событие журнала изменений фиксируется
+    # только вместе с ним.
+    def shift_rating(self, score, count):
+        """Атомарно сдвигает сумму и количество оценок произведений."""
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = self._shift_rating(score, count)
+            ratings_changed.send(sender=self.model, queryset=self)
+        return rows
+
+    def shift_ratings(self, deltas):
+        """Сдвигает рейтинги по словарю {id произведения: (сумма, число)}."""
+        if not deltas:
+            return
+        with transaction.atomic(using=self.db, savepoint=False):
+            for title_id, (score, count) in deltas.items():
+                self.filter(pk=title_id)._shift_rating(score, count)
+            ratings_changed.send(
+                sender=self.model, queryset=self.filter(pk__in=deltas)
+            )
+
+    def recalculate_ratings(self):
+        """Пересчитывает рейтинг произведений по таблице отзывов."""
+        reviews = (
+            Review.objects.filter(title=OuterRef("pk"))
+            .order_by()
+            .values("title")
+        )
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = self.update(
+                updated_at=timezone.now(),
+                rating_sum=Coalesce(
+                    Subquery(
+                        reviews.annotate(value=Sum("score")).values("value")
+                    ),
+                    0,
+                ),
+                rating_count=Coalesce(
+                    Subquery(
+                        reviews.annotate(value=Count("pk")).values("value")
+                    ),
+                    0,
+                ),
+                rating=Subquery(
+                    reviews.annotate(
+                        value=Sum("score") / Count("pk")
+                    ).values("value")
+                ),
+            )
+            ratings_changed.send(sender=self.model, queryset=self)
+        return rows
+
+
+class Title(ChangeCapturedModel):
     """Модель для произведения."""
 
     def year_validator(value):
@@ -76,15 +177,61 @@ class Title(models.Model):
         null=True,
         verbose_name="Категория",
     )
+    rating_sum = models.PositiveIntegerField(
+        "Сумма оценок", default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        "Количество оценок", default=0, editable=False
+    )
+    rating = models.PositiveSmallIntegerField(
+        "Рейтинг", null=True, blank=True, editable=False
+    )
+    # Меняется и при пересчёте рейтинга: рейтинг входит в ответ API.
+    updated_at = models.DateTimeField(
+        "Дата изменения", auto_now=True, db_index=True
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
+        indexes = [
+            models.Index(fields=["name"], name="title_name_idx"),
+            models.Index(fields=["year"], name="title_year_idx"),
+            models.Index(
+                fields=["category", "year"], name="title_category_year_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
 
+class GenreTitleQuerySet(models.QuerySet):
+    """Набор запросов к связям произведений с жанрами, сообщающий
+    о массовых изменениях. Через него же пишут менеджеры
+    `Title.genre` и `Genre.titles`."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            genre_links_changed.send(
+                sender=self.model, title_ids={obj.title_id for obj in objs}
+            )
+        return objs
+
+    def update(self, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            title_ids = set(self.values_list("title_id", flat=True))
+            rows = super().update(**kwargs)
+            title = kwargs.get("title", kwargs.get("title_id"))
+            if title is not None:
+                title_ids.add(getattr(title, "pk", title))
+            genre_links_changed.send(sender=self.model, title_ids=title_ids)
+        return rows
+
+
 class GenreTitle(models.Model):
     """Модель для жанра произведения."""
 
@@ -105,6 +252,8 @@ class GenreTitle(models.Model):
         verbose_name="Жанр",
     )
 
+    objects = GenreTitleQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Жанр произведения"
         verbose_name_plural = "Жанры произведения"
@@ -118,7 +267,47 @@ class GenreTitle(models.Model):
         return f"{self.title} - {self.genre}"
 
 
-class Review(models.Model):
+class ReviewQuerySet(models.QuerySet):
+    """Набор запросов к отзывам, поддерживающий рейтинг произведений
+    в актуальном состоянии при массовых операциях."""
+
+    @staticmethod
+    def rating_deltas(objs, deltas=None):
+        """Суммирует оценки отзывов по произведениям."""
+        deltas = {} if deltas is None else deltas
+        for obj in objs:
+            total, count = deltas.get(obj.title_id, (0, 0))
+            deltas[obj.title_id] = (total + int(obj.score), count + 1)
+        return deltas
+
+    def bulk_create(self, objs, *args, update_ratings=True, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            if not update_ratings:
+                return objs
+            if kwargs.get("ignore_conflicts"):
+                Title.objects.filter(
+                    pk__in={obj.title_id for obj in objs}
+                ).recalculate_ratings()
+            else:
+                Title.objects.shift_ratings(self.rating_deltas(objs))
+        return objs
+
+    def update(self, **kwargs):
+        kwargs.setdefault("updated_at", timezone.now())
+        if not {"score", "title", "title_id"} & kwargs.keys():
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            title_ids = set(self.values_list("title_id", flat=True))
+            rows = super().update(**kwargs)
+            title = kwargs.get("title", kwargs.get("title_id"))
+            if title is not None:
+                title_ids.add(getattr(title, "pk", title))
+            Title.objects.filter(pk__in=title_ids).recalculate_ratings()
+        return rows
+
+
+class Review(ChangeCapturedModel):
     """Модель для отзывов."""
 
     title = models.ForeignKey(
@@ -140,6 +329,9 @@ class Review(models.Model):
     pub_date = models.DateTimeField(
         "Дата публикации", auto_now_add=True, db_index=True
     )
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         constraints = [
@@ -147,14 +339,34 @@ class Review(models.Model):
                 fields=["author", "title"], name="review_once"
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=["title", "pub_date"], name="review_title_pub_date_idx"
+            ),
+            models.Index(
+                fields=["title", "updated_at"],
+                name="review_title_updated_idx",
+            ),
+        ]
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {"title_id", "score"} <= set(field_names):
+            instance.remember_rating_state()
+        return instance
 
-class Comment(models.Model):
+    def remember_rating_state(self):
+        """Запоминает произведение и оценку, учтённые в рейтинге."""
+        self._rating_state = (self.title_id, self.score)
+
+
+class Comment(ChangeCapturedModel):
     """Модель для комментариев."""
 
     review = models.ForeignKey(
@@ -174,10 +386,144 @@ class Comment(models.Model):
     pub_date = models.DateTimeField(
         "Дата публикации", auto_now_add=True, db_index=True
     )
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
 
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(
+                fields=["review", "pub_date"],
+                name="comment_review_pub_date_idx",
+            ),
+            models.Index(
+                fields=["review", "updated_at"],
+                name="comment_review_updated_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
+
+
+class Tombstone(models.Model):
+    """Отметка об удалении жанра, категории, произведения, отзыва
+    или комментария.
+
+    Позволяет клиентам инкрементальной синхронизации узнать об удалениях;
+    `parent_id` - произведение удалённого отзыва или отзыв удалённого
+    комментария.
+    """
+
+    GENRE = "genre"
+    CATEGORY = "category"
+    TITLE = "title"
+    REVIEW = "review"
+    COMMENT = "comment"
+    MODELS = (
+        (GENRE, "Жанр"),
+        (CATEGORY, "Категория"),
+        (TITLE, "Произведение"),
+        (REVIEW, "Отзыв"),
+        (COMMENT, "Комментарий"),
+    )
+
+    model = models.CharField("Модель", max_length=16, choices=MODELS)
+    object_id = models.PositiveBigIntegerField("Идентификатор")
+    parent_id = models.PositiveBigIntegerField(
+        "Родительский объект", null=True, blank=True
+    )
+    deleted_at = models.DateTimeField("Дата удаления", default=timezone.now)
+
+    class Meta:
+        verbose_name = "Удалённый объект"
+        verbose_name_plural = "Удалённые объекты"
+        indexes = [
+            models.Index(
+                fields=["model", "parent_id", "deleted_at"],
+                name="tombstone_parent_deleted_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}"
+
+
+class ChangeEventQuerySet(models.QuerySet):
+    """Набор запросов к журналу изменений."""
+
+    def record(self, instance, action):
+        return self.create(**ChangeEvent.describe(instance, action))
+
+    def record_many(self, objs, action):
+        return self.bulk_create(
+            [self.model(**ChangeEvent.describe(obj, action)) for obj in objs]
+        )
+
+
+class ChangeEvent(models.Model):
+    """Событие журнала изменений (outbox) для внешних потребителей.
+
+    Журнал только дополняется; возрастающий `id` служит курсором чтения.
+    В `payload` - значения полей объекта после изменения, для удаления -
+    последнее состояние объекта.
+    """
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    ACTIONS = (
+        (CREATE, "Создание"),
+        (UPDATE, "Изменение"),
+        (DELETE, "Удаление"),
+    )
+    # Поля, которые не должны покидать базу.
+    EXCLUDED_FIELDS = {"password", "confirmation_code"}
+
+    model = models.CharField("Модель", max_length=64)
+    object_id = models.PositiveBigIntegerField("Идентификатор")
+    action = models.CharField("Действие", max_length=16, choices=ACTIONS)
+    payload = models.JSONField("Данные", encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField("Дата события", default=timezone.now)
+
+    objects = ChangeEventQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Событие журнала изменений"
+        verbose_name_plural = "Журнал изменений"
+
+    def __str__(self):
+        return f"{self.action} {self.model} {self.object_id}"
+
+    @classmethod
+    def describe(cls, instance, action):
+        payload = {
+            field.attname: field.value_from_object(instance)
+            for field in instance._meta.concrete_fields
+            if field.name not in cls.EXCLUDED_FIELDS
+        }
+        if isinstance(instance, Title) and action != cls.DELETE:
+            payload["genre"] = sorted(
+                instance.genre.values_list("pk", flat=True)
+            )
+        return {
+            "model": instance._meta.label_lower,
+            "object_id": instance.pk,
+            "action": action,
+            "payload": payload,
+        }
+
+
+class ChangeConsumer(models.Model):
+    """Потребитель журнала изменений и его подтверждённая позиция."""
+
+    name = models.CharField("Имя", max_length=64, unique=True)
+    position = models.PositiveBigIntegerField("Позиция", default=0)
+    updated_at = models.DateTimeField("Дата подтверждения", auto_now=True)
+
+    class Meta:
+        verbose_name = "Потребитель журнала изменений"
+        verbose_name_plural = "Потребители журнала изменений"
+
+    def __str__(self):
+        return f"{self.name}: {self.position}"
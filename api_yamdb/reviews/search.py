@@ -0,0 +1,252 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from reviews.models import Comment, Review, Title
+
+TITLE, REVIEW, COMMENT = "title", "review", "comment"
+KINDS = (TITLE, REVIEW, COMMENT)
+
+# Индекс FTS5 поддерживается триггерами при любых изменениях таблиц,
+# включая bulk_create, update() и каскадное удаление.
+# rowid документа = id * 4 + код типа, поэтому удаление идёт по ключу.
+# Триггер обновления срабатывает только при изменении индексируемых
+# столбцов: пересчёт рейтинга и updated_at индекс не переписывают.
+SQLITE_TABLE = "reviews_search"
+SQLITE_INSERT = (
+    f"INSERT INTO {SQLITE_TABLE}"
+    "(rowid, kind, object_id, parent_id, name, body)"
+)
+SQLITE_SOURCES = (
+    # (тип, код, таблица, столбцы, родитель, заголовок, текст)
+    (TITLE, 1, "reviews_title", "name, description",
+     "NULL", "{ref}.name", "{ref}.description"),
+    (REVIEW, 2, "reviews_review", "text, title_id",
+     "{ref}.title_id", "''", "{ref}.text"),
+    (COMMENT, 3, "reviews_comment", "text, review_id",
+     "{ref}.review_id", "''", "{ref}.text"),
+)
+
+
+def sqlite_values(kind, code, parent, name, body, ref):
+    columns = ", ".join(
+        expression.format(ref=ref) for expression in (parent, name, body)
+    )
+    return f"{ref}.id * 4 + {code}, '{kind}', {ref}.id, {columns}"
+
+
+def sqlite_triggers():
+    """SQL триггеров, поддерживающих индекс FTS5 в актуальном виде."""
+    statements = []
+    for kind, code, table, watched, *columns in SQLITE_SOURCES:
+        new = sqlite_values(kind, code, *columns, ref="new")
+        delete = (
+            f"DELETE FROM {SQLITE_TABLE} WHERE rowid = old.id * 4 + {code};"
+        )
+        statements += [
+            f"CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} "
+            f"BEGIN {SQLITE_INSERT} VALUES ({new}); END",
+            f"CREATE TRIGGER {table}_search_au "
+            f"AFTER UPDATE OF {watched} ON {table} "
+            f"BEGIN {delete} {SQLITE_INSERT} VALUES ({new}); END",
+            f"CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} "
+            f"BEGIN {delete} END",
+        ]
+    return statements
+
+
+def ensure_sqlite_triggers(connection):
+    """Восстанавливает триггеры индекса и перестраивает индекс.
+
+    SQLite удаляет триггеры вместе с таблицей, а AlterField и откат
+    миграций пересоздают таблицы, поэтому проверка выполняется после
+    каждого migrate. Сам индекс создаётся миграцией 0004; до неё
+    проверять нечего. Возвращает True, если триггеры пересозданы.
+    """
+    if connection.vendor != "sqlite":
+        return False
+    expected = sqlite_triggers()
+    names = [
+        f"{table}_search_{suffix}"
+        for _, _, table, *_ in SQLITE_SOURCES
+        for suffix in ("ai", "au", "ad")
+    ]
+    with transaction.atomic(using=connection.alias), \
+            connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, sql FROM sqlite_master WHERE name IN ({})".format(
+                ", ".join(["%s"] * (len(names) + 1))
+            ),
+            [SQLITE_TABLE, *names],
+        )
+        rows = cursor.fetchall()
+        if not any(kind == "table" for kind, _ in rows):
+            return False
+        if {sql for kind, sql in rows if kind == "trigger"} == set(expected):
+            return False
+        for name in names:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        # Пока триггеров не было, индекс мог отстать от таблиц.
+        cursor.execute(f"DELETE FROM {SQLITE_TABLE}")
+        for kind, code, table, _, *columns in SQLITE_SOURCES:
+            values = sqlite_values(kind, code, *columns, ref=table)
+            cursor.execute(f"{SQLITE_INSERT} SELECT {values} FROM {table}")
+        for statement in expected:
+            cursor.execute(statement)
+    return True
+
+
+class BaseSearchBackend:
+    """Интерфейс бэкенда полнотекстового поиска.
+
+    `search` возвращает словари с ключами `type`, `id`, `parent_id`,
+    `snippet` и `rank` (меньше - релевантнее), `count` - число совпадений.
+    """
+
+    def search(self, query, kind=None, limit=10, offset=0):
+        raise NotImplementedError
+
+    def count(self, query, kind=None):
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """Поиск по индексу FTS5 с ранжированием bm25."""
+
+    # Веса колонок name и body для bm25.
+    weights = (10.0, 1.0)
+
+    def match(self, query):
+        words = re.findall(r"\w+", query)
+        if not words:
+            return None
+        return " ".join(f'"{word}"' for word in words) + "*"
+
+    def where(self, query, kind):
+        sql = f"{SQLITE_TABLE} MATCH %s"
+        params = [self.match(query)]
+        if kind:
+            sql += " AND kind = %s"
+            params.append(kind)
+        return sql, params
+
+    def search(self, query, kind=None, limit=10, offset=0):
+        if self.match(query) is None:
+            return []
+        where, params = self.where(query, kind)
+        weights = ", ".join(map(str, self.weights))
+        sql = (
+            "SELECT kind, object_id, parent_id, "
+            f"snippet({SQLITE_TABLE}, -1, '[', ']', '…', 12), "
+            f"bm25({SQLITE_TABLE}, 0, 0, 0, {weights}) AS rank "
+            f"FROM {SQLITE_TABLE} WHERE {where} "
+            "ORDER BY rank LIMIT %s OFFSET %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit, offset])
+            return [
+                {
+                    "type": kind,
+                    "id": object_id,
+                    "parent_id": parent_id,
+                    "snippet": snippet,
+                    "rank": rank,
+                }
+                for kind, object_id, parent_id, snippet, rank in cursor
+            ]
+
+    def count(self, query, kind=None):
+        if self.match(query) is None:
+            return 0
+        where, params = self.where(query, kind)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {SQLITE_TABLE} WHERE {where}", params
+            )
+            return cursor.fetchone()[0]
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """Поиск подстрокой для баз данных без полнотекстового индекса."""
+
+    sources = {
+        TITLE: (Title, ("name", "description"), None),
+        REVIEW: (Review, ("text",), "title_id"),
+        COMMENT: (Comment, ("text",), "review_id"),
+    }
+
+    def querysets(self, query, kind):
+        for source_kind, (model, fields, parent) in self.sources.items():
+            if kind and kind != source_kind:
+                continue
+            lookup = Q()
+            for field in fields:
+                lookup |= Q(**{f"{field}__icontains": query})
+            yield source_kind, model.objects.filter(lookup), fields, parent
+
+    def results(self, query, kind):
+        for source_kind, queryset, fields, parent in self.querysets(
+            query, kind
+        ):
+            for obj in queryset.order_by("pk").iterator():
+                yield {
+                    "type": source_kind,
+                    "id": obj.pk,
+                    "parent_id": getattr(obj, parent) if parent else None,
+                    "snippet": getattr(obj, fields[0])[:120],
+                    "rank": 0.0,
+                }
+
+    def search(self, query, kind=None, limit=10, offset=0):
+        results = []
+        for index, result in enumerate(self.results(query, kind)):
+            if index >= offset + limit:
+                break
+            if index >= offset:
+                results.append(result)
+        return results
+
+    def count(self, query, kind=None):
+        return sum(
+            queryset.count()
+            for _, queryset, _, _ in self.querysets(query, kind)
+        )
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    backend = getattr(settings, "SEARCH_BACKEND", None)
+    if backend is None:
+        backend = (
+            "reviews.search.SQLiteFTSBackend"
+            if connection.vendor == "sqlite"
+            else "reviews.search.SimpleSearchBackend"
+        )
+    return import_string(backend)()
+
+
+class SearchResults:
+    """Ленивая выборка результатов поиска, совместимая с пагинаторами."""
+
+    def __init__(self, query, kind=None, backend=None):
+        self.query = query
+        self.kind = kind
+        self.backend = backend or get_search_backend()
+
+    def count(self):
+        return self.backend.count(self.query, self.kind)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start = item.start or 0
+        return self.backend.search(
+            self.query, self.kind, limit=item.stop - start, offset=start
+        )
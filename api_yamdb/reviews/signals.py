@@ -0,0 +1,143 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reviews.changes import (
+    CAPTURED_MODELS,
+    record_delete,
+    record_ratings,
+    record_save,
+    record_updates,
+)
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    GenreTitle,
+    Review,
+    Title,
+    Tombstone,
+    genre_links_changed,
+    ratings_changed,
+)
+from reviews.search import ensure_sqlite_triggers
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    """Учитывает новую или изменённую оценку в рейтинге произведения."""
+    if raw:
+        return
+    instance.score = int(instance.score)
+    previous = getattr(instance, "_rating_state", None)
+    if created:
+        Title.objects.filter(pk=instance.title_id).shift_rating(
+            instance.score, 1
+        )
+    elif previous is None:
+        Title.objects.filter(pk=instance.title_id).recalculate_ratings()
+    elif previous != (instance.title_id, instance.score):
+        title_id, score = previous
+        Title.objects.filter(pk=title_id).shift_rating(-score, -1)
+        Title.objects.filter(pk=instance.title_id).shift_rating(
+            instance.score, 1
+        )
+    instance.remember_rating_state()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Исключает оценку удалённого отзыва из рейтинга произведения."""
+    title_id, score = getattr(
+        instance, "_rating_state", (instance.title_id, instance.score)
+    )
+    Title.objects.filter(pk=title_id).shift_rating(-score, -1)
+
+
+@receiver(post_delete, sender=Title)
+def remember_deleted_title(sender, instance, **kwargs):
+    """Оставляет отметку об удалении произведения."""
+    Tombstone.objects.create(model=Tombstone.TITLE, object_id=instance.pk)
+
+
+@receiver(post_delete, sender=Review)
+def remember_deleted_review(sender, instance, **kwargs):
+    """Оставляет отметку об удалении отзыва."""
+    Tombstone.objects.create(
+        model=Tombstone.REVIEW,
+        object_id=instance.pk,
+        parent_id=instance.title_id,
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def remember_deleted_comment(sender, instance, **kwargs):
+    """Оставляет отметку об удалении комментария."""
+    Tombstone.objects.create(
+        model=Tombstone.COMMENT,
+        object_id=instance.pk,
+        parent_id=instance.review_id,
+    )
+
+
+@receiver(post_delete, sender=Genre)
+def remember_deleted_genre(sender, instance, **kwargs):
+    """Оставляет отметку об удалении жанра."""
+    Tombstone.objects.create(model=Tombstone.GENRE, object_id=instance.pk)
+
+
+@receiver(post_delete, sender=Category)
+def remember_deleted_category(sender, instance, **kwargs):
+    """Оставляет отметку об удалении категории."""
+    Tombstone.objects.create(
+        model=Tombstone.CATEGORY, object_id=instance.pk
+    )
+
+
+def touch_titles(titles):
+    """Обновляет `updated_at` произведений и записывает их в журнал."""
+    titles.update(updated_at=timezone.now())
+    record_updates(titles)
+
+
+# Жанры и категория входят в представление произведения, поэтому
+# их изменение обновляет `updated_at` затронутых произведений.
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_genre_titles(sender, instance, raw=False, **kwargs):
+    if not raw and not kwargs.get("created"):
+        touch_titles(Title.objects.filter(genre=instance))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_titles(sender, instance, raw=False, **kwargs):
+    if not raw and not kwargs.get("created"):
+        touch_titles(Title.objects.filter(category=instance))
+
+
+# Менеджеры `Title.genre` и `Genre.titles` пишут связи через
+# GenreTitle.objects, поэтому достаточно сигналов промежуточной модели.
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def touch_title_on_genre_link(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_titles(Title.objects.filter(pk=instance.title_id))
+
+
+@receiver(genre_links_changed, sender=GenreTitle)
+def touch_titles_on_genre_links(sender, title_ids, **kwargs):
+    touch_titles(Title.objects.filter(pk__in=title_ids))
+
+
+for model in CAPTURED_MODELS:
+    post_save.connect(record_save, sender=model)
+    post_delete.connect(record_delete, sender=model)
+ratings_changed.connect(record_ratings, sender=Title)
+
+
+def ensure_search_index(sender, using, **kwargs):
+    """Возвращает триггеры индекса поиска, потерянные при пересоздании
+    таблиц в миграциях."""
+    ensure_sqlite_triggers(connections[using])
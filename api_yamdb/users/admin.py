@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutboundEmail, User
 
 
 @admin.register(User)
@@ -16,3 +16,19 @@ class UserAdmin(admin.ModelAdmin):
     )
     search_fields = ("username", "email")
     list_filter = ("role",)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk",
+        "subject",
+        "to",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+    )
+    list_filter = ("status",)
+    # Текст письма содержит код подтверждения.
+    exclude = ("body",)
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users.models import User
+from users.revocation import revoked_tokens
+
+# Версия для удалённых и заблокированных пользователей: не совпадает
+# ни с одним токеном.
+REVOKED = -1
+
+
+class TokenVersions:
+    """Текущие версии токенов пользователей в кэше с коротким таймаутом.
+
+    Сохранение и удаление пользователя обновляют кэш сразу
+    (users.signals), а таймаут ограничивает срок, в течение которого
+    виден отзыв в обход модели, например через `QuerySet.update()`.
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.TOKEN_VERSIONS["ALIAS"]]
+
+    def key(self, user_id):
+        return f"auth:token_version:{user_id}"
+
+    def get(self, user_id):
+        version = self.cache.get(self.key(user_id))
+        if version is None:
+            version = (
+                User.objects.filter(pk=user_id, is_active=True)
+                .values_list("token_version", flat=True)
+                .first()
+            )
+            if version is None:
+                version = REVOKED
+            self.cache.set(
+                self.key(user_id), version, settings.TOKEN_VERSIONS["TIMEOUT"]
+            )
+        return version
+
+    def update(self, user):
+        self.cache.set(
+            self.key(user.pk),
+            user.token_version if user.is_active else REVOKED,
+            settings.TOKEN_VERSIONS["TIMEOUT"],
+        )
+
+    def forget(self, user_id):
+        self.cache.delete(self.key(user_id))
+
+
+token_versions = TokenVersions()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация по утверждениям токена.
+
+    Пользователь собирается из роли и флагов, записанных в токен
+    `RoleAccessToken`; из кэша читается только версия токенов.
+    Токены без версии проверяются по базе, как в `JWTAuthentication`.
+    Отозванные токены отклоняются по `revoked_tokens`.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti is not None and revoked_tokens.is_revoked(jti):
+            raise InvalidToken({
+                "detail": _("Token has been revoked"),
+                "code": "token_revoked",
+            })
+        return token
+
+    def get_user(self, validated_token):
+        if "ver" not in validated_token:
+            return super().get_user(validated_token)
+        check_token_version(validated_token)
+        return User.from_claims(validated_token)
+
+
+def check_token_version(token):
+    """Отклоняет токен, выданный до смены роли или отзыва токенов."""
+    user_id = token[api_settings.USER_ID_CLAIM]
+    if token_versions.get(user_id) != token.get("ver"):
+        raise AuthenticationFailed(
+            _("Token has been revoked"), code="token_revoked"
+        )
@@ -0,0 +1,142 @@
+import atexit
+import smtplib
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail.backends import smtp
+
+CONNECTION_ERRORS = (smtplib.SMTPException, OSError)
+
+
+def close_quietly(connection):
+    try:
+        connection.quit()
+    except CONNECTION_ERRORS:
+        connection.close()
+
+
+class SMTPConnectionPool:
+    """Открытые и авторизованные SMTP-соединения процесса.
+
+    Соединения разделяются по серверу и учётной записи. Перед выдачей
+    соединение проверяется командой NOOP, а простаивавшее дольше
+    idle_timeout закрывается, не дожидаясь разрыва со стороны сервера.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = defaultdict(list)
+
+    def acquire(self, key, idle_timeout):
+        while True:
+            with self._lock:
+                if not self._idle[key]:
+                    return None
+                connection, released = self._idle[key].pop()
+            if time.monotonic() - released > idle_timeout:
+                close_quietly(connection)
+                continue
+            try:
+                if connection.noop()[0] == 250:
+                    return connection
+            except CONNECTION_ERRORS:
+                pass
+            connection.close()
+
+    def release(self, key, connection, size):
+        with self._lock:
+            if len(self._idle[key]) < size:
+                self._idle[key].append((connection, time.monotonic()))
+                return
+        close_quietly(connection)
+
+    def clear(self):
+        with self._lock:
+            connections = [
+                connection
+                for idle in self._idle.values()
+                for connection, _ in idle
+            ]
+            self._idle.clear()
+        for connection in connections:
+            close_quietly(connection)
+
+
+pool = SMTPConnectionPool()
+atexit.register(pool.clear)
+
+
+class PooledSMTPBackend(smtp.EmailBackend):
+    """SMTP-бэкенд, переиспользующий соединения между отправками.
+
+    После отправки соединение возвращается в пул, поэтому TLS-рукопожатие
+    и авторизация выполняются один раз на соединение, а не на письмо.
+    Если сервер закрыл соединение во время отправки, письмо повторяется
+    через новое соединение.
+    """
+
+    def __init__(self, *args, pool_size=None, idle_timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_size = (
+            settings.EMAIL_POOL_SIZE if pool_size is None else pool_size
+        )
+        self.idle_timeout = (
+            settings.EMAIL_POOL_IDLE_TIMEOUT
+            if idle_timeout is None
+            else idle_timeout
+        )
+
+    @property
+    def pool_key(self):
+        return (
+            self.host, self.port, self.username, self.use_tls, self.use_ssl
+        )
+
+    def open(self):
+        if self.connection:
+            return False
+        self.connection = pool.acquire(self.pool_key, self.idle_timeout)
+        if self.connection is not None:
+            return True
+        return super().open()
+
+    def close(self):
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        pool.release(self.pool_key, connection, self.pool_size)
+
+    def discard(self):
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            connection.close()
+
+    def _send(self, email_message):
+        try:
+            return self._send_strict(email_message)
+        except smtplib.SMTPServerDisconnected:
+            self.discard()
+            try:
+                self.open()
+                if self.connection is None:
+                    return False
+                return self._send_strict(email_message)
+            except CONNECTION_ERRORS:
+                self.discard()
+                if not self.fail_silently:
+                    raise
+                return False
+        except smtplib.SMTPException:
+            if not self.fail_silently:
+                raise
+            return False
+
+    def _send_strict(self, email_message):
+        """Отправка, не подавляющая ошибки, чтобы распознать разрыв."""
+        fail_silently, self.fail_silently = self.fail_silently, False
+        try:
+            return super()._send(email_message)
+        finally:
+            self.fail_silently = fail_silently
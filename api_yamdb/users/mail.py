@@ -0,0 +1,150 @@
+import smtplib
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from api.prometheus import (
+    MAIL_DELIVERIES,
+    MAIL_QUEUE_LATENCY,
+    MAIL_SEND_DURATION,
+)
+from users.models import OutboundEmail
+
+SEND_ERRORS = (smtplib.SMTPException, OSError)
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь; с MAIL_QUEUE["EAGER"] сразу отправляет.
+
+    Письмо для немедленной отправки создаётся уже взятым в работу, как
+    после MailSender.claim, поэтому обработчик очереди его не отправит
+    повторно.
+    """
+    eager = settings.MAIL_QUEUE["EAGER"]
+    email = OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        to=list(recipient_list),
+        next_attempt_at=lease_expiry() if eager else timezone.now(),
+    )
+    if eager:
+        MailSender().deliver([email])
+    return email
+
+
+def lease_expiry():
+    """До этого момента взятые в работу письма скрыты от обработчиков."""
+    return timezone.now() + timedelta(seconds=settings.MAIL_QUEUE["LEASE"])
+
+
+class MailSender:
+    """Отправляет письма из очереди пачками через одно соединение.
+
+    Неудачные письма откладываются с экспоненциально растущей паузой,
+    после MAX_ATTEMPTS попыток получают статус `failed`.
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.MAIL_QUEUE["BATCH_SIZE"]
+        self.results = Counter()
+
+    def claim(self):
+        """Забирает пачку писем, продлевая их срок, чтобы другие
+        обработчики очереди не отправили их повторно."""
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                OutboundEmail.objects.select_for_update(skip_locked=True)
+                .filter(status=OutboundEmail.PENDING, next_attempt_at__lte=now)
+                .order_by("next_attempt_at", "id")[: self.batch_size]
+            )
+            OutboundEmail.objects.filter(
+                pk__in=[email.pk for email in emails]
+            ).update(next_attempt_at=lease_expiry())
+        return emails
+
+    def run_batch(self):
+        emails = self.claim()
+        self.deliver(emails)
+        return len(emails)
+
+    def deliver(self, emails):
+        if not emails:
+            return
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except SEND_ERRORS as error:
+            for email in emails:
+                self.failed(email, error)
+            return
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject,
+                    email.body,
+                    email.from_email,
+                    email.to,
+                    connection=connection,
+                )
+                try:
+                    with MAIL_SEND_DURATION.time():
+                        message.send()
+                except SEND_ERRORS as error:
+                    self.failed(email, error)
+                else:
+                    self.sent(email)
+        finally:
+            connection.close()
+
+    def sent(self, email):
+        email.status = OutboundEmail.SENT
+        email.attempts += 1
+        email.sent_at = timezone.now()
+        email.last_error = ""
+        # Текст письма содержит код подтверждения в открытом виде и после
+        # отправки больше не нужен.
+        email.body = ""
+        email.save(
+            update_fields=(
+                "status", "attempts", "sent_at", "last_error", "body"
+            )
+        )
+        MAIL_QUEUE_LATENCY.observe(
+            (email.sent_at - email.created_at).total_seconds()
+        )
+        self.count("sent")
+
+    def failed(self, email, error):
+        email.attempts += 1
+        email.last_error = str(error) or error.__class__.__name__
+        if email.attempts >= settings.MAIL_QUEUE["MAX_ATTEMPTS"]:
+            email.status = OutboundEmail.FAILED
+            email.body = ""
+            self.count("failed")
+        else:
+            email.next_attempt_at = timezone.now() + self.backoff(
+                email.attempts
+            )
+            self.count("retry")
+        email.save(
+            update_fields=(
+                "status", "attempts", "last_error", "next_attempt_at", "body"
+            )
+        )
+
+    @staticmethod
+    def backoff(attempts):
+        delay = settings.MAIL_QUEUE["RETRY_DELAY"] * 2 ** (attempts - 1)
+        return timedelta(
+            seconds=min(delay, settings.MAIL_QUEUE["MAX_RETRY_DELAY"])
+        )
+
+    def count(self, result):
+        self.results[result] += 1
+        MAIL_DELIVERIES.inc(result=result)
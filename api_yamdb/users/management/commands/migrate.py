@@ -0,0 +1,39 @@
+from django.core.management.commands import migrate
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+
+from users.models import User
+
+INITIAL = ("users", "0001_initial")
+
+
+def adopt_users_table(connection):
+    """Отмечает users.0001_initial применённой в старых базах.
+
+    До появления миграций приложения users его таблица создавалась без
+    них, а reviews.0001_initial уже применена. Без отметки migrate
+    остановится на несогласованной истории миграций или попытается
+    создать существующую таблицу. Схема таблицы совпадает
+    с users.0001_initial, поэтому миграцию достаточно отметить.
+    """
+    recorder = MigrationRecorder(connection)
+    if not recorder.has_table():
+        return False
+    applied = recorder.applied_migrations()
+    if INITIAL in applied or ("reviews", "0001_initial") not in applied:
+        return False
+    if User._meta.db_table not in connection.introspection.table_names():
+        return False
+    recorder.record_applied(*INITIAL)
+    return True
+
+
+class Command(migrate.Command):
+
+    def handle(self, *args, **options):
+        if adopt_users_table(connections[options["database"]]):
+            self.stdout.write(
+                "Marked users.0001_initial as applied for the existing "
+                f"{User._meta.db_table} table."
+            )
+        super().handle(*args, **options)
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from users.models import OutboundEmail, User
+
+
+class Command(BaseCommand):
+    help = "Clear expired confirmation codes in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            default=settings.CONFIRMATION_CODE["PURGE_BATCH_SIZE"],
+            type=int,
+            help="Number of rows updated by one query.",
+        )
+
+    def purge(self, queryset, batch_size, **values):
+        purged = 0
+        while True:
+            # Короткие запросы по первичному ключу не блокируют таблицу
+            # надолго, в отличие от одного UPDATE по всем строкам.
+            batch = list(
+                queryset.order_by("pk").values_list("pk", flat=True)[
+                    :batch_size
+                ]
+            )
+            if not batch:
+                return purged
+            purged += queryset.model.objects.filter(pk__in=batch).update(
+                **values
+            )
+
+    def handle(self, *args, **options):
+        expiry = User.confirmation_code_expiry()
+        purged = self.purge(
+            User.objects.filter(confirmation_code_issued_at__lt=expiry),
+            options["batch_size"],
+            confirmation_code=None,
+            confirmation_code_issued_at=None,
+        )
+        expired = OutboundEmail.objects.filter(created_at__lt=expiry)
+        # Неотправленные письма с истёкшим кодом уже бесполезны, а текст
+        # старых писем содержит код в открытом виде.
+        emails = self.purge(
+            expired.filter(status=OutboundEmail.PENDING),
+            options["batch_size"],
+            status=OutboundEmail.FAILED,
+            last_error="Confirmation code expired",
+            body="",
+        )
+        emails += self.purge(
+            expired.exclude(body=""), options["batch_size"], body=""
+        )
+        self.stdout.write(
+            f"Purged {purged} expired confirmation codes "
+            f"and {emails} outbound emails."
+        )
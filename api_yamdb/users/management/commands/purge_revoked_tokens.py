@@ -0,0 +1,11 @@
+from django.core.management import BaseCommand
+
+from users.revocation import revoked_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete revoked tokens that have already expired"
+
+    def handle(self, *args, **options):
+        deleted = revoked_tokens.purge()
+        self.stdout.write(f"Deleted {deleted} expired revoked tokens.")
@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from users.mail import MailSender
+
+
+class Command(BaseCommand):
+    help = "Send queued emails in batches over one connection per batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            default=settings.MAIL_QUEUE["BATCH_SIZE"],
+            type=int,
+            help="Number of emails sent over one connection.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue instead of exiting when it is empty.",
+        )
+        parser.add_argument(
+            "--interval",
+            default=5.0,
+            type=float,
+            help="Seconds to wait for new emails in loop mode.",
+        )
+
+    def handle(self, *args, **options):
+        sender = MailSender(options["batch_size"])
+        try:
+            while True:
+                if sender.run_batch():
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        results = sender.results
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Sent {results['sent']}, retried {results['retry']}, "
+                f"failed {results['failed']}."
+            )
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 3.2 on 2026-10-18 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_revoked_token'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(condition=models.Q(_negated=True, email=''), fields=('email',), name='user_email_unique'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 20:30
+
+from django.db import migrations, models
+
+
+def clear_plaintext_codes(apps, schema_editor):
+    """Открытые коды без срока действия больше не принимаются."""
+    User = apps.get_model('users', 'User')
+    User.objects.exclude(confirmation_code=None).update(
+        confirmation_code=None
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_email_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='confirmation_code_issued_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Код выдан'),
+        ),
+        migrations.RunPython(
+            clear_plaintext_codes, migrations.RunPython.noop
+        ),
+    ]
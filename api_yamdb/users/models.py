@@ -1,5 +1,15 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, router, transaction
+from django.utils import timezone
+from django.utils.crypto import (
+    constant_time_compare,
+    get_random_string,
+    salted_hmac,
+)
+from rest_framework_simplejwt.settings import api_settings
 
 
 class User(AbstractUser):
@@ -15,9 +25,20 @@ class User(AbstractUser):
     )
     bio = models.TextField("О Себе", max_length=256, blank=True)
     email = models.EmailField("Почта", blank=True, max_length=254)
+    # Хранится как "соль$HMAC", сам код есть только в письме.
     confirmation_code = models.CharField(
         "Код подтверждения", max_length=100, null=True
     )
+    confirmation_code_issued_at = models.DateTimeField(
+        "Код выдан", null=True, blank=True, db_index=True
+    )
+    token_version = models.PositiveIntegerField(
+        "Версия токенов", default=0, editable=False
+    )
+
+    # Поля, копии которых хранятся в токене доступа. Их изменение
+    # увеличивает token_version и отзывает выданные токены.
+    CLAIM_FIELDS = ("username", "role", "is_superuser", "is_staff")
 
     @property
     def is_admin(self):
@@ -34,6 +55,147 @@ class User(AbstractUser):
     class Meta:
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("email",),
+                condition=~models.Q(email=""),
+                name="user_email_unique",
+            ),
+        )
 
     def __str__(self) -> str:
         return self.username
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_claims = instance.get_claims()
+        return instance
+
+    @classmethod
+    def from_claims(cls, token):
+        """Пользователь из утверждений токена, без запроса к базе.
+
+        Объект содержит только поля из CLAIM_FIELDS и годится для проверки
+        прав и ссылок на автора, но не для сохранения.
+        """
+        user = cls(
+            id=token[api_settings.USER_ID_CLAIM],
+            token_version=token["ver"],
+            **{field: token[field] for field in cls.CLAIM_FIELDS},
+        )
+        user._state.adding = False
+        user._state.db = "default"
+        return user
+
+    @staticmethod
+    def hash_confirmation_code(code, salt=None):
+        salt = salt or get_random_string(12)
+        digest = salted_hmac(
+            f"users.confirmation_code:{salt}", code, algorithm="sha256"
+        ).hexdigest()
+        return f"{salt}${digest}"
+
+    @staticmethod
+    def confirmation_code_expiry():
+        """Коды, выданные раньше этого момента, недействительны."""
+        return timezone.now() - timedelta(
+            seconds=settings.CONFIRMATION_CODE["TTL"]
+        )
+
+    def set_confirmation_code(self, code):
+        self.confirmation_code = self.hash_confirmation_code(code)
+        self.confirmation_code_issued_at = timezone.now()
+
+    def check_confirmation_code(self, code):
+        """Сравнивает код с сохранённым хешем за постоянное время."""
+        issued_at = self.confirmation_code_issued_at
+        if not self.confirmation_code or issued_at is None:
+            return False
+        if issued_at < self.confirmation_code_expiry():
+            return False
+        salt = self.confirmation_code.partition("$")[0]
+        return constant_time_compare(
+            self.confirmation_code, self.hash_confirmation_code(code, salt)
+        )
+
+    def get_claims(self):
+        return {field: getattr(self, field) for field in self.CLAIM_FIELDS}
+
+    def revoke_tokens(self):
+        """Отзывает все выданные пользователю токены доступа."""
+        self.token_version += 1
+        self.save(update_fields=("token_version",))
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, "_loaded_claims", None)
+        if loaded is not None and loaded != self.get_claims():
+            self.token_version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "token_version"}
+        # Журнал изменений (reviews.ChangeEvent) пишется в post_save
+        # и должен фиксироваться вместе с пользователем.
+        using = kwargs.get("using") or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+        self._loaded_claims = self.get_claims()
+
+
+class OutboundEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUSES = ((PENDING, "Ожидает"), (SENT, "Отправлено"), (FAILED, "Ошибка"))
+
+    subject = models.CharField("Тема", max_length=255)
+    body = models.TextField("Текст")
+    from_email = models.CharField(
+        "Отправитель", max_length=254, blank=True, null=True
+    )
+    to = models.JSONField("Получатели")
+    status = models.CharField(
+        "Статус", max_length=16, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField("Попытки", default=0)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    created_at = models.DateTimeField("Создано", auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        "Следующая попытка", default=timezone.now
+    )
+    sent_at = models.DateTimeField("Отправлено", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+        ordering = ("next_attempt_at", "id")
+        indexes = (
+            models.Index(
+                fields=("status", "next_attempt_at"),
+                name="outbound_email_due_idx",
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f"{self.subject} -> {', '.join(self.to)}"
+
+
+class RevokedToken(models.Model):
+    """Отозванный токен; хранится, пока токен не истечёт."""
+
+    jti = models.CharField("Идентификатор токена", max_length=64, unique=True)
+    expires_at = models.DateTimeField("Истекает", db_index=True)
+    created_at = models.DateTimeField(
+        "Отозван", default=timezone.now, db_index=True
+    )
+
+    class Meta:
+        verbose_name = "Отозванный токен"
+        verbose_name_plural = "Отозванные токены"
+
+    def __str__(self) -> str:
+        return self.jti
@@ -0,0 +1,161 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from users.models import RevokedToken
+
+# Запас при догрузке отзывов: строки, закоммиченные позже, чем записано
+# их created_at, не должны пропускаться.
+SYNC_MARGIN = timedelta(minutes=1)
+GENERATION_KEY = "auth:revoked:generation"
+# Поколение, при котором следующая синхронизация читает базу.
+UNSYNCED = object()
+
+
+class BloomFilter:
+    """Фильтр Блума на bytearray с двойным хешированием blake2b."""
+
+    def __init__(self, bits, hashes):
+        self.bits = bits
+        self.hashes = hashes
+        self.array = bytearray((bits + 7) // 8)
+
+    def positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return (
+            (first + number * step) % self.bits
+            for number in range(self.hashes)
+        )
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(
+            self.array[position >> 3] & (1 << (position & 7))
+            for position in self.positions(value)
+        )
+
+
+class RevokedTokenStore:
+    """Отозванные идентификаторы токенов (jti) с таблицей RevokedToken.
+
+    Проверка начинается с фильтра Блума в памяти процесса: для
+    неотозванного токена она почти всегда отвечает «нет» без обращения
+    к базе, и её стоимость не зависит от числа отзывов. Положительные
+    ответы уточняются по LRU-кэшу и затем по базе.
+
+    Каждый отзыв увеличивает счётчик поколения в общем кэше. Процесс
+    сверяет его не чаще раза в SYNC_INTERVAL секунд и читает из базы
+    только отзывы, появившиеся после прошлой синхронизации. Новый
+    процесс начинает с загрузки всех неистёкших отзывов из базы, а без
+    общего кэша (LocMem у каждого процесса свой) отзывы других процессов
+    догружаются не реже раза в REFRESH_INTERVAL секунд.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def config(self):
+        return settings.REVOKED_TOKENS
+
+    @property
+    def cache(self):
+        return caches[self.config["ALIAS"]]
+
+    def reset(self):
+        """Забывает отзывы в памяти: следующая проверка читает базу."""
+        with self._lock:
+            self.bloom = BloomFilter(
+                self.config["BLOOM_BITS"], self.config["BLOOM_HASHES"]
+            )
+            self.recent = OrderedDict()
+            self.synced_at = None
+            self.loaded_at = None
+            self.watermark = None
+            self.generation = UNSYNCED
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and self.synced_at is not None and (
+            now - self.synced_at < self.config["SYNC_INTERVAL"]
+        ):
+            return
+        self.synced_at = now
+        generation = self.cache.get(GENERATION_KEY)
+        if not force and generation == self.generation and (
+            now - self.loaded_at < self.config["REFRESH_INTERVAL"]
+        ):
+            return
+        self.generation = generation
+        self.loaded_at = now
+        rows = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        if self.watermark is not None:
+            rows = rows.filter(created_at__gte=self.watermark - SYNC_MARGIN)
+        for jti, created_at in rows.values_list("jti", "created_at"):
+            self.remember(jti, True)
+            if self.watermark is None or created_at > self.watermark:
+                self.watermark = created_at
+        if self.watermark is None:
+            self.watermark = timezone.now()
+
+    def remember(self, jti, revoked):
+        with self._lock:
+            if revoked:
+                self.bloom.add(jti)
+            elif jti not in self.bloom:
+                return
+            self.recent[jti] = revoked
+            self.recent.move_to_end(jti)
+            if len(self.recent) > self.config["LRU_SIZE"]:
+                self.recent.popitem(last=False)
+
+    def is_revoked(self, jti):
+        self.sync()
+        with self._lock:
+            if jti not in self.bloom:
+                return False
+            revoked = self.recent.get(jti)
+        if revoked is None:
+            revoked = RevokedToken.objects.filter(jti=jti).exists()
+            self.remember(jti, revoked)
+        return revoked
+
+    def revoke(self, jti, expires_at):
+        """Отзывает токен; возвращает False, если он уже был отозван."""
+        if isinstance(expires_at, (int, float)):
+            expires_at = datetime.fromtimestamp(expires_at, timezone.utc)
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        except IntegrityError:
+            self.remember(jti, True)
+            return False
+        self.remember(jti, True)
+        try:
+            self.cache.incr(GENERATION_KEY)
+        except ValueError:
+            self.cache.set(GENERATION_KEY, time.time_ns(), None)
+        return True
+
+    def purge(self):
+        """Удаляет истёкшие токены: они отклоняются и без отзыва."""
+        deleted, _ = RevokedToken.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        return deleted
+
+
+revoked_tokens = RevokedTokenStore()
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+
+from users.authentication import token_versions
+from users.models import User
+
+
+def update_token_version(sender, instance, **kwargs):
+    token_versions.update(instance)
+
+
+def forget_token_version(sender, instance, **kwargs):
+    token_versions.forget(instance.pk)
+
+
+post_save.connect(update_token_version, sender=User)
+post_delete.connect(forget_token_version, sender=User)
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+from api.prometheus import RATE_LIMITED
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """Разбирает скорость вида `5/m` или `20/h`: (запросов, секунд)."""
+    count, period = rate.split("/")
+    return int(count), PERIODS[period[0]]
+
+
+class LocalMemoryStore:
+    """Корзины в памяти процесса; самые давние вытесняются при MAX_KEYS."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def take(self, key, rate, capacity):
+        with self._lock:
+            tokens, wait = refill(
+                self._buckets.get(key), rate, capacity, time.monotonic()
+            )
+            self._buckets[key] = tokens
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > settings.RATE_LIMIT["MAX_KEYS"]:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class CacheStore:
+    """Корзины в кэше CACHE_ALIAS, общие для всех процессов.
+
+    Чтение и запись корзины не атомарны: при одновременных запросах
+    с одним ключом лимит может быть превышен на число таких запросов.
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.RATE_LIMIT["CACHE_ALIAS"]]
+
+    def take(self, key, rate, capacity):
+        key = f"ratelimit:{key}"
+        tokens, wait = refill(self.cache.get(key), rate, capacity, time.time())
+        # Через capacity / rate секунд корзина снова полна и не отличается
+        # от отсутствующей.
+        self.cache.set(key, tokens, int(capacity / rate) + 1)
+        return wait
+
+
+def refill(bucket, rate, capacity, now):
+    """Пополняет корзину и берёт из неё токен.
+
+    Возвращает новое состояние корзины `(токены, время)` и сколько
+    секунд ждать, если токена не хватило (None, если запрос разрешён).
+    """
+    tokens, updated = bucket or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), None
+    return (tokens, now), (1 - tokens) / rate
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = import_string(settings.RATE_LIMIT["STORE"])()
+        return _store
+
+
+def reset_store():
+    """Сбрасывает хранилище; следующий запрос создаст его по настройкам."""
+    global _store
+    with _store_lock:
+        _store = None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Ограничение частоты запросов по алгоритму token bucket.
+
+    Конкретные ограничения создаются `limit()`: не больше `burst`
+    запросов подряд (по умолчанию число из `rate`), затем не быстрее
+    `rate`. Ключ `ip` берётся из адреса клиента, `email` и `username` —
+    из тела запроса; запросы без ключа не ограничиваются.
+    """
+
+    scope = None
+    key = None
+    rate = None
+    burst = None
+
+    @classmethod
+    def limit(cls, scope, key, rate, burst=None):
+        count, period = parse_rate(rate)
+        return type(
+            f"{scope.title()}{key.title()}Throttle",
+            (cls,),
+            {
+                "scope": scope,
+                "key": key,
+                "rate": count / period,
+                "burst": burst or count,
+            },
+        )
+
+    def get_ident_value(self, request):
+        if self.key == "ip":
+            return self.get_ident(request)
+        data = request.data
+        value = data.get(self.key) if hasattr(data, "get") else None
+        if not isinstance(value, str) or not value:
+            return None
+        return value.strip().lower()
+
+    def allow_request(self, request, view):
+        self.wait_time = None
+        if not settings.RATE_LIMIT["ENABLED"]:
+            return True
+        value = self.get_ident_value(request)
+        if value is None:
+            return True
+        self.wait_time = get_store().take(
+            f"{self.scope}:{self.key}:{value}", self.rate, self.burst
+        )
+        if self.wait_time is None:
+            return True
+        RATE_LIMITED.inc(scope=self.scope, key=self.key)
+        return False
+
+    def wait(self):
+        return self.wait_time
+
+
+def rate_limited(view, *throttles):
+    """Представление `@api_view` с заданными ограничениями частоты."""
+    return view.cls.as_view(throttle_classes=throttles)
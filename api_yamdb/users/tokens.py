@@ -0,0 +1,26 @@
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+
+class RoleClaimsMixin:
+    """Добавляет в токен роль и версию токенов пользователя.
+
+    По этим утверждениям `ClaimsJWTAuthentication` проверяет права
+    без загрузки пользователя из базы.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in user.get_claims().items():
+            token[claim] = value
+        token["ver"] = user.token_version
+        return token
+
+
+class RoleAccessToken(RoleClaimsMixin, AccessToken):
+    """Токен доступа с ролью пользователя."""
+
+
+class RoleRefreshToken(RoleClaimsMixin, RefreshToken):
+    """Токен обновления; выданные по нему токены доступа наследуют
+    его утверждения."""
@@ -1,4 +1,5 @@
 from django.core import validators
+from django.db.models import Q
 from rest_framework import serializers
 
 from users.models import User
@@ -16,18 +17,28 @@ class UserSerializer(serializers.ModelSerializer):
     )
 
     def validate(self, attrs):
-        if User.objects.filter(email=attrs.get("email")).exists():
-            user = User.objects.get(email=attrs.get("email"))
-            if user.username != attrs.get("username"):
-                raise serializers.ValidationError(
-                    {"error": "Email уже используется"}
-                )
-        if User.objects.filter(username=attrs.get("username")).exists():
-            user = User.objects.get(username=attrs.get("username"))
-            if user.email != attrs.get("email"):
-                raise serializers.ValidationError(
-                    {"error": "Имя пользователя уже используется"}
-                )
+        email = attrs.get("email")
+        username = attrs.get("username")
+        # Пользователи с тем же адресом или именем — одним запросом.
+        users = list(
+            User.objects.filter(Q(email=email) | Q(username=username))
+            .values_list("username", "email")[:2]
+        )
+        if any(
+            user_email == email and user_username != username
+            for user_username, user_email in users
+        ):
+            raise serializers.ValidationError(
+                {"error": "Email уже используется"}
+            )
+        if any(
+            user_username == username and user_email != email
+            for user_username, user_email in users
+        ):
+            raise serializers.ValidationError(
+                {"error": "Имя пользователя уже используется"}
+            )
+        self.registered = (username, email) in users
         return super().validate(attrs)
 
     def validate_username(self, value):
@@ -80,3 +91,15 @@ class MeSerializer(serializers.ModelSerializer):
             "bio",
             "role",
         )
+
+
+class RefreshSerializer(serializers.Serializer):
+    """Сериализатор для обновления токена."""
+
+    refresh = serializers.CharField()
+
+
+class RevokeSerializer(serializers.Serializer):
+    """Сериализатор для отзыва токена доступа или обновления."""
+
+    token = serializers.CharField()
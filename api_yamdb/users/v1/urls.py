@@ -1,20 +1,46 @@
 from django.urls import include, path
 from rest_framework import routers
 
+from users.throttling import TokenBucketThrottle, rate_limited
 from users.v1 import views
 from users.v1.views import UserViewSet
 
 app_name = "users"
 
+limit = TokenBucketThrottle.limit
+# Регистрация отправляет письмо: ограничиваем и адрес клиента,
+# и получателя, чтобы не расходовать почтовую квоту.
+SIGNUP_LIMITS = (
+    limit("signup", "ip", "20/h", burst=10),
+    limit("signup", "email", "5/h", burst=3),
+    limit("signup", "username", "5/h", burst=3),
+)
+# Перебор кода подтверждения ограничивается по имени пользователя.
+TOKEN_LIMITS = (
+    limit("token", "ip", "60/h", burst=20),
+    limit("token", "username", "10/h", burst=5),
+)
+REFRESH_LIMITS = (limit("refresh", "ip", "120/h", burst=30),)
+
 router_v1 = routers.DefaultRouter()
 router_v1.register("users", UserViewSet, basename="users")
 
 urlpatterns = [
     path("v1/", include(router_v1.urls)),
-    path("v1/auth/signup/", views.signup, name="token_get"),
+    path(
+        "v1/auth/signup/",
+        rate_limited(views.signup, *SIGNUP_LIMITS),
+        name="token_get",
+    ),
     path(
         "v1/auth/token/",
-        views.get_token,
+        rate_limited(views.get_token, *TOKEN_LIMITS),
         name="token_send",
     ),
+    path(
+        "v1/auth/token/refresh/",
+        rate_limited(views.refresh_token, *REFRESH_LIMITS),
+        name="token_refresh",
+    ),
+    path("v1/auth/token/revoke/", views.revoke_token, name="token_revoke"),
 ]
@@ -1,19 +1,30 @@
 from uuid import uuid4
 
-from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
 
+from api.prometheus import SIGNUPS, TOKENS
 from api.v1.permissions import IsOwnerOrAdmin
 from api_yamdb.settings import EMAIL
+from users.authentication import check_token_version
+from users.mail import enqueue_mail
 from users.models import User
+from users.revocation import revoked_tokens
+from users.tokens import RoleRefreshToken
 from users.v1.serializers import (
     MeSerializer,
+    RefreshSerializer,
+    RevokeSerializer,
     TokenSerializer,
     UserSerializer,
 )
@@ -59,28 +70,113 @@ def signup(request):
     serializer.is_valid(raise_exception=True)
     email = serializer.validated_data["email"]
     username = serializer.validated_data["username"]
-    user, create = User.objects.get_or_create(username=username, email=email)
     confirmation_code = str(uuid4())
-    user.confirmation_code = confirmation_code
-    user.save()
-    send_mail(
-        "Код подверждения",
-        confirmation_code,
-        EMAIL,
-        (email,),
-        fail_silently=False,
+    save_confirmation_code(
+        username, email, confirmation_code, serializer.registered
     )
+    enqueue_mail("Код подверждения", confirmation_code, EMAIL, (email,))
+    SIGNUPS.inc()
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+def save_confirmation_code(username, email, confirmation_code, registered):
+    """Создаёт пользователя или обновляет хеш его кода одной записью
+    в таблицу пользователей. Вставка нового пользователя добавляет ещё
+    событие журнала изменений в той же транзакции.
+
+    `registered` — результат проверки в `UserSerializer.validate`. Если
+    пользователя с тем же именем и адресом успели создать параллельно,
+    вставка нарушит уникальность и код будет записан обновлением.
+    """
+    code = {
+        "confirmation_code": User.hash_confirmation_code(confirmation_code),
+        "confirmation_code_issued_at": timezone.now(),
+    }
+    existing = User.objects.filter(username=username, email=email)
+    if registered:
+        existing.update(**code)
+        return
+    try:
+        with transaction.atomic():
+            User.objects.create(username=username, email=email, **code)
+    except IntegrityError:
+        if not existing.update(**code):
+            raise ValidationError(
+                {"error": "Имя пользователя или email уже используются"}
+            )
+
+
 @api_view(["POST"])
 def get_token(request):
+    """Выдаёт пару токенов в обмен на код подтверждения.
+
+    Код одноразовый: при выдаче токена он стирается, и для нового токена
+    нужно заново пройти регистрацию и получить новый код.
+    """
     serializer = TokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data["username"]
     confirmation_code = serializer.validated_data["confirmation_code"]
     user_base = get_object_or_404(User, username=username)
-    if confirmation_code == user_base.confirmation_code:
-        token = str(AccessToken.for_user(user_base))
-        return Response({"token": token}, status=status.HTTP_201_CREATED)
+    # Код одноразовый: из параллельных запросов с одним кодом токен
+    # получит только тот, чьё обновление сработает первым.
+    if user_base.check_confirmation_code(confirmation_code) and (
+        User.objects.filter(
+            pk=user_base.pk, confirmation_code=user_base.confirmation_code
+        ).update(confirmation_code=None, confirmation_code_issued_at=None)
+    ):
+        refresh = RoleRefreshToken.for_user(user_base)
+        TOKENS.inc(result="issued")
+        return Response(token_pair(refresh), status=status.HTTP_201_CREATED)
+    TOKENS.inc(result="rejected")
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+def token_pair(refresh):
+    return {"token": str(refresh.access_token), "refresh": str(refresh)}
+
+
+def read_token(token_class, raw_token):
+    try:
+        return token_class(raw_token)
+    except TokenError as error:
+        TOKENS.inc(result="rejected")
+        raise InvalidToken(error.args[0])
+
+
+@api_view(["POST"])
+def refresh_token(request):
+    """Выдаёт новую пару токенов в обмен на токен обновления.
+
+    Предъявленный токен отзывается, поэтому повторное использование
+    перехваченного токена обновления отклоняется.
+    """
+    serializer = RefreshSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    refresh = read_token(
+        RoleRefreshToken, serializer.validated_data["refresh"]
+    )
+    try:
+        check_token_version(refresh)
+    except AuthenticationFailed:
+        TOKENS.inc(result="rejected")
+        raise
+    if not revoked_tokens.revoke(refresh[api_settings.JTI_CLAIM],
+                                 refresh["exp"]):
+        TOKENS.inc(result="rejected")
+        raise InvalidToken("Token has been revoked")
+    refresh.set_jti()
+    refresh.set_exp()
+    TOKENS.inc(result="refreshed")
+    return Response(token_pair(refresh), status=status.HTTP_200_OK)
+
+
+@api_view(["POST"])
+def revoke_token(request):
+    """Отзывает токен доступа или обновления до истечения его срока."""
+    serializer = RevokeSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    token = read_token(UntypedToken, serializer.validated_data["token"])
+    revoked_tokens.revoke(token[api_settings.JTI_CLAIM], token["exp"])
+    TOKENS.inc(result="revoked")
+    return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,21 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from users.revocation import revoked_tokens
+
+    cache.clear()
+    revoked_tokens.reset()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    from users.throttling import reset_store
+
+    reset_store()
+    yield
+    reset_store()
@@ -0,0 +1,46 @@
+import pytest
+
+TITLES_COUNT = 12
+PAGE_SIZE = 5
+
+
+@pytest.fixture
+def catalog(admin, user, moderator):
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    categories = [
+        Category.objects.create(
+            name=f'Категория {idx}', slug=f'category-{idx}'
+        )
+        for idx in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(4)
+    ]
+    titles = []
+    for idx in range(TITLES_COUNT):
+        title = Title.objects.create(
+            name=f'Произведение {idx}',
+            year=2000 + idx,
+            category=categories[idx % len(categories)],
+        )
+        title.genre.set(genres[:idx % len(genres) + 1])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=idx + 5
+        )
+        for idx, author in enumerate((admin, user, moderator))
+    ]
+    for idx in range(PAGE_SIZE + 2):
+        Comment.objects.create(
+            review=reviews[0], author=(admin, user)[idx % 2],
+            text=f'Комментарий {idx}'
+        )
+    return {
+        'category': categories[0].slug,
+        'genre': genres[0].slug,
+        'title': titles[0].pk,
+        'review': reviews[0].pk,
+    }
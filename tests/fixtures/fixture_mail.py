@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def eager_mail(settings):
+    # В тестах письма уходят в locmem-бэкенд, поэтому их можно отправлять
+    # сразу и проверять через mail.outbox без запуска send_queued_mail.
+    settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'EAGER': True}
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from tests.utils import create_single_review, create_titles
+
+
+def get_rating(client, title_id):
+    response = client.get(f'/api/v1/titles/{title_id}/')
+    assert response.status_code == HTTPStatus.OK
+    return response.json().get('rating')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_reviews(self, client, admin_client,
+                                       user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert get_rating(client, title_id) is None, (
+            'Рейтинг произведения без отзывов должен быть равен `None`.'
+        )
+
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        response = create_single_review(user_client, title_id, 'Так себе', 5)
+        review_id = response.json()['id']
+        create_single_review(moderator_client, title_id, 'Плохо', 2)
+        assert get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+            data={'score': 9}
+        )
+        assert get_rating(client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки.'
+        )
+
+        user_client.delete(f'/api/v1/titles/{title_id}/reviews/{review_id}/')
+        assert get_rating(client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+    def test_02_rating_bulk_paths(self, admin_client, admin, user,
+                                  moderator):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        Review.objects.bulk_create([
+            Review(title=title, author=author, text='bulk', score=score)
+            for author, score in ((admin, 4), (user, 6), (moderator, 8))
+        ])
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            18, 3, 6
+        ), 'Рейтинг должен учитывать отзывы, созданные через bulk_create.'
+
+        Review.objects.filter(author=user).update(score=9)
+        title.refresh_from_db()
+        assert title.rating == 7, (
+            'Рейтинг должен учитывать массовое изменение оценок.'
+        )
+
+        moderator.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (13, 2), (
+            'Рейтинг должен учитывать каскадное удаление отзывов.'
+        )
+        call_command('rebuild_ratings', '--check')
+
+    def test_03_rebuild_ratings_command(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        Review.objects.create(title=title, author=admin, text='ok', score=8)
+        Title.objects.filter(pk=title.pk).update(rating_sum=0, rating=None)
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            8, 1, 8
+        ), 'Команда `rebuild_ratings` должна восстанавливать рейтинг.'
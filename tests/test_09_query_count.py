@@ -0,0 +1,59 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.fixtures.fixture_catalog import PAGE_SIZE, TITLES_COUNT
+
+# Бюджеты включают запросы дат изменения и удаления для ETag
+# и Last-Modified.
+QUERY_BUDGETS = (
+    ('/api/v1/categories/', 4),
+    ('/api/v1/genres/', 4),
+    ('/api/v1/titles/', 5),
+    ('/api/v1/titles/?genre={genre}&category={category}', 5),
+    ('/api/v1/titles/{title}/', 3),
+    ('/api/v1/titles/{title}/reviews/', 5),
+    ('/api/v1/titles/{title}/reviews/{review}/', 3),
+    ('/api/v1/titles/{title}/reviews/{review}/comments/', 5),
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    @pytest.mark.parametrize('url,budget', QUERY_BUDGETS)
+    def test_01_anonymous_query_budget(self, client, catalog, url, budget,
+                                       django_assert_max_num_queries):
+        url = url.format(**catalog)
+        with django_assert_max_num_queries(budget):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+
+    @pytest.mark.parametrize('url,budget', QUERY_BUDGETS)
+    def test_02_authenticated_query_budget(self, user_client, catalog, url,
+                                           budget,
+                                           django_assert_max_num_queries):
+        from users.revocation import revoked_tokens
+
+        url = url.format(**catalog)
+        # Список отозванных токенов читается из базы один раз на процесс.
+        revoked_tokens.sync()
+        with django_assert_max_num_queries(budget + 1):
+            response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+
+    def test_03_titles_page_is_constant(self, client, catalog,
+                                        django_assert_num_queries):
+        with django_assert_num_queries(5):
+            response = client.get('/api/v1/titles/')
+        assert len(response.json()['results']) == PAGE_SIZE
+        # Даты изменения уже в кэше, общие для всех страниц списка.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/?page=3')
+        assert len(response.json()['results']) == TITLES_COUNT % PAGE_SIZE
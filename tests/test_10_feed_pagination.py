@@ -0,0 +1,59 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_comment, create_single_review
+
+COMMENTS_COUNT = 7
+
+
+@pytest.fixture
+def feed(admin_client, user_client, admin):
+    from reviews.models import Title
+
+    title = Title.objects.create(name='Произведение', year=2000)
+    review_id = create_single_review(
+        admin_client, title.pk, 'Отзыв', 7
+    ).json()['id']
+    for idx in range(COMMENTS_COUNT):
+        create_single_comment(
+            user_client, title.pk, review_id, f'Комментарий {idx}'
+        )
+    return f'/api/v1/titles/{title.pk}/reviews/{review_id}/comments/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10FeedPagination:
+
+    def test_01_page_number_is_default(self, client, feed):
+        response = client.get(feed)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == COMMENTS_COUNT, (
+            f'По умолчанию `{feed}` должен использовать постраничную '
+            'пагинацию с ключом `count`.'
+        )
+
+    def test_02_cursor_mode(self, client, feed):
+        response = client.get(feed, {'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Курсорная пагинация не должна выполнять подсчёт объектов.'
+        )
+        first_page = [comment['id'] for comment in data['results']]
+        assert data['next'], (
+            'Ответ курсорной пагинации должен содержать ссылку `next`.'
+        )
+
+        response = client.get(data['next'])
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        second_page = [comment['id'] for comment in data['results']]
+        assert data['next'] is None
+        assert len(first_page) + len(second_page) == COMMENTS_COUNT
+        assert first_page + second_page == sorted(
+            first_page + second_page, reverse=True
+        ), (
+            'Курсорная лента должна быть упорядочена от новых записей к '
+            'старым без повторов.'
+        )
@@ -0,0 +1,121 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_genre, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    def test_01_genres_cached_and_invalidated(self, client, admin_client):
+        create_genre(admin_client)
+        url = '/api/v1/genres/'
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        response = client.get(url)
+        assert response['X-Cache'] == 'HIT', (
+            f'Повторный GET-запрос к `{url}` должен обслуживаться из кэша.'
+        )
+        assert response.json()['count'] == 3
+
+        admin_client.post(url, data={'name': 'Вестерн', 'slug': 'western'})
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Создание жанра должно сбрасывать кэш списка жанров.'
+        )
+        assert response.json()['count'] == 4
+
+    def test_02_titles_invalidated_by_related_writes(self, client,
+                                                     admin_client):
+        titles, categories, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        client.get(url)
+        assert client.get(url)['X-Cache'] == 'HIT'
+
+        create_single_review(admin_client, titles[0]['id'], 'Хорошо', 8)
+        response = client.get(url)
+        assert response.json()['rating'] == 8, (
+            'Изменение рейтинга должно сбрасывать кэш произведений.'
+        )
+
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['category'] is None, (
+            'Удаление категории должно сбрасывать кэш произведений.'
+        )
+
+    def test_03_cache_stats(self, client, user_client, admin_client):
+        url = '/api/v1/cache/stats/'
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+        before = admin_client.get(url).json().get('categories', {})
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/categories/')
+        stats = admin_client.get(url).json()['categories']
+        assert stats['hits'] == before.get('hits', 0) + 1
+        assert stats['misses'] == before.get('misses', 0) + 1
+
+    def test_04_precise_title_invalidation(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = (f'/api/v1/titles/{title["id"]}/' for title in titles)
+        client.get(first)
+        client.get(second)
+        create_single_review(admin_client, titles[0]['id'], 'Хорошо', 8)
+        assert client.get(first)['X-Cache'] == 'MISS'
+        assert client.get(second)['X-Cache'] == 'HIT', (
+            'Отзыв к одному произведению не должен сбрасывать кэш '
+            'карточек других произведений.'
+        )
+
+    def test_05_invalidation_after_commit(self, client, admin_client):
+        from django.db import transaction
+
+        from reviews.models import Genre
+
+        url = '/api/v1/genres/'
+        client.get(url)
+        with transaction.atomic():
+            Genre.objects.create(name='Вестерн', slug='western')
+            # До фиксации транзакции версия пространства имён не меняется.
+            assert client.get(url)['X-Cache'] == 'HIT'
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Кэш должен сбрасываться после фиксации транзакции.'
+        )
+
+    def test_06_direct_genre_link_writes(self, client, admin_client):
+        from reviews.models import Genre, GenreTitle
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/'
+        genre = Genre.objects.exclude(titles=title_id).first()
+
+        def genre_slugs():
+            response = client.get(url)
+            return response['X-Cache'], {
+                item['slug'] for item in response.json()['genre']
+            }
+
+        client.get(url)
+        link = GenreTitle.objects.create(title_id=title_id, genre=genre)
+        cache_status, slugs = genre_slugs()
+        assert cache_status == 'MISS' and genre.slug in slugs, (
+            'Создание GenreTitle напрямую должно сбрасывать кэш '
+            'карточки произведения.'
+        )
+        link.delete()
+        assert genre.slug not in genre_slugs()[1], (
+            'Удаление GenreTitle напрямую должно сбрасывать кэш '
+            'карточки произведения.'
+        )
+        GenreTitle.objects.bulk_create(
+            [GenreTitle(title_id=title_id, genre=genre)]
+        )
+        assert genre.slug in genre_slugs()[1], (
+            'bulk_create для GenreTitle должен сбрасывать кэш '
+            'карточки произведения.'
+        )
@@ -0,0 +1,152 @@
+import shutil
+import threading
+import time
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for path in DATA_DIR.glob('*.csv'):
+        shutil.copy(path, tmp_path / path.name)
+    return tmp_path
+
+
+def append_row(path, row):
+    content = path.read_text(encoding='utf-8').rstrip('\n')
+    path.write_text(f'{content}\n{row}\n', encoding='utf-8')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12LoadData:
+
+    def test_01_load_bundled_data(self, django_user_model):
+        from reviews.models import Comment, GenreTitle, Review, Title
+
+        call_command('load_data', '--batch-size', '10')
+        assert django_user_model.objects.count() == 5
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72
+        assert GenreTitle.objects.count() == 42
+        assert Comment.objects.count() == 3
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Команда `load_data` должна сохранять дату публикации из файла.'
+        )
+        call_command('rebuild_ratings', '--check')
+
+    @pytest.mark.parametrize('workers', ('1', '4'))
+    def test_02_dependency_order(self, workers, django_user_model):
+        from reviews.models import Comment, Review
+
+        call_command('load_data', '--workers', workers)
+        assert django_user_model.objects.count() == 5
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+
+    def test_03_dependency_graph(self):
+        from reviews.management.commands.load_data import (DICT,
+                                                           get_dependencies)
+        from reviews.models import Category, Comment, Review, Title, User
+
+        dependencies = get_dependencies(DICT)
+        assert dependencies[Category] == set()
+        assert dependencies[User] == set()
+        assert dependencies[Title] == {Category}
+        assert dependencies[Review] == {Title, User}
+        assert dependencies[Comment] == {Review, User}
+
+    def test_04_invalid_row_is_reported(self, data_dir):
+        from reviews.models import Review
+
+        append_row(
+            data_dir / 'review.csv',
+            '9999,9999,text,100,5,2019-09-24T21:08:21.567Z'
+        )
+        with pytest.raises(CommandError, match='title_id'):
+            call_command('load_data', '--path', str(data_dir))
+        assert not Review.objects.exists(), (
+            'Ошибка в файле должна отменять загрузку всего файла.'
+        )
+
+    def test_05_score_is_validated(self, data_dir):
+        append_row(
+            data_dir / 'review.csv', '9999,1,text,100,11,2019-09-24T21:08:21Z'
+        )
+        with pytest.raises(CommandError, match='score'):
+            call_command('load_data', '--path', str(data_dir))
+
+    def test_06_parsing_overlaps_writes(self):
+        from reviews.management.commands.load_data import (FileImporter,
+                                                           KnownIds)
+        from reviews.models import Genre
+
+        class Importer(FileImporter):
+            parsed = 0
+
+            def batches(self, reader, fields):
+                for batch in super().batches(reader, fields):
+                    self.parsed += 1
+                    yield batch
+
+        def run():
+            try:
+                importer.run()
+            finally:
+                connections.close_all()
+
+        # Пока другой файл держит блокировку записи, разборщик заполняет
+        # всю очередь, а не только первую пачку.
+        write_lock = threading.Lock()
+        importer = Importer(
+            Genre, DATA_DIR / 'genre.csv', KnownIds(), 1, write_lock
+        )
+        worker = threading.Thread(target=run)
+        with write_lock:
+            worker.start()
+            for _ in range(500):
+                if importer.parsed >= importer.queue_size:
+                    break
+                time.sleep(0.01)
+            assert importer.parsed >= importer.queue_size, (
+                'Файл должен разбираться, пока другой файл пишет в базу.'
+            )
+            assert importer.rows == 0
+        worker.join(5)
+        assert importer.rows == Genre.objects.count() > importer.queue_size
+
+    def test_07_small_file_is_parsed_before_lock(self):
+        from reviews.management.commands.load_data import (FileImporter,
+                                                           KnownIds)
+        from reviews.models import Category
+
+        parsed = threading.Event()
+
+        class Importer(FileImporter):
+            def batches(self, reader, fields):
+                yield from super().batches(reader, fields)
+                parsed.set()
+
+        class WriteLock:
+            parsed_before_write = None
+
+            def __enter__(self):
+                self.parsed_before_write = parsed.is_set()
+
+            def __exit__(self, *args):
+                pass
+
+        write_lock = WriteLock()
+        Importer(
+            Category, DATA_DIR / 'category.csv', KnownIds(), 100, write_lock
+        ).run()
+        assert write_lock.parsed_before_write, (
+            'Блокировка записи должна браться после разбора файла, '
+            'который помещается в очередь.'
+        )
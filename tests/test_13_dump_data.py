@@ -0,0 +1,55 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+def snapshot():
+    from reviews.management.commands.dump_data import COLUMNS
+
+    return {
+        model: list(
+            model.objects.order_by('pk').values_list(
+                *(model._meta.get_field(name).attname for name in columns)
+            )
+        )
+        for model, columns in COLUMNS.items()
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13DumpData:
+
+    def test_01_round_trip(self, tmp_path, django_user_model):
+        from reviews.models import Category, Genre, Title
+
+        call_command('load_data')
+        Title.objects.filter(pk=1).update(description='Описание')
+        before = snapshot()
+
+        call_command('dump_data', str(tmp_path), '--chunk-size', '7')
+        django_user_model.objects.all().delete()
+        Title.objects.all().delete()
+        Genre.objects.all().delete()
+        Category.objects.all().delete()
+
+        call_command('load_data', '--path', str(tmp_path))
+        assert snapshot() == before, (
+            'Данные, выгруженные командой `dump_data`, должны полностью '
+            'восстанавливаться командой `load_data`.'
+        )
+        call_command('rebuild_ratings', '--check')
+
+    def test_02_gzip_ndjson(self, tmp_path):
+        from reviews.models import Review
+
+        call_command('load_data')
+        call_command('dump_data', str(tmp_path), '--format', 'ndjson',
+                     '--gzip')
+        with gzip.open(tmp_path / 'review.ndjson.gz', 'rt') as file:
+            rows = [json.loads(line) for line in file]
+        assert len(rows) == Review.objects.count()
+        assert set(rows[0]) == {
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        }
@@ -0,0 +1,72 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+URL = '/api/v1/reviews/bulk/'
+
+
+def ndjson(*rows):
+    return '\n'.join(
+        row if isinstance(row, str) else json.dumps(row) for row in rows
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14BulkReviews:
+
+    def test_01_only_admin(self, client, user_client):
+        for api_client, status in ((client, HTTPStatus.UNAUTHORIZED),
+                                   (user_client, HTTPStatus.FORBIDDEN)):
+            response = api_client.post(
+                URL, data='', content_type='application/x-ndjson'
+            )
+            assert response.status_code == status, (
+                f'Эндпоинт `{URL}` должен быть доступен только '
+                'администратору.'
+            )
+
+    def test_02_bulk_ingest(self, admin_client, user_client, admin, user,
+                            moderator):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        create_single_review(user_client, first, 'Уже есть', 2)
+        rows = ndjson(
+            {'title': first, 'author': admin.username, 'text': 'a',
+             'score': 10},
+            {'title': first, 'author': user.username, 'text': 'b',
+             'score': 5},
+            {'title': second, 'author': admin.username, 'text': 'c',
+             'score': 4},
+            {'title': second, 'author': moderator.username, 'text': 'd',
+             'score': 8},
+            {'title': second, 'author': moderator.username, 'text': 'e',
+             'score': 9},
+            {'title': 999, 'author': admin.username, 'text': 'f',
+             'score': 9},
+            {'title': first, 'author': 'nobody', 'text': 'g', 'score': 9},
+            {'title': first, 'author': moderator.username, 'text': 'h',
+             'score': 11},
+            'not json',
+        )
+        response = admin_client.post(
+            URL, data=rows, content_type='application/x-ndjson'
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        statuses = [result['status'] for result in data['results']]
+        assert statuses == [201, 400, 201, 201, 400, 400, 400, 400, 400], (
+            'Результаты массовой загрузки должны соответствовать строкам '
+            'запроса.'
+        )
+        assert data['created'] == 3 and data['errors'] == 6
+        created = data['results'][0]['id']
+        assert Review.objects.get(pk=created).text == 'a'
+
+        assert Title.objects.get(pk=first).rating == 6
+        assert Title.objects.get(pk=second).rating == 6
+        assert Review.objects.count() == 4
@@ -0,0 +1,95 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+USERS_COUNT = 40
+TITLES_COUNT = 150
+CATEGORIES_COUNT = 5
+
+
+@pytest.fixture
+def dataset(django_user_model):
+    from reviews.models import Category, Comment, Review, Title
+
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'user{idx}', email=f'{idx}@yamdb.fake')
+        for idx in range(USERS_COUNT)
+    )
+    users = list(django_user_model.objects.order_by('pk'))
+    Category.objects.bulk_create(
+        Category(name=f'Категория {idx}', slug=f'category-{idx}')
+        for idx in range(CATEGORIES_COUNT)
+    )
+    categories = list(Category.objects.order_by('pk'))
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {idx}',
+            year=1900 + idx % 120,
+            category=categories[idx % CATEGORIES_COUNT],
+        )
+        for idx in range(TITLES_COUNT)
+    )
+    titles = list(Title.objects.order_by('pk'))
+    Review.objects.bulk_create(
+        Review(title=title, author=user, text='Отзыв', score=5)
+        for title in titles
+        for user in users
+    )
+    review = Review.objects.order_by('pk').first()
+    Comment.objects.bulk_create(
+        Comment(review_id=review_id, author=users[0], text='Комментарий')
+        for review_id in Review.objects.values_list('pk', flat=True)[:2000]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return {
+        'title': titles[0].pk,
+        'review': review.pk,
+        'category': categories[1].slug,
+    }
+
+
+def query_plans(client, url, table):
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    plans = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            sql = query['sql']
+            if f'FROM "{table}"' in sql and 'COUNT(' not in sql:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans.append(' '.join(row[-1] for row in cursor.fetchall()))
+    return ' '.join(plans)
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Планы запросов SQLite'
+)
+@pytest.mark.django_db(transaction=True)
+class Test15QueryPlans:
+
+    @pytest.mark.parametrize('url,table,index', (
+        ('/api/v1/titles/{title}/reviews/', 'reviews_review',
+         'review_title_pub_date_idx'),
+        ('/api/v1/titles/{title}/reviews/?pagination=cursor',
+         'reviews_review', 'review_title_pub_date_idx'),
+        ('/api/v1/titles/{title}/reviews/{review}/comments/',
+         'reviews_comment', 'comment_review_pub_date_idx'),
+        ('/api/v1/titles/?year=1950', 'reviews_title', 'title_year_idx'),
+        ('/api/v1/titles/?category={category}&year=1951', 'reviews_title',
+         'title_category_year_idx'),
+        ('/api/v1/titles/?name=Произведение 7', 'reviews_title',
+         'title_name_idx'),
+    ))
+    def test_01_endpoint_uses_index(self, client, dataset, url, table,
+                                    index):
+        url = url.format(**dataset)
+        plan = query_plans(client, url, table)
+        assert index in plan, (
+            f'Запрос к `{url}` должен использовать индекс `{index}`. '
+            f'План запроса: {plan}'
+        )
+        assert 'USE TEMP B-TREE FOR ORDER BY' not in plan, (
+            f'Сортировка ленты `{url}` должна выполняться по индексу. '
+            f'План запроса: {plan}'
+        )
@@ -0,0 +1,139 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_comment, create_single_review
+
+URL = '/api/v1/search/'
+
+
+@pytest.fixture
+def documents(admin_client, user_client):
+    from reviews.models import Title
+
+    matrix = Title.objects.create(
+        name='Матрица', year=1999,
+        description='Фильм о виртуальной реальности'
+    )
+    other = Title.objects.create(
+        name='Сталкер', year=1979, description='Путешествие в Зону'
+    )
+    review_id = create_single_review(
+        admin_client, other.pk, 'Лучше, чем Матрица, и без реальности', 9
+    ).json()['id']
+    comment_id = create_single_comment(
+        user_client, other.pk, review_id, 'Реальность здесь другая'
+    ).json()['id']
+    return {
+        'matrix': matrix.pk,
+        'other': other.pk,
+        'review': review_id,
+        'comment': comment_id,
+    }
+
+
+def search(client, **params):
+    response = client.get(URL, params)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{URL}` возвращает ответ со статусом '
+        '200.'
+    )
+    return response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Search:
+
+    def test_01_ranked_results(self, client, documents):
+        data = search(client, q='матрица')
+        assert data['count'] == 2
+        first, second = data['results']
+        assert (first['type'], first['id']) == (
+            'title', documents['matrix']
+        ), (
+            'Совпадение в названии произведения должно ранжироваться выше '
+            'совпадения в тексте отзыва.'
+        )
+        assert second['type'] == 'review'
+        assert second['id'] == documents['review']
+        assert second['title_id'] == documents['other']
+
+    def test_02_prefix_and_type_filter(self, client, documents):
+        data = search(client, q='реальност')
+        assert data['count'] == 3
+        data = search(client, q='реальност', type='comment')
+        assert data['count'] == 1
+        result = data['results'][0]
+        assert result['id'] == documents['comment']
+        assert result['review_id'] == documents['review']
+        assert result['title_id'] == documents['other']
+        response = client.get(URL, {'q': 'реальность', 'type': 'user'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_index_follows_writes(self, client, admin_client, documents):
+        from reviews.models import Title
+
+        Title.objects.filter(pk=documents['matrix']).update(
+            name='Начало', description='Сон во сне'
+        )
+        assert search(client, q='сон')['count'] == 1
+        assert search(client, q='матрица', type='title')['count'] == 0
+
+        admin_client.delete(
+            f'/api/v1/titles/{documents["other"]}/reviews/'
+            f'{documents["review"]}/'
+        )
+        assert search(client, q='реальность')['count'] == 0, (
+            'Удалённые отзывы и их комментарии не должны находиться поиском.'
+        )
+
+    def test_04_query_syntax_is_escaped(self, client, documents):
+        assert search(client, q='"OR (')['count'] == 0
+        assert search(client, q='')['count'] == 0
+
+    def test_05_only_indexed_columns_update_index(self, documents):
+        from django.db import connection
+        from django.utils import timezone
+
+        from reviews.models import Title
+        from reviews.search import sqlite_triggers
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('Индекс FTS5 есть только в SQLite.')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'trigger' "
+                "AND name LIKE '%%_search_%%'"
+            )
+            triggers = {sql for sql, in cursor}
+        assert triggers == set(sqlite_triggers()), (
+            'Триггеры индекса в базе должны совпадать с reviews.search.'
+        )
+
+        changes = connection.connection.total_changes
+        Title.objects.filter(pk=documents['matrix']).update(
+            rating=7, updated_at=timezone.now()
+        )
+        assert connection.connection.total_changes - changes == 1, (
+            'Изменение рейтинга не должно переписывать индекс поиска.'
+        )
+
+    def test_06_lost_triggers_are_restored(self, client, documents):
+        from django.core.management import call_command
+        from django.db import connection
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('Индекс FTS5 есть только в SQLite.')
+        # Так триггеры теряются при пересоздании таблицы в миграции.
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER reviews_title_search_au')
+            cursor.execute(
+                "UPDATE reviews_title SET name = 'Солярис' WHERE id = %s",
+                [documents['matrix']],
+            )
+        assert search(client, q='солярис')['count'] == 0
+        call_command('migrate', verbosity=0)
+        assert search(client, q='солярис')['count'] == 1, (
+            'После migrate триггеры индекса должны восстанавливаться, '
+            'а индекс - перестраиваться.'
+        )
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from tests.test_13_dump_data import snapshot
+
+SIZES = (
+    '--users', '40', '--categories', '3', '--genres', '5',
+    '--titles', '30', '--reviews', '300', '--comments', '200',
+)
+
+
+def clear_catalog(django_user_model):
+    from reviews.models import Category, Genre, Title
+
+    django_user_model.objects.all().delete()
+    Title.objects.all().delete()
+    Genre.objects.all().delete()
+    Category.objects.all().delete()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Benchmarks:
+
+    def test_01_generate_data(self, django_user_model):
+        from django.db.models import Max
+
+        from reviews.models import Comment, Review, Title
+
+        call_command('generate_data', *SIZES, '--batch-size', '70')
+        assert django_user_model.objects.count() == 40
+        assert Title.objects.count() == 30
+        assert Review.objects.count() == 300
+        assert Comment.objects.count() == 200
+        call_command('rebuild_ratings', '--check')
+        busiest = Title.objects.aggregate(
+            count=Max('rating_count')
+        )['count']
+        assert busiest > 300 / 30 * 2, (
+            'Отзывы должны распределяться по произведениям неравномерно.'
+        )
+
+        first = snapshot()
+        clear_catalog(django_user_model)
+        call_command('generate_data', *SIZES)
+        assert snapshot() == first, (
+            'Команда `generate_data` с одним и тем же `--seed` должна '
+            'создавать одинаковые данные.'
+        )
+        clear_catalog(django_user_model)
+        call_command('generate_data', *SIZES, '--seed', '2')
+        assert snapshot() != first
+
+    def test_02_bench_covers_all_routes(self, tmp_path):
+        from reviews.models import Review
+
+        call_command('generate_data', *SIZES)
+        reviews = Review.objects.count()
+        baseline = tmp_path / 'baseline.json'
+        call_command(
+            'bench', '--requests', '2', '--warmup', '0', '--save',
+            str(baseline)
+        )
+        results = json.loads(baseline.read_text())['routes']
+        assert {'titles', 'reviews', 'users', 'signup'} <= set(results)
+        for name, stats in results.items():
+            assert stats['errors'] == 0, (
+                f'Сценарий `{name}` вернул неожиданный статус ответа.'
+            )
+            assert stats['requests'] == 2
+        assert Review.objects.count() == reviews, (
+            'Пишущие сценарии не должны изменять данные.'
+        )
+
+        call_command(
+            'bench', '--requests', '2', '--warmup', '0', '--filter',
+            'titles', '--compare', str(baseline), '--threshold', '100'
+        )
+        results['titles']['queries'] = -1
+        baseline.write_text(json.dumps({'routes': results}))
+        with pytest.raises(CommandError, match='titles: queries'):
+            call_command(
+                'bench', '--requests', '2', '--warmup', '0', '--filter',
+                'titles', '--compare', str(baseline), '--threshold', '100'
+            )
+
+    def test_03_bench_requires_data(self):
+        with pytest.raises(CommandError, match='generate_data'):
+            call_command('bench', '--requests', '1')
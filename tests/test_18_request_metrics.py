@@ -0,0 +1,76 @@
+import logging
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+URL = '/api/v1/metrics/'
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    from api.metrics import route_metrics
+
+    route_metrics.reset()
+    yield
+    route_metrics.reset()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18RequestMetrics:
+
+    def test_01_server_timing(self, admin_client):
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        timing = response.get('Server-Timing', '')
+        match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing)
+        assert match, (
+            'Ответ должен содержать заголовок `Server-Timing` с временем '
+            'и числом запросов к базе данных.'
+        )
+        assert int(match.group(1)) == len(queries)
+        for name in ('app', 'render', 'total'):
+            assert re.search(rf'\b{name};dur=[\d.]+', timing), (
+                f'Заголовок `Server-Timing` должен содержать этап `{name}`.'
+            )
+
+    def test_02_only_admin(self, client, user_client):
+        assert client.get(URL).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(URL).status_code == HTTPStatus.FORBIDDEN
+
+    def test_03_route_histograms(self, admin_client, client):
+        for _ in range(3):
+            client.get('/api/v1/genres/')
+        client.get('/api/v1/missing/')
+        client.get('/api/v1/missing/again/')
+        data = admin_client.get(URL).json()
+        genres = data['GET api:genres-list']
+        assert genres['total_ms']['count'] == 3, (
+            'Метрики должны накапливаться по маршруту, а не по пути запроса.'
+        )
+        assert set(genres) == {
+            'total_ms', 'sql_ms', 'app_ms', 'render_ms', 'queries', 'size'
+        }
+        assert sum(genres['size']['buckets'].values()) == 3
+        assert data['<unmatched>']['total_ms']['count'] == 2
+        assert not any('missing' in route for route in data)
+
+    def test_04_structured_log(self, client, caplog):
+        logger = logging.getLogger('api.requests')
+        logger.addHandler(caplog.handler)
+        try:
+            with caplog.at_level(logging.INFO, logger='api.requests'):
+                client.get('/api/v1/categories/')
+        finally:
+            logger.removeHandler(caplog.handler)
+        record = caplog.records[-1]
+        assert record.route == 'GET api:categories-list'
+        assert record.status == HTTPStatus.OK
+        assert record.queries >= 0
+        assert record.total_ms >= record.sql_ms
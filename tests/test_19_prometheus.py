@@ -0,0 +1,111 @@
+import json
+import os
+import re
+from http import HTTPStatus
+
+import pytest
+
+URL = '/metrics'
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    from api.prometheus import registry
+
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def sample(text, name, **labels):
+    """Значение выборки с заданными метками или None."""
+    for line in text.splitlines():
+        match = re.fullmatch(r'(\w+)(?:\{(.*)\})? (\S+)', line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2) or ''))
+        if found == {key: str(value) for key, value in labels.items()}:
+            return float(match.group(3))
+    return None
+
+
+def scrape(client):
+    response = client.get(URL)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Эндпоинт `{URL}` должен быть доступен и возвращать метрики.'
+    )
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    return response.content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Prometheus:
+
+    def test_01_request_metrics(self, client):
+        for _ in range(2):
+            client.get('/api/v1/genres/')
+        client.get('/api/v1/titles/100500/')
+        text = scrape(client)
+        assert sample(
+            text, 'yamdb_http_requests_total',
+            handler='GenreViewSet.list', method='GET', status=200,
+        ) == 2, (
+            'Запросы должны учитываться по действию вьюсета DRF.'
+        )
+        assert sample(
+            text, 'yamdb_http_requests_total',
+            handler='TitleViewSet.retrieve', method='GET', status=404,
+        ) == 1
+        assert sample(
+            text, 'yamdb_http_request_duration_seconds_bucket',
+            handler='GenreViewSet.list', le='+Inf',
+        ) == 2
+        assert sample(
+            text, 'yamdb_http_request_db_queries_count',
+            handler='GenreViewSet.list',
+        ) == 2
+        assert sample(
+            text, 'yamdb_response_cache_requests_total',
+            namespace='genres', result='hits',
+        ) == 1
+
+    def test_02_signup_and_token(self, client):
+        client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'metrics', 'email': 'metrics@yamdb.fake'},
+        )
+        client.post(
+            '/api/v1/auth/token/',
+            {'username': 'metrics', 'confirmation_code': 'wrong'},
+        )
+        text = scrape(client)
+        assert sample(text, 'yamdb_signups_total') == 1
+        assert sample(text, 'yamdb_tokens_total', result='rejected') == 1
+        assert sample(text, 'yamdb_mail_send_duration_seconds_count') == 1
+
+    def test_03_multiprocess_aggregation(self, client, settings, tmp_path):
+        settings.METRICS = {**settings.METRICS, 'DIR': str(tmp_path)}
+        other = [[
+            'yamdb_http_requests_total', '',
+            [['handler', 'GenreViewSet.list'], ['method', 'GET'],
+             ['status', '200']],
+            5,
+        ]]
+        (tmp_path / 'metrics-1.json').write_text(json.dumps(other))
+        client.get('/api/v1/genres/')
+        text = scrape(client)
+        assert sample(
+            text, 'yamdb_http_requests_total',
+            handler='GenreViewSet.list', method='GET', status=200,
+        ) == 6, (
+            'Экспорт должен суммировать значения всех процессов из '
+            '`METRICS["DIR"]`.'
+        )
+        assert (tmp_path / f'metrics-{os.getpid()}.json').exists()
+        assert not list(tmp_path.glob('*.tmp'))
+
+    def test_04_token(self, client, settings):
+        settings.METRICS = {**settings.METRICS, 'TOKEN': 'secret'}
+        assert client.get(URL).status_code == HTTPStatus.UNAUTHORIZED
+        response = client.get(URL, HTTP_AUTHORIZATION='Bearer secret')
+        assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,156 @@
+import smtplib
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPServerDisconnected('connection lost')
+
+
+class WorkerDuringSendBackend(EmailBackend):
+    """Запускает обработчик очереди, пока письмо отправляется."""
+
+    claimed = None
+
+    def send_messages(self, email_messages):
+        from users.mail import MailSender
+
+        WorkerDuringSendBackend.claimed = MailSender().claim()
+        return super().send_messages(email_messages)
+
+
+@pytest.fixture
+def queued(settings):
+    settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'EAGER': False}
+    return settings
+
+
+def signup(client, number):
+    return client.post(URL_SIGNUP, {
+        'username': f'queued{number}',
+        'email': f'queued{number}@yamdb.fake',
+    })
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20MailQueue:
+
+    def test_01_signup_enqueues(self, client, queued):
+        from users.models import OutboundEmail
+
+        response = signup(client, 1)
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Регистрация не должна отправлять письмо синхронно.'
+        )
+        email = OutboundEmail.objects.get()
+        assert email.status == OutboundEmail.PENDING
+        assert email.to == ['queued1@yamdb.fake']
+
+        call_command('send_queued_mail')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['queued1@yamdb.fake']
+        email.refresh_from_db()
+        assert email.status == OutboundEmail.SENT
+        assert email.sent_at is not None
+        assert email.body == '', (
+            'После отправки текст письма с кодом подтверждения не должен '
+            'храниться в очереди.'
+        )
+
+    def test_02_eager_mode(self, client, settings):
+        from users.models import OutboundEmail
+
+        settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'EAGER': True}
+        signup(client, 1)
+        assert len(mail.outbox) == 1
+        assert OutboundEmail.objects.get().status == OutboundEmail.SENT
+
+    def test_03_batch_uses_one_connection(self, client, queued):
+        queued.EMAIL_BACKEND = 'tests.test_20_mail_queue.CountingBackend'
+        for number in range(5):
+            signup(client, number)
+        CountingBackend.opened = 0
+        call_command('send_queued_mail', '--batch-size', '3')
+        assert len(mail.outbox) == 5
+        assert CountingBackend.opened == 2, (
+            'Каждая пачка писем должна отправляться через одно соединение.'
+        )
+
+    def test_04_retry_with_backoff(self, client, queued):
+        from users.models import OutboundEmail
+
+        queued.EMAIL_BACKEND = 'tests.test_20_mail_queue.FailingBackend'
+        queued.MAIL_QUEUE = {**queued.MAIL_QUEUE, 'MAX_ATTEMPTS': 2}
+        signup(client, 1)
+        started = timezone.now()
+        call_command('send_queued_mail')
+        email = OutboundEmail.objects.get()
+        assert email.status == OutboundEmail.PENDING
+        assert email.attempts == 1
+        assert 'connection lost' in email.last_error
+        delay = timedelta(seconds=queued.MAIL_QUEUE['RETRY_DELAY'])
+        assert email.next_attempt_at >= started + delay, (
+            'Неудачное письмо должно откладываться на RETRY_DELAY секунд.'
+        )
+
+        call_command('send_queued_mail')
+        email.refresh_from_db()
+        assert email.attempts == 1, (
+            'Письмо не должно отправляться повторно раньше срока.'
+        )
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_queued_mail')
+        email.refresh_from_db()
+        assert email.status == OutboundEmail.FAILED
+        assert email.attempts == 2
+
+    def test_05_backlog_metric(self, client, queued):
+        signup(client, 1)
+        signup(client, 2)
+        text = client.get('/metrics').content.decode()
+        assert 'yamdb_mail_queue_backlog 2' in text.splitlines()
+
+    def test_06_eager_mail_is_claimed(self, client, settings):
+        settings.EMAIL_BACKEND = (
+            f'{__name__}.{WorkerDuringSendBackend.__name__}'
+        )
+        signup(client, 1)
+        assert WorkerDuringSendBackend.claimed == [], (
+            'Письмо, отправляемое сразу, должно быть взято в работу, '
+            'чтобы обработчик очереди не отправил его повторно.'
+        )
+        assert len(mail.outbox) == 1
+
+    def test_07_migrate_adopts_users_table(self):
+        from django.db.migrations.recorder import MigrationRecorder
+
+        # Так выглядит база, созданная до миграций приложения users.
+        applied = MigrationRecorder.Migration.objects.filter(
+            app='users', name='0001_initial'
+        )
+        applied.delete()
+        call_command('migrate', verbosity=0)
+        assert applied.exists(), (
+            'migrate должен отмечать users.0001_initial применённой, если '
+            'таблица пользователей уже существует.'
+        )
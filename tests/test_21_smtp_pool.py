@@ -0,0 +1,94 @@
+import pytest
+from django.core.mail import EmailMessage, get_connection, send_mail
+
+pytest.importorskip('aiosmtpd')
+
+BACKEND = 'users.backends.PooledSMTPBackend'
+
+
+def configure(settings, controller):
+    settings.EMAIL_BACKEND = BACKEND
+    settings.EMAIL_HOST = controller.hostname
+    settings.EMAIL_PORT = controller.port
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_HOST_USER = ''
+    settings.EMAIL_HOST_PASSWORD = ''
+
+
+@pytest.fixture
+def smtp_server(settings):
+    from api.benchmarks.smtp import local_smtp_server
+    from users.backends import pool
+
+    pool.clear()
+    with local_smtp_server() as (controller, handler):
+        configure(settings, controller)
+        yield controller, handler
+    pool.clear()
+
+
+def send(number):
+    return send_mail(
+        'Тема', f'Письмо {number}', 'yamdb@yamdb.fake',
+        [f'user{number}@yamdb.fake'],
+    )
+
+
+class Test21SMTPPool:
+
+    def test_01_connection_is_reused(self, smtp_server):
+        _, handler = smtp_server
+        for number in range(3):
+            assert send(number) == 1
+        assert handler.messages == 3
+        assert handler.sessions == 1, (
+            'Бэкенд должен переиспользовать SMTP-соединение между письмами.'
+        )
+
+    def test_02_batch(self, smtp_server):
+        _, handler = smtp_server
+        connection = get_connection()
+        messages = [
+            EmailMessage('Тема', 'Текст', 'yamdb@yamdb.fake', [f'{n}@x.fake'])
+            for n in range(5)
+        ]
+        assert connection.send_messages(messages) == 5
+        assert handler.messages == 5
+        assert handler.sessions == 1
+
+    def test_03_reconnect_after_server_restart(self, settings):
+        from api.benchmarks.smtp import local_smtp_server
+        from users.backends import pool
+
+        pool.clear()
+        with local_smtp_server() as (controller, _):
+            configure(settings, controller)
+            send(1)
+        with local_smtp_server(port=controller.port) as (_, handler):
+            assert send(2) == 1, (
+                'Разорванное сервером соединение из пула должно '
+                'прозрачно заменяться новым.'
+            )
+            assert handler.messages == 1
+        pool.clear()
+
+    def test_04_idle_timeout(self, smtp_server):
+        _, handler = smtp_server
+        connection = get_connection(idle_timeout=0)
+        for number in range(2):
+            connection.send_messages([
+                EmailMessage('Тема', 'Текст', 'a@x.fake', ['b@x.fake'])
+            ])
+        assert handler.sessions == 2, (
+            'Соединения, простаивавшие дольше idle_timeout, должны '
+            'закрываться.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_bench_suite(self):
+        from django.core.management import call_command
+
+        call_command(
+            'bench', '--suite', 'smtp', '--requests', '3', '--warmup', '0',
+            '--smtp-handshake-ms', '0'
+        )
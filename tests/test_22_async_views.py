@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from django.core.management import call_command
+
+SIZES = (
+    '--users', '20', '--categories', '2', '--genres', '3',
+    '--titles', '10', '--reviews', '60', '--comments', '40',
+)
+
+
+def read_urls(title, review, comment):
+    prefix = f'/api/v1/titles/{title.pk}/reviews/'
+    comments = f'{prefix}{review.pk}/comments/'
+    return [
+        '/api/v1/titles/',
+        f'/api/v1/titles/{title.pk}/',
+        '/api/v1/genres/',
+        '/api/v1/categories/',
+        prefix,
+        f'{prefix}{review.pk}/',
+        comments,
+        f'{comments}{comment.pk}/',
+    ]
+
+
+def strip_links(data):
+    """Ссылки пагинации ведут на свой префикс и не сравниваются."""
+    if isinstance(data, dict) and 'results' in data:
+        return data['count'], data['results']
+    return data
+
+
+@pytest.fixture
+def catalog():
+    from reviews.models import Comment
+
+    call_command('generate_data', *SIZES)
+    comment = Comment.objects.select_related('review__title').first()
+    return comment.review.title, comment.review, comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22AsyncViews:
+
+    def test_01_same_responses(self, client, catalog):
+        for url in read_urls(*catalog):
+            async_url = url.replace('/api/v1/', '/api/v1/async/', 1)
+            response = client.get(url)
+            async_response = client.get(async_url)
+            assert async_response.status_code == 200, (
+                f'Проверьте, что GET-запрос на `{async_url}` '
+                'возвращает статус 200.'
+            )
+            assert strip_links(async_response.json()) == strip_links(
+                response.json()
+            ), (
+                f'Ответ `{async_url}` должен совпадать с ответом `{url}`.'
+            )
+
+    def test_02_server_timing(self, client, catalog):
+        title, _, _ = catalog
+        response = client.get(f'/api/v1/async/titles/{title.pk}/reviews/')
+        assert 'db;dur=' in response['Server-Timing'], (
+            'Запросы к базе асинхронного представления должны учитываться '
+            'в заголовке Server-Timing.'
+        )
+
+    def test_03_asgi(self, catalog):
+        from django.core.asgi import get_asgi_application
+
+        from api.benchmarks.asgi import asgi_request
+
+        title, _, _ = catalog
+        application = get_asgi_application()
+        url = f'/api/v1/async/titles/{title.pk}/reviews/'
+
+        async def main():
+            return await asyncio.gather(
+                *(asgi_request(application, url) for _ in range(4))
+            )
+
+        assert asyncio.run(main()) == [200] * 4
+
+    def test_04_bench_suite(self, catalog):
+        call_command(
+            'bench', '--suite', 'asgi', '--requests', '4', '--warmup', '0',
+            '--concurrency', '2'
+        )
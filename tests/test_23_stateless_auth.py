@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+URL_USERS = '/api/v1/users/'
+URL_GET_TOKEN = '/api/v1/auth/token/'
+
+
+def claims_client(user):
+    from users.tokens import RoleAccessToken
+
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}'
+    )
+    return client
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23StatelessAuth:
+
+    def test_01_get_token_claims(self, client, user):
+        user.set_confirmation_code('code')
+        user.save()
+        response = client.post(URL_GET_TOKEN, {
+            'username': user.username, 'confirmation_code': 'code'
+        })
+        assert response.status_code == 201
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == 'user'
+        assert token['username'] == user.username
+        assert token['is_superuser'] is False
+        assert token['is_staff'] is False
+        assert token['ver'] == user.token_version
+
+    def test_02_no_user_query(self, admin):
+        legacy = APIClient()
+        legacy.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+        )
+        client = claims_client(admin)
+        client.get(URL_USERS)
+        assert count_queries(client, URL_USERS) == (
+            count_queries(legacy, URL_USERS) - 1
+        ), (
+            'Аутентификация по утверждениям токена не должна загружать '
+            'пользователя из базы.'
+        )
+
+    def test_03_role_change_revokes(self, admin, user):
+        client = claims_client(admin)
+        assert client.get(URL_USERS).status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert client.get(URL_USERS).status_code == 401, (
+            'Смена роли должна отзывать выданные токены.'
+        )
+        assert claims_client(admin).get(URL_USERS).status_code == 403
+
+        client = claims_client(user)
+        user.bio = 'new bio'
+        user.save()
+        assert client.get(f'{URL_USERS}me/').status_code == 200, (
+            'Изменение полей, не входящих в токен, не должно его отзывать.'
+        )
+
+    def test_04_revoke_and_delete(self, admin, user):
+        client = claims_client(admin)
+        admin.revoke_tokens()
+        assert client.get(URL_USERS).status_code == 401
+
+        client = claims_client(user)
+        user.is_active = False
+        user.save()
+        assert client.get(f'{URL_USERS}me/').status_code == 401
+        user.delete()
+        assert client.get(f'{URL_USERS}me/').status_code == 401
@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+URL_GET_TOKEN = '/api/v1/auth/token/'
+URL_REFRESH = '/api/v1/auth/token/refresh/'
+URL_REVOKE = '/api/v1/auth/token/revoke/'
+URL_ME = '/api/v1/users/me/'
+
+
+def get_tokens(client, user):
+    user.set_confirmation_code('code')
+    user.save()
+    response = client.post(URL_GET_TOKEN, {
+        'username': user.username, 'confirmation_code': 'code'
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def me_status(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client.get(URL_ME).status_code
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TokenRefresh:
+
+    def test_01_refresh_rotation(self, client, user):
+        tokens = get_tokens(client, user)
+        assert set(tokens) == {'token', 'refresh'}
+
+        response = client.post(URL_REFRESH, {'refresh': tokens['refresh']})
+        assert response.status_code == 200, (
+            'Проверьте, что токен обновления меняется на новую пару токенов.'
+        )
+        rotated = response.json()
+        assert rotated['refresh'] != tokens['refresh']
+        assert me_status(rotated['token']) == 200
+
+        response = client.post(URL_REFRESH, {'refresh': tokens['refresh']})
+        assert response.status_code == 401, (
+            'Использованный токен обновления должен отклоняться.'
+        )
+        response = client.post(URL_REFRESH, {'refresh': tokens['token']})
+        assert response.status_code == 401, (
+            'Токен доступа не должен приниматься как токен обновления.'
+        )
+
+    def test_02_revoke(self, client, user):
+        tokens = get_tokens(client, user)
+        assert me_status(tokens['token']) == 200
+        response = client.post(URL_REVOKE, {'token': tokens['token']})
+        assert response.status_code == 204
+        assert me_status(tokens['token']) == 401, (
+            'Отозванный токен доступа должен отклоняться.'
+        )
+
+        client.post(URL_REVOKE, {'token': tokens['refresh']})
+        response = client.post(URL_REFRESH, {'refresh': tokens['refresh']})
+        assert response.status_code == 401
+
+    def test_03_role_change_revokes_refresh(self, client, user):
+        tokens = get_tokens(client, user)
+        user.role = 'moderator'
+        user.save()
+        response = client.post(URL_REFRESH, {'refresh': tokens['refresh']})
+        assert response.status_code == 401, (
+            'Смена роли должна отзывать токены обновления.'
+        )
+
+    def test_04_store_without_queries(self):
+        from users.revocation import revoked_tokens
+
+        expires_at = timezone.now() + timedelta(hours=1)
+        revoked_tokens.reset()
+        for number in range(100):
+            revoked_tokens.revoke(f'revoked-{number}', expires_at)
+        revoked_tokens.reset()
+        revoked_tokens.sync()
+        with CaptureQueriesContext(connection) as queries:
+            assert all(
+                revoked_tokens.is_revoked(f'revoked-{number}')
+                for number in range(100)
+            )
+            assert not any(
+                revoked_tokens.is_revoked(f'valid-{number}')
+                for number in range(1000)
+            )
+        assert len(queries) <= 100 + 10, (
+            'Проверка неотозванных токенов должна обходиться без запросов '
+            'к базе.'
+        )
+
+    def test_05_purge(self):
+        from users.models import RevokedToken
+        from users.revocation import revoked_tokens
+
+        now = timezone.now()
+        revoked_tokens.revoke('expired', now - timedelta(seconds=1))
+        revoked_tokens.revoke('active', now + timedelta(hours=1))
+        call_command('purge_revoked_tokens')
+        assert list(RevokedToken.objects.values_list('jti', flat=True)) == [
+            'active'
+        ]
+
+    def test_06_fresh_store_reads_database(self, settings):
+        from users.models import RevokedToken
+        from users.revocation import RevokedTokenStore
+
+        expires_at = timezone.now() + timedelta(hours=1)
+        RevokedToken.objects.create(jti='earlier', expires_at=expires_at)
+        store = RevokedTokenStore()
+        assert store.is_revoked('earlier'), (
+            'Новый процесс должен видеть токены, отозванные до его запуска.'
+        )
+        assert not store.is_revoked('valid')
+
+        settings.REVOKED_TOKENS = {
+            **settings.REVOKED_TOKENS,
+            'SYNC_INTERVAL': 0, 'REFRESH_INTERVAL': 0,
+        }
+        RevokedToken.objects.create(jti='elsewhere', expires_at=expires_at)
+        assert store.is_revoked('elsewhere'), (
+            'Без общего кэша отзывы других процессов должны догружаться '
+            'из базы.'
+        )
+
+    def test_07_bench_suite(self):
+        call_command(
+            'bench', '--suite', 'tokens', '--requests', '5', '--warmup', '1',
+            '--revoked', '0', '--revoked', '50'
+        )
@@ -0,0 +1,90 @@
+import pytest
+
+from tests.test_19_prometheus import sample
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+
+
+def signup(client, username, email, ip='10.0.0.1'):
+    return client.post(
+        URL_SIGNUP, {'username': username, 'email': email}, REMOTE_ADDR=ip
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25RateLimit:
+
+    def test_01_refill(self):
+        from users.throttling import refill
+
+        bucket, wait = refill(None, rate=1.0, capacity=2, now=0)
+        assert wait is None and bucket == (1, 0)
+        bucket, wait = refill(bucket, rate=1.0, capacity=2, now=0)
+        bucket, wait = refill(bucket, rate=1.0, capacity=2, now=0.5)
+        assert wait == pytest.approx(0.5), (
+            'Пустая корзина должна сообщать время до следующего токена.'
+        )
+        bucket, wait = refill(bucket, rate=1.0, capacity=2, now=10)
+        assert wait is None
+        assert bucket[0] == 1, 'Корзина не должна наполняться сверх объёма.'
+
+    def test_02_signup_per_email(self, client):
+        for number in range(3):
+            response = signup(
+                client, f'user{number}', 'same@yamdb.fake', f'10.0.0.{number}'
+            )
+            assert response.status_code != 429
+        response = signup(client, 'user9', 'SAME@yamdb.fake', '10.0.0.9')
+        assert response.status_code == 429, (
+            'Регистрация должна ограничиваться по адресу почты.'
+        )
+        assert int(response['Retry-After']) > 0, (
+            'Ответ 429 должен содержать заголовок Retry-After.'
+        )
+
+    def test_03_signup_per_ip(self, client):
+        statuses = [
+            signup(client, f'ip{number}', f'ip{number}@yamdb.fake').status_code
+            for number in range(11)
+        ]
+        assert statuses[:10] == [200] * 10
+        assert statuses[10] == 429, (
+            'Регистрация должна ограничиваться по IP-адресу клиента.'
+        )
+        response = signup(client, 'other', 'other@yamdb.fake', '10.0.0.2')
+        assert response.status_code == 200, (
+            'Лимит одного адреса не должен влиять на другие.'
+        )
+
+    def test_04_token_per_username(self, client, user):
+        for number in range(5):
+            response = client.post(URL_TOKEN, {
+                'username': user.username, 'confirmation_code': 'wrong'
+            }, REMOTE_ADDR=f'10.0.1.{number}')
+            assert response.status_code == 400
+        response = client.post(URL_TOKEN, {
+            'username': user.username, 'confirmation_code': 'wrong'
+        }, REMOTE_ADDR='10.0.1.9')
+        assert response.status_code == 429, (
+            'Подбор кода подтверждения должен ограничиваться по имени '
+            'пользователя.'
+        )
+
+    def test_05_cache_store_and_metrics(self, client, settings):
+        from api.prometheus import registry
+
+        registry.reset()
+        settings.RATE_LIMIT = {
+            **settings.RATE_LIMIT, 'STORE': 'users.throttling.CacheStore'
+        }
+        for number in range(4):
+            response = signup(
+                client, f'cached{number}', 'cached@yamdb.fake',
+                f'10.0.2.{number}'
+            )
+        assert response.status_code == 429
+        text = client.get('/metrics').content.decode()
+        assert sample(
+            text, 'yamdb_rate_limited_total', scope='signup', key='email'
+        ) == 1, 'Отклонённые запросы должны учитываться в метриках.'
@@ -0,0 +1,60 @@
+import pytest
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+# Все запросы регистрации: проверка имени и адреса, запись пользователя
+# (новый пользователь - вставка в транзакции вместе с событием журнала
+# изменений), письмо в очереди.
+NEW_SIGNUP_QUERIES = 5
+REPEATED_SIGNUP_QUERIES = 3
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26SignupQueries:
+
+    def test_01_signup_queries(self, client, settings,
+                               django_assert_max_num_queries):
+        settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'EAGER': False}
+        data = {'username': 'fast', 'email': 'fast@yamdb.fake'}
+        with django_assert_max_num_queries(NEW_SIGNUP_QUERIES):
+            response = client.post(URL_SIGNUP, data)
+        assert response.status_code == 200
+        with django_assert_max_num_queries(REPEATED_SIGNUP_QUERIES):
+            response = client.post(URL_SIGNUP, data)
+        assert response.status_code == 200, (
+            'Повторная регистрация должна обновлять код одним запросом '
+            'без повторной вставки пользователя.'
+        )
+
+    def test_02_conflicts_in_one_query(self, client, user,
+                                       django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = client.post(
+                URL_SIGNUP, {'username': 'other', 'email': user.email}
+            )
+        assert response.status_code == 400
+        with django_assert_num_queries(1):
+            response = client.post(
+                URL_SIGNUP,
+                {'username': user.username, 'email': 'other@yamdb.fake'},
+            )
+        assert response.status_code == 400
+
+    def test_03_concurrent_signup(self, user):
+        from users.v1.views import save_confirmation_code
+
+        save_confirmation_code(user.username, user.email, 'code', False)
+        user.refresh_from_db()
+        assert user.check_confirmation_code('code'), (
+            'Если пользователя создали параллельно, код должен '
+            'записываться обновлением.'
+        )
+
+    def test_04_unique_email(self, django_user_model, user):
+        from django.db import IntegrityError
+
+        with pytest.raises(IntegrityError):
+            django_user_model.objects.create(
+                username='copy', email=user.email
+            )
+        django_user_model.objects.create(username='blank1', email='')
+        django_user_model.objects.create(username='blank2', email='')
@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+DATA = {'username': 'coded', 'email': 'coded@yamdb.fake'}
+
+
+def signup(client):
+    response = client.post(URL_SIGNUP, DATA)
+    assert response.status_code == 200
+    return mail.outbox[-1].body
+
+
+def get_token(client, code):
+    return client.post(URL_TOKEN, {
+        'username': DATA['username'], 'confirmation_code': code
+    })
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27ConfirmationCodes:
+
+    def test_01_code_is_hashed(self, client, django_user_model):
+        code = signup(client)
+        user = django_user_model.objects.get(username=DATA['username'])
+        assert code not in user.confirmation_code, (
+            'Код подтверждения не должен храниться в открытом виде.'
+        )
+        assert user.confirmation_code_issued_at is not None
+        assert user.check_confirmation_code(code)
+        assert not user.check_confirmation_code('wrong')
+
+    def test_02_code_is_single_use(self, client):
+        code = signup(client)
+        assert get_token(client, 'wrong').status_code == 400
+        assert get_token(client, code).status_code == 201
+        assert get_token(client, code).status_code == 400, (
+            'Код подтверждения должен действовать один раз.'
+        )
+
+    def test_03_code_expires(self, client, django_user_model, settings):
+        code = signup(client)
+        django_user_model.objects.update(
+            confirmation_code_issued_at=timezone.now() - timedelta(
+                seconds=settings.CONFIRMATION_CODE['TTL'] + 1
+            )
+        )
+        assert get_token(client, code).status_code == 400, (
+            'Истёкший код подтверждения не должен приниматься.'
+        )
+        code = signup(client)
+        assert get_token(client, code).status_code == 201, (
+            'Повторная регистрация должна выдавать новый код.'
+        )
+
+    def test_04_purge(self, django_user_model, settings):
+        expired = timezone.now() - timedelta(
+            seconds=settings.CONFIRMATION_CODE['TTL'] + 1
+        )
+        for number in range(5):
+            user = django_user_model(
+                username=f'purged{number}', email=f'purged{number}@x.fake'
+            )
+            user.set_confirmation_code('code')
+            user.save()
+        django_user_model.objects.filter(
+            username__in=['purged0', 'purged1', 'purged2']
+        ).update(confirmation_code_issued_at=expired)
+        call_command('purge_confirmation_codes', '--batch-size', '2')
+        assert set(
+            django_user_model.objects.exclude(confirmation_code=None)
+            .values_list('username', flat=True)
+        ) == {'purged3', 'purged4'}
+        assert not django_user_model.objects.filter(
+            confirmation_code=None
+        ).exclude(confirmation_code_issued_at=None).exists()
+
+    def test_05_purge_outbound_emails(self, client, settings):
+        from users.models import OutboundEmail
+
+        settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'EAGER': False}
+        client.post(URL_SIGNUP, DATA)
+        client.post(
+            URL_SIGNUP, {'username': 'fresh', 'email': 'fresh@yamdb.fake'}
+        )
+        OutboundEmail.objects.filter(to=[DATA['email']]).update(
+            created_at=timezone.now() - timedelta(
+                seconds=settings.CONFIRMATION_CODE['TTL'] + 1
+            )
+        )
+        call_command('purge_confirmation_codes')
+        expired = OutboundEmail.objects.get(to=[DATA['email']])
+        assert expired.body == '', (
+            'Команда `purge_confirmation_codes` должна стирать текст писем '
+            'с истёкшими кодами.'
+        )
+        assert expired.status == OutboundEmail.FAILED
+        fresh = OutboundEmail.objects.get(to=['fresh@yamdb.fake'])
+        assert fresh.body and fresh.status == OutboundEmail.PENDING
+
+    def test_06_admin_hides_body(self, client, django_user_model):
+        from users.models import OutboundEmail
+
+        client.force_login(django_user_model.objects.create_superuser(
+            username='staff', email='staff@yamdb.fake', password='1234567'
+        ))
+        email = OutboundEmail.objects.create(
+            subject='Код', body='secret-code', to=['a@yamdb.fake']
+        )
+        response = client.get(
+            f'/admin/users/outboundemail/{email.pk}/change/'
+        )
+        assert response.status_code == 200
+        assert 'secret-code' not in response.content.decode(), (
+            'Текст письма с кодом подтверждения не должен показываться '
+            'в админке.'
+        )
+
+    def test_07_used_code_is_cleared(self, client, django_user_model):
+        code = signup(client)
+        assert get_token(client, code).status_code == 201
+        user = django_user_model.objects.get(username=DATA['username'])
+        assert user.confirmation_code is None, (
+            'После выдачи токена код подтверждения должен стираться.'
+        )
+        assert user.confirmation_code_issued_at is None
+        assert get_token(client, signup(client)).status_code == 201, (
+            'Повторная регистрация должна выдавать новый рабочий код.'
+        )
@@ -0,0 +1,151 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from tests.test_09_query_count import QUERY_BUDGETS
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ConditionalGet:
+
+    @pytest.mark.parametrize('url', [url for url, _ in QUERY_BUDGETS])
+    def test_01_not_modified(self, client, catalog,
+                             url, django_assert_max_num_queries):
+        url = url.format(**catalog)
+        response = client.get(url)
+        with django_assert_max_num_queries(2):
+            repeated = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert repeated.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Повторный запрос `{url}` с If-None-Match должен получать 304 '
+            'запросами дат изменения, без выборки данных.'
+        )
+        assert repeated['ETag'] == response['ETag']
+        assert not repeated.content
+
+    def test_02_if_modified_since(self, client, catalog):
+        response = client.get('/api/v1/titles/')
+        repeated = client.get(
+            '/api/v1/titles/',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        assert repeated.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_03_changes_update_etag(self, client, user_client,
+                                    catalog):
+        reviews = f'/api/v1/titles/{catalog["title"]}/reviews/'
+        comments = f'{reviews}{catalog["review"]}/comments/'
+        etags = {
+            url: client.get(url)['ETag']
+            for url in ('/api/v1/titles/', comments)
+        }
+        response = user_client.post(
+            comments, {'text': 'Новый комментарий'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = client.get(comments, HTTP_IF_NONE_MATCH=etags[comments])
+        assert response.status_code == HTTPStatus.OK, (
+            'Новый комментарий должен менять ETag списка комментариев.'
+        )
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=etags['/api/v1/titles/']
+        ).status_code == HTTPStatus.NOT_MODIFIED, (
+            'Комментарии не должны менять ETag списка произведений.'
+        )
+
+    def test_04_variant(self, client, admin_client, catalog):
+        url = '/api/v1/titles/'
+        assert client.get(url)['ETag'] != admin_client.get(url)['ETag'], (
+            'ETag должен различаться для ответов разным ролям.'
+        )
+
+    def test_05_other_process_changes(self, client, catalog, monkeypatch):
+        from api.cache import response_cache
+        from reviews.models import Comment, Review
+
+        # Изменения другого процесса не доходят до его локального кэша.
+        monkeypatch.setattr(response_cache, 'invalidate', lambda *ns: None)
+        comments = (
+            f'/api/v1/titles/{catalog["title"]}/reviews/'
+            f'{catalog["review"]}/comments/'
+        )
+        response = client.get(comments)
+        review = Review.objects.get(pk=catalog['review'])
+        Comment.objects.create(
+            review=review, author=review.author, text='Из другого процесса'
+        )
+        assert client.get(
+            comments, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == HTTPStatus.OK, (
+            'ETag должен вычисляться по данным в базе, а не по версиям '
+            'в кэше процесса.'
+        )
+
+    def test_06_deletion_updates_last_modified(self, client, catalog):
+        from reviews.models import Comment
+
+        comments = (
+            f'/api/v1/titles/{catalog["title"]}/reviews/'
+            f'{catalog["review"]}/comments/'
+        )
+        Comment.objects.update(updated_at=timezone.now() - timedelta(1))
+        response = client.get(comments)
+        Comment.objects.filter(review_id=catalog['review']).first().delete()
+        assert client.get(
+            comments, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code == HTTPStatus.OK, (
+            'Удаление должно сдвигать Last-Modified списка.'
+        )
+
+    def test_07_genre_rename_changes_titles(self, client, catalog):
+        from reviews.models import Genre, Title
+
+        Title.objects.update(updated_at=timezone.now() - timedelta(1))
+        response = client.get('/api/v1/titles/')
+        genre = Genre.objects.get(slug=catalog['genre'])
+        genre.name = 'Новое название'
+        genre.save()
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == HTTPStatus.OK, (
+            'Переименование жанра должно менять ETag списка произведений.'
+        )
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/categories/', '/api/v1/titles/', '/api/v1/titles/{title}/',
+    ))
+    def test_08_cache_hit_skips_database(self, client, catalog, url,
+                                         django_assert_num_queries):
+        url = url.format(**catalog)
+        client.get(url)
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response['X-Cache'] == 'HIT', (
+            'Попадание в кэш ответов не должно обращаться к базе даже '
+            'для вычисления ETag.'
+        )
+
+    def test_09_etag_depends_on_renderer(self, client, catalog):
+        url = '/api/v1/titles/'
+        json_response = client.get(url, HTTP_ACCEPT='application/json')
+        html_response = client.get(url, HTTP_ACCEPT='text/html')
+        assert html_response.status_code == HTTPStatus.OK
+        assert json_response['ETag'] != html_response['ETag'], (
+            'Ответы в разных форматах должны иметь разные ETag.'
+        )
+        assert 'Accept' in json_response['Vary']
+
+    def test_10_direct_genre_link_changes_titles(self, client, catalog):
+        from reviews.models import Genre, GenreTitle, Title
+
+        Title.objects.update(updated_at=timezone.now() - timedelta(1))
+        url = f'/api/v1/titles/{catalog["title"]}/'
+        response = client.get(url)
+        genre = Genre.objects.exclude(titles=catalog['title']).first()
+        GenreTitle.objects.create(title_id=catalog['title'], genre=genre)
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == HTTPStatus.OK, (
+            'Прямое изменение GenreTitle должно менять ETag произведения.'
+        )
@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from tests.utils import create_reviews, create_titles
+
+
+def changes(client, url, since, **params):
+    response = client.get(url, {'updated_since': since, **params})
+    assert response.status_code == HTTPStatus.OK
+    return response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29IncrementalSync:
+
+    def test_01_updated_since(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        since = timezone.now().isoformat()
+        assert changes(admin_client, '/api/v1/titles/', since)[
+            'results'
+        ] == []
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', {'name': 'Изменено'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = changes(admin_client, '/api/v1/titles/', since)
+        assert [title['id'] for title in data['results']] == [
+            titles[0]['id']
+        ], (
+            'Проверьте, что `?updated_since=` возвращает только '
+            'изменённые после указанной даты произведения.'
+        )
+        assert 'next' in data and 'count' not in data
+
+    def test_02_reviews_ascending(self, admin_client, admin, user,
+                                  user_client, moderator, moderator_client):
+        since = timezone.now().isoformat()
+        reviews, titles = create_reviews(admin_client, {
+            admin: admin_client, user: user_client,
+            moderator: moderator_client,
+        })
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = changes(admin_client, url, since)
+        assert [review['id'] for review in data['results']] == [
+            review['id'] for review in reviews
+        ], 'Изменения должны возвращаться по возрастанию `updated_at`.'
+        dates = [review['updated_at'] for review in data['results']]
+        assert dates == sorted(dates)
+
+        changed = changes(admin_client, '/api/v1/titles/', since)['results']
+        assert titles[0]['id'] in {title['id'] for title in changed}, (
+            'Изменение рейтинга должно обновлять `updated_at` произведения.'
+        )
+
+    def test_03_tombstones(self, admin_client, admin, user, user_client):
+        reviews, titles = create_reviews(admin_client, {
+            admin: admin_client, user: user_client,
+        })
+        since = timezone.now().isoformat()
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        review_id = reviews[0]['id']
+        response = admin_client.delete(f'{url}{review_id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+        data = changes(admin_client, url, since, deleted='true')
+        assert [row['id'] for row in data['results']] == [review_id], (
+            'Проверьте, что `?updated_since=...&deleted=true` возвращает '
+            'отметки об удалённых отзывах.'
+        )
+        assert data['results'][0]['deleted_at']
+        assert not changes(admin_client, url, since)['results'], (
+            'Удалённый отзыв не должен попадать в список изменений.'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        data = changes(
+            admin_client, '/api/v1/titles/', since, deleted='true'
+        )
+        assert [row['id'] for row in data['results']] == [title_id]
+
+    def test_04_invalid_date(self, client):
+        response = client.get('/api/v1/titles/', {'updated_since': 'вчера'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
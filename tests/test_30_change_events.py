@@ -0,0 +1,186 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+
+from tests.utils import create_reviews
+
+URL_CHANGES = '/api/v1/changes/'
+URL_ACK = '/api/v1/changes/ack/'
+
+
+def events(model=None):
+    from reviews.models import ChangeEvent
+
+    queryset = ChangeEvent.objects.order_by('pk')
+    if model is not None:
+        queryset = queryset.filter(model=model)
+    return list(queryset.values_list('action', 'object_id'))
+
+
+def tail(*args):
+    out = StringIO()
+    call_command('tail_changes', *args, stdout=out)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30ChangeEvents:
+
+    def test_01_captured(self, admin_client, admin, user, user_client):
+        reviews, titles = create_reviews(admin_client, {
+            admin: admin_client, user: user_client,
+        })
+        assert events('reviews.review') == [
+            ('create', review['id']) for review in reviews
+        ], 'Создание отзывов должно попадать в журнал изменений.'
+        title_events = events('reviews.title')
+        assert ('create', titles[0]['id']) in title_events
+        assert ('update', titles[0]['id']) in title_events, (
+            'Изменение жанров произведения должно попадать в журнал.'
+        )
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        admin_client.patch(url, {'text': 'Изменено'})
+        admin_client.delete(url)
+        assert events('reviews.review')[-2:] == [
+            ('update', reviews[0]['id']), ('delete', reviews[0]['id'])
+        ]
+
+    def test_02_no_secrets(self, django_user_model):
+        from reviews.models import ChangeEvent
+
+        user = django_user_model(username='secret', email='s@yamdb.fake')
+        user.set_password('password')
+        user.set_confirmation_code('code')
+        user.save()
+        payload = ChangeEvent.objects.get(model='users.user').payload
+        assert payload['username'] == 'secret'
+        assert 'password' not in payload
+        assert 'confirmation_code' not in payload
+
+    def test_03_transactional(self, django_user_model):
+        from reviews.models import Category
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Category.objects.create(name='Откат', slug='rollback')
+                raise RuntimeError
+        assert events() == []
+        Category.objects.create(name='Фильм', slug='movie')
+        assert events('reviews.category') == [
+            ('create', Category.objects.get().pk)
+        ]
+
+    def test_04_api_cursor_and_ack(self, client, admin_client, user_client):
+        from reviews.models import ChangeEvent, Genre
+
+        for number in range(5):
+            Genre.objects.create(name=f'Жанр {number}', slug=f'g{number}')
+        assert user_client.get(URL_CHANGES).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+
+        response = admin_client.get(
+            URL_CHANGES, {'consumer': 'analytics', 'limit': 3}
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert len(data['results']) == 3 and data['more']
+        assert data['cursor'] == data['results'][-1]['id']
+
+        response = admin_client.post(
+            URL_ACK, {'consumer': 'analytics', 'cursor': data['cursor']}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['position'] == data['cursor']
+
+        rest = admin_client.get(
+            URL_CHANGES, {'consumer': 'analytics', 'limit': 100}
+        ).json()
+        assert [event['id'] for event in rest['results']] == list(
+            ChangeEvent.objects.filter(pk__gt=data['cursor'])
+            .order_by('pk').values_list('pk', flat=True)
+        ), 'Чтение должно продолжаться с подтверждённой позиции.'
+        assert not rest['more']
+
+        response = admin_client.post(
+            URL_ACK, {'consumer': 'analytics', 'cursor': 1}
+        )
+        assert response.json()['position'] == data['cursor'], (
+            'Позиция потребителя не должна уменьшаться.'
+        )
+        response = admin_client.post(
+            URL_ACK, {'consumer': 'analytics', 'cursor': rest['cursor'] + 1}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_tail_command(self):
+        from reviews.models import ChangeConsumer, Genre
+
+        for number in range(5):
+            Genre.objects.create(name=f'Жанр {number}', slug=f'g{number}')
+        lines = tail('--consumer', 'export', '--batch-size', '2')
+        assert [
+            line['payload']['slug'] for line in lines
+            if line['model'] == 'reviews.genre'
+        ] == [
+            f'g{number}' for number in range(5)
+        ]
+        assert ChangeConsumer.objects.get(name='export').position == (
+            lines[-1]['id']
+        )
+        assert tail('--consumer', 'export') == []
+        Genre.objects.create(name='Новый', slug='new')
+        assert [line['action'] for line in tail('--consumer', 'export')] == [
+            'create'
+        ]
+
+    def test_06_title_updates_without_save(self, admin_client, admin, user,
+                                           user_client):
+        from reviews.models import ChangeEvent, Title
+
+        _, titles = create_reviews(admin_client, {
+            admin: admin_client, user: user_client,
+        })
+        title = Title.objects.get(pk=titles[0]['id'])
+        event = ChangeEvent.objects.filter(
+            model='reviews.title', object_id=title.pk
+        ).latest('pk')
+        assert event.payload['rating'] == title.rating, (
+            'Изменение рейтинга должно записывать в журнал событие '
+            'с новым рейтингом произведения.'
+        )
+
+        genre = title.genre.first()
+        latest = ChangeEvent.objects.latest('pk').pk
+        genre.name = 'Переименованный жанр'
+        genre.save()
+        assert ('update', title.pk) in [
+            (event.action, event.object_id)
+            for event in ChangeEvent.objects.filter(
+                pk__gt=latest, model='reviews.title'
+            )
+        ], 'Переименование жанра должно записывать события произведений.'
+
+        latest = ChangeEvent.objects.latest('pk').pk
+        genre.titles.clear()
+        assert ChangeEvent.objects.filter(
+            pk__gt=latest, model='reviews.title', object_id=title.pk
+        ).exists(), (
+            'Очистка произведений жанра должна записывать их события.'
+        )
+
+    def test_07_load_data_records_events(self, django_user_model):
+        from reviews.models import ChangeEvent, Review
+
+        call_command('load_data')
+        assert ChangeEvent.objects.filter(
+            model='reviews.review', action='create'
+        ).count() == Review.objects.count()
+        assert ChangeEvent.objects.filter(
+            model='users.user', action='create'
+        ).count() == django_user_model.objects.count()
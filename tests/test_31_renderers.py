@@ -0,0 +1,57 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+
+from tests.test_17_benchmarks import SIZES
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31Renderers:
+
+    def test_01_same_json(self, client):
+        from api.renderers import FastJSONRenderer
+        from api.v1.serializers import TitleReadSerializer
+        from reviews.models import Title
+
+        call_command('generate_data', *SIZES)
+        data = TitleReadSerializer(
+            Title.objects.order_by('pk')[:20], many=True
+        ).data
+        assert FastJSONRenderer().render(data) == (
+            JSONRenderer().render(data)
+        ), 'FastJSONRenderer должен выдавать тот же JSON, что и DRF.'
+
+        response = client.get('/api/v1/titles/')
+        assert response['Content-Type'] == 'application/json'
+        assert response.json()['results']
+        response = client.get(
+            '/api/v1/titles/', HTTP_ACCEPT='application/json; indent=2'
+        )
+        assert b'\n  ' in response.content
+
+    def test_02_fallback(self, monkeypatch):
+        from api import renderers
+
+        monkeypatch.setattr(renderers, 'orjson', None)
+        data = {'name': 'Произведение', 'big': 2 ** 70}
+        assert json.loads(renderers.FastJSONRenderer().render(data)) == data
+
+    def test_03_msgpack(self, client):
+        msgpack = pytest.importorskip('msgpack')
+
+        response = client.get(
+            '/api/v1/genres/', HTTP_ACCEPT='application/msgpack'
+        )
+        assert response['Content-Type'] == 'application/msgpack'
+        assert msgpack.unpackb(response.content) == client.get(
+            '/api/v1/genres/'
+        ).json()
+
+    def test_04_bench_suite(self):
+        call_command('generate_data', *SIZES)
+        call_command(
+            'bench', '--suite', 'renderers', '--requests', '2',
+            '--warmup', '0', '--page-size', '10', '--page-size', '50'
+        )